@@ -0,0 +1,332 @@
+'''
+Micro-benchmarks for parsing hot paths: publisher detection, browser
+document parsing, access checks, PDF detection, and table parsing. Each
+case runs over the saved pages in tests/fixtures or over synthetic large
+pages, PDFs, and PDFx output, in a fresh child process so that cases
+don't share caches or allocations, and so that the child's peak memory
+belongs to one case. Results can be saved as a baseline and
+compared against it so that regressions show up in review; re-save the
+baseline in any commit that changes a hot path.
+
+Usage (from the repository root):
+    python -m sciscrape.benchmarks.hotpaths
+    python -m sciscrape.benchmarks.hotpaths --save
+    python -m sciscrape.benchmarks.hotpaths --only pubdet --repeat 20
+'''
+
+# Imports
+import os
+import gc
+import sys
+import glob
+import json
+import time
+import random
+import argparse
+import resource
+import StringIO
+import multiprocessing
+import mechanize
+import PyPDF2
+from pyquery import PyQuery
+
+# Project imports
+from sciscrape.scrapetools import pubdet
+from sciscrape.scrapetools import getters
+from sciscrape.parsetools import sciparse
+from sciscrape.utils import mechtools
+from sciscrape.utils import utils
+
+FIXTURE_PATH = 'tests/fixtures'
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# Default relative slowdown reported as a regression
+DEFAULT_TOLERANCE = 0.25
+
+#########
+# Input #
+#########
+
+def fixture_docs(extensions):
+    '''Read saved fixture documents with the given extensions.'''
+    docs = []
+    for extension in extensions:
+        pattern = os.path.join(FIXTURE_PATH, '*', '*.%s' % (extension))
+        for path in sorted(glob.glob(pattern)):
+            with open(path, 'rb') as f:
+                docs.append(f.read())
+    return docs
+
+def synthetic_html(paragraphs=20000, seed=0):
+    '''Build a large article-like HTML page (~2MB by default).'''
+    rand = random.Random(seed)
+    words = ['cortex', 'activation', 'signal', 'subjects', 'trial', 'bold',
+             'region', 'contrast', 'response', 'conflict', 'task', 'frontal']
+    body = ''.join(
+        '<p class="para">%s</p>' % ' '.join(
+            rand.choice(words) for _ in range(15)
+        )
+        for _ in range(paragraphs)
+    )
+    return (
+        '<html><head><title>Synthetic article</title>'
+        '<meta name="citation_publisher" content="Synthetic Press">'
+        '<meta name="citation_pdf_url" content="/article.pdf">'
+        '</head><body>%s<a href="/article.pdf">PDF</a></body></html>'
+    ) % (body)
+
+def synthetic_pdf(pages=500):
+    '''Build a large PDF of blank pages.'''
+    writer = PyPDF2.PdfFileWriter()
+    for _ in range(pages):
+        writer.addBlankPage(612, 792)
+    out = StringIO.StringIO()
+    writer.write(out)
+    return out.getvalue()
+
+def synthetic_pdfx(tables=10, rows=200, seed=0):
+    '''Build PDFx-style XML containing coordinate tables.'''
+    rand = random.Random(seed)
+    parts = ['<pdfx><article>']
+    for number in range(1, tables + 1):
+        parts.append('<h1 class="table">Table %d. Activations</h1>' % (number))
+        parts.append('<table number="%d"><thead><tr>' % (number))
+        parts.append(''.join(
+            '<th>%s</th>' % (header)
+            for header in ['Region', 'BA', 'x', 'y', 'z', 't']
+        ))
+        parts.append('</tr></thead>')
+        for _ in range(rows):
+            parts.append('<tr>%s</tr>' % ''.join(
+                '<td>%s</td>' % (cell)
+                for cell in [
+                    'Frontal', rand.randint(1, 47),
+                    rand.randint(-70, 70), rand.randint(-100, 70),
+                    rand.randint(-40, 80), '%.2f*' % rand.uniform(3, 8),
+                ]
+            ))
+        parts.append('</table>')
+    parts.append('</article></pdfx>')
+    return ''.join(parts)
+
+class StaticExtractor(object):
+    '''Extractor returning fixed PDFx output.'''
+
+    def __init__(self, xml):
+        self.xml = xml
+
+    def extract(self, pdf):
+        return PyQuery(self.xml)
+
+def _browser_with(text, url='http://example.com/article/full'):
+    browser = mechtools.PubBrowser()
+    browser._b.set_response(mechanize.make_response(
+        text, [('Content-Type', 'text/html')], url, 200, 'OK'
+    ))
+    return browser
+
+#########
+# Cases #
+#########
+
+def _parse_docs(docs):
+    return [(doc, PyQuery(doc)) for doc in docs]
+
+class Case(object):
+    '''Benchmark case: setup() returns a list of inputs, and func is
+    called once per input.'''
+
+    def __init__(self, name, setup, func):
+        self.name = name
+        self.setup = setup
+        self.func = func
+
+cases = [
+    Case('pubdet.fixtures',
+         lambda: fixture_docs(['html', 'pmc']),
+         pubdet.pubdet),
+    Case('pubdet.large',
+         lambda: [synthetic_html()],
+         pubdet.pubdet),
+    Case('get_docs.fixtures',
+         lambda: [_browser_with(doc) for doc in fixture_docs(['html', 'pmc'])],
+         lambda browser: browser.get_docs()),
+    Case('get_docs.large',
+         lambda: [_browser_with(synthetic_html())],
+         lambda browser: browser.get_docs()),
+    Case('check_access.fixtures',
+         lambda: _parse_docs(fixture_docs(['html', 'pmc'])),
+         lambda args: getters.ElsevierHTMLGetter().check_access(*args)),
+    Case('check_access.pdf',
+         lambda: [(doc, None) for doc in fixture_docs(['pdf'])],
+         lambda args: getters.MetaPDFGetter().check_access(*args)),
+    Case('check_access.large',
+         lambda: _parse_docs([synthetic_html()]),
+         lambda args: getters.ElsevierHTMLGetter().check_access(*args)),
+    Case('ispdf.fixtures',
+         lambda: fixture_docs(['html', 'pdf']),
+         utils.ispdf),
+    Case('ispdf.large',
+         lambda: [synthetic_pdf()],
+         utils.ispdf),
+    Case('parse.synthetic',
+         lambda: [sciparse.PDFTableParse(StaticExtractor(synthetic_pdfx()))],
+         lambda parser: parser.parse(None)),
+]
+
+###########
+# Running #
+###########
+
+def _measure(case, repeat):
+    '''Run a benchmark case in the current process.'''
+
+    inputs = case.setup()
+
+    # Warm up
+    for value in inputs:
+        case.func(value)
+
+    # Count gc-tracked objects still alive after each call, e.g. cache
+    # entries; this is not an allocation count, since objects freed
+    # during the call are missed
+    gc.collect()
+    gc.disable()
+    try:
+        objects_before = len(gc.get_objects())
+        start = time.time()
+        for _ in range(repeat):
+            for value in inputs:
+                case.func(value)
+        seconds = time.time() - start
+        objects_after = len(gc.get_objects())
+    finally:
+        gc.enable()
+
+    calls = repeat * len(inputs)
+    return {
+        'calls': calls,
+        'seconds_per_call': seconds / calls,
+        'retained_objects_per_call':
+            (objects_after - objects_before) / float(calls),
+        'peak_kb': peak_kb(),
+    }
+
+def peak_kb():
+    '''Peak resident memory of the current process in KB, including the
+    interpreter and imports. Benchmark cases each run in their own
+    process, so this is the peak for one case.'''
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on OS X and KB on Linux
+    if sys.platform == 'darwin':
+        peak //= 1024
+    return peak
+
+def _child(case_name, repeat, queue):
+    case = [case for case in cases if case.name == case_name][0]
+    try:
+        queue.put(_measure(case, repeat))
+    except Exception as error:
+        queue.put({'error': repr(error)})
+
+def run(names=None, repeat=5):
+    '''Run benchmark cases, each in a fresh process.
+
+    :param names: Optional list of case name prefixes to run
+    :param repeat: Number of passes over each case's inputs
+    :return: Dictionary mapping case names to results
+
+    '''
+    results = {}
+    for case in cases:
+        if names and not any(case.name.startswith(name) for name in names):
+            continue
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=_child, args=(case.name, repeat, queue)
+        )
+        process.start()
+        results[case.name] = queue.get()
+        process.join()
+    return results
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    '''Compare results to a baseline.
+
+    :return: List of (case name, baseline seconds, current seconds,
+        ratio) tuples for cases slower than the baseline by more than
+        tolerance
+
+    '''
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in baseline or 'error' in result:
+            continue
+        old = baseline[name]['seconds_per_call']
+        new = result['seconds_per_call']
+        if old and new / old > 1 + tolerance:
+            regressions.append((name, old, new, new / old))
+    return regressions
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_baseline(results, path=BASELINE_PATH):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+def format_report(results, baseline=None):
+
+    baseline = baseline or {}
+    lines = ['{:<24}{:>14}{:>14}{:>12}{:>10}'.format(
+        'case', 'ms/call', 'retained/call', 'peak KB', 'vs base')]
+    for name, result in sorted(results.items()):
+        if 'error' in result:
+            lines.append('{:<24}{}'.format(name, result['error']))
+            continue
+        ratio = '-'
+        if name in baseline and baseline[name]['seconds_per_call']:
+            ratio = '{:.2f}x'.format(
+                result['seconds_per_call'] /
+                baseline[name]['seconds_per_call']
+            )
+        lines.append('{:<24}{:>14.3f}{:>14.1f}{:>12}{:>10}'.format(
+            name,
+            result['seconds_per_call'] * 1000,
+            result['retained_objects_per_call'],
+            result['peak_kb'],
+            ratio,
+        ))
+    return '\n'.join(lines)
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--only', nargs='*', help='case name prefixes')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--save', action='store_true',
+                        help='save results as the new baseline')
+    args = parser.parse_args(argv)
+
+    results = run(args.only, args.repeat)
+    baseline = load_baseline(args.baseline)
+    print format_report(results, baseline)
+
+    if args.save:
+        save_baseline(results, args.baseline)
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    for name, old, new, ratio in regressions:
+        print 'REGRESSION %s: %.3fms -> %.3fms (%.2fx)' % (
+            name, old * 1000, new * 1000, ratio
+        )
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,226 @@
+'''
+Offline throughput benchmark for the full scrape pipeline. Responses for
+the publishers in tests/fixtures.py are recorded once into cassettes, then
+replayed from a local CassetteServer at a configurable concurrency, so
+that performance changes can be measured without the network.
+
+Usage (from the repository root):
+    python -m sciscrape.benchmarks.scrapebench record cassettes
+    python -m sciscrape.benchmarks.scrapebench run cassettes --concurrency 4
+    python -m sciscrape.benchmarks.scrapebench serve cassettes --port 8000
+'''
+
+# Imports
+import os
+import glob
+import time
+import argparse
+import collections
+import multiprocessing
+
+# Project imports
+from sciscrape.scrapetools import scrape
+from sciscrape.utils import replay
+from sciscrape.utils import metrics
+from sciscrape.utils import utils
+
+def load_fixtures():
+    '''Load publisher fixtures from tests/fixtures.py.'''
+    from tests.fixtures import fixtures
+    return fixtures
+
+def cassette_path(cassette_dir, fixture):
+    return os.path.join(
+        cassette_dir,
+        '{}_{}.json'.format(fixture.publisher, fixture.pmid),
+    )
+
+def load_cassettes(cassette_dir):
+    '''Merge all cassettes in a directory.'''
+    cassette = replay.Cassette()
+    for path in sorted(glob.glob(os.path.join(cassette_dir, '*.json'))):
+        cassette.update(replay.Cassette.load(path))
+    return cassette
+
+def record(cassette_dir, fixtures=None):
+    '''Scrape each fixture over the network and save its responses.
+
+    :param cassette_dir: Output directory for cassettes
+    :param fixtures: List of ScrapeFixture objects; defaults to
+        tests.fixtures.fixtures
+    :return: Dictionary mapping cassette paths to ScrapeInfo status
+
+    '''
+    fixtures = fixtures or load_fixtures()
+    utils.mkdir_p(cassette_dir)
+
+    recorded = {}
+    for fixture in fixtures:
+        cassette = replay.Cassette()
+        scraper = scrape.RecordScrape(cassette=cassette)
+        try:
+            info = scraper.scrape_link(fixture.start_url, pmid=fixture.pmid)
+            status = info.status
+        except Exception as error:
+            status = repr(error)
+        path = cassette_path(cassette_dir, fixture)
+        cassette.save(path)
+        recorded[path] = status
+
+    return recorded
+
+def _quantile(values, q):
+    ordered = sorted(values)
+    idx = min(int(q * len(ordered)), len(ordered) - 1)
+    return ordered[idx]
+
+def summarize(results, seconds):
+    '''Summarize replayed articles.
+
+    :param results: List of dictionaries with "status" (ScrapeInfo.status)
+        and "spans" (list of (name, duration) pairs) keys
+    :param seconds: Wall-clock duration of the run
+    :return: Dictionary of throughput, outcome, and stage statistics
+
+    '''
+    durations = collections.defaultdict(list)
+    outcomes = collections.Counter()
+    for result in results:
+        for name, duration in result['spans']:
+            durations[name].append(duration)
+        for status in result['status'].values():
+            outcomes[metrics.classify_status(status)] += 1
+
+    stages = {}
+    for name, values in durations.items():
+        stages[name] = {
+            'count': len(values),
+            'mean': sum(values) / len(values),
+            'p50': _quantile(values, 0.5),
+            'p95': _quantile(values, 0.95),
+        }
+
+    return {
+        'articles': len(results),
+        'seconds': seconds,
+        'articles_per_second': len(results) / seconds if seconds else None,
+        'outcomes': dict(outcomes),
+        'stages': stages,
+    }
+
+# Per-process scraper; see _init_worker
+_scraper = None
+
+def _init_worker(server_url):
+    global _scraper
+    _scraper = scrape.ReplayScrape(server_url=server_url)
+
+def _replay(task):
+    '''Replay a single article in a worker process.'''
+    start_url, pmid = task
+    try:
+        info = _scraper.scrape_link(start_url, pmid=pmid)
+    except Exception:
+        info = _scraper.info
+    return {
+        'status': info.status,
+        'spans': [(span.name, span.duration) for span in info.timings.spans],
+    }
+
+def run(cassette_dir, concurrency=1, repeat=1, fixtures=None):
+    '''Replay recorded fixtures through the scrape pipeline.
+
+    Note: Scrapers run in separate worker processes rather than threads,
+    since PyQuery callbacks are not thread-safe.
+
+    :param cassette_dir: Directory of cassettes written by record()
+    :param concurrency: Number of concurrent scraper processes
+    :param repeat: Number of times to replay each fixture
+    :param fixtures: List of ScrapeFixture objects; defaults to
+        tests.fixtures.fixtures
+    :return: Summary dictionary; see summarize()
+
+    '''
+    fixtures = [
+        fixture
+        for fixture in fixtures or load_fixtures()
+        if os.path.exists(cassette_path(cassette_dir, fixture))
+    ]
+    tasks = [
+        (fixture.start_url, fixture.pmid)
+        for _ in range(repeat)
+        for fixture in fixtures
+    ]
+
+    server = replay.CassetteServer(load_cassettes(cassette_dir))
+    server.start()
+
+    pool = multiprocessing.Pool(
+        concurrency, initializer=_init_worker, initargs=(server.url,)
+    )
+    start = time.time()
+    try:
+        results = list(pool.imap_unordered(_replay, tasks))
+        seconds = time.time() - start
+    finally:
+        pool.terminate()
+        server.shutdown()
+        server.server_close()
+
+    return summarize(results, seconds)
+
+def format_report(summary):
+
+    lines = [
+        'Articles: {articles}'.format(**summary),
+        'Seconds: {seconds:.3f}'.format(**summary),
+        'Articles/s: {articles_per_second:.2f}'.format(**summary)
+            if summary['articles_per_second'] else 'Articles/s: -',
+        'Outcomes: {}'.format(', '.join(
+            '{}={}'.format(key, value)
+            for key, value in sorted(summary['outcomes'].items())
+        )),
+        '',
+        '{:<16}{:>8}{:>10}{:>10}{:>10}'.format(
+            'stage', 'count', 'mean', 'p50', 'p95'),
+    ]
+    for name, stats in sorted(summary['stages'].items()):
+        lines.append('{:<16}{:>8}{:>10.4f}{:>10.4f}{:>10.4f}'.format(
+            name, stats['count'], stats['mean'], stats['p50'], stats['p95'],
+        ))
+    return '\n'.join(lines)
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    subparsers = parser.add_subparsers(dest='command')
+
+    record_parser = subparsers.add_parser('record', help='record cassettes')
+    record_parser.add_argument('cassette_dir')
+
+    run_parser = subparsers.add_parser('run', help='replay cassettes')
+    run_parser.add_argument('cassette_dir')
+    run_parser.add_argument('--concurrency', type=int, default=1)
+    run_parser.add_argument('--repeat', type=int, default=1)
+
+    serve_parser = subparsers.add_parser('serve', help='serve cassettes')
+    serve_parser.add_argument('cassette_dir')
+    serve_parser.add_argument('--port', type=int, default=8000)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        for path, status in sorted(record(args.cassette_dir).items()):
+            print '%s: %s' % (path, status)
+    elif args.command == 'run':
+        summary = run(args.cassette_dir, args.concurrency, args.repeat)
+        print format_report(summary)
+    elif args.command == 'serve':
+        server = replay.CassetteServer(
+            load_cassettes(args.cassette_dir), port=args.port
+        )
+        print 'Serving cassettes at %s' % (server.url)
+        server.serve_forever()
+
+if __name__ == '__main__':
+    main()
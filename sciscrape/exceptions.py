@@ -3,3 +3,8 @@ class BadDOIError(ScrapeError): pass
 class NotFoundError(Exception): pass
 class NoAccessError(Exception): pass
 class BadDocumentError(Exception): pass
+
+# Links rejected by probing before download; not retried
+class ProbeError(Exception): pass
+class ProbeNoAccessError(ProbeError, NoAccessError): pass
+class ProbeBadDocumentError(ProbeError, BadDocumentError): pass
@@ -0,0 +1,260 @@
+'''
+Embedded coordinate database. Stores extracted foci with article ID,
+table number, and coordinate space in SQLite, and answers box and
+radius queries through an R-tree index, so meta-analysis queries don't
+require re-parsing PDFs:
+
+    >>> db = CoordDB('coords.db')
+    >>> db.add_tables('10.1016/j.neuroimage.2010.01.001', tables, space='mni')
+    >>> db.radius((-42, 12, 30), 10)
+
+If SQLite was built without the R-tree module, queries fall back to a
+B-tree index on x.
+'''
+
+# Imports
+import sqlite3
+import numpy as np
+import pandas as pd
+
+# Columns of query results
+COLUMNS = ['article', 'table', 'space', 'x', 'y', 'z']
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS foci (
+    id INTEGER PRIMARY KEY,
+    article TEXT NOT NULL,
+    table_num INTEGER,
+    space TEXT,
+    x REAL NOT NULL,
+    y REAL NOT NULL,
+    z REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS foci_article ON foci (article);
+'''
+
+_RTREE_SCHEMA = '''
+CREATE VIRTUAL TABLE IF NOT EXISTS foci_rtree USING rtree (
+    id, min_x, max_x, min_y, max_y, min_z, max_z
+);
+'''
+
+_FALLBACK_SCHEMA = '''
+CREATE INDEX IF NOT EXISTS foci_x ON foci (x);
+'''
+
+_SELECT = 'SELECT foci.article, foci.table_num, foci.space, foci.x, foci.y, foci.z FROM foci'
+
+def has_rtree(conn):
+    '''Check whether an SQLite connection supports R-tree tables.'''
+    try:
+        conn.execute('CREATE VIRTUAL TABLE temp._rtree_check USING rtree (id, a, b)')
+        conn.execute('DROP TABLE temp._rtree_check')
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+class CoordDB(object):
+    '''SQLite store of coordinates with spatial queries.'''
+
+    def __init__(self, path=':memory:', rtree=True):
+        '''
+        Args:
+            path (str) : Database file; defaults to an in-memory database
+            rtree (bool) : Use an R-tree index if available
+
+        '''
+        self.path = path
+        self.conn = sqlite3.connect(path)
+
+        with self.conn:
+            self.conn.executescript(_SCHEMA)
+            self.rtree = rtree and has_rtree(self.conn)
+            if self.rtree:
+                self.conn.executescript(_RTREE_SCHEMA)
+            else:
+                self.conn.executescript(_FALLBACK_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM foci').fetchone()[0]
+
+    def articles(self):
+        '''Get sorted IDs of stored articles.'''
+        return [
+            row[0] for row in
+            self.conn.execute('SELECT DISTINCT article FROM foci ORDER BY article')
+        ]
+
+    def add_coords(self, rows):
+        '''Add coordinates in bulk.
+
+        Args:
+            rows : Iterable of (article, table, space, x, y, z) tuples
+        Returns:
+            Number of coordinates added
+
+        '''
+        with self.conn:
+            start = self.conn.execute(
+                'SELECT COALESCE(MAX(id), 0) FROM foci'
+            ).fetchone()[0]
+            cursor = self.conn.executemany(
+                'INSERT INTO foci (article, table_num, space, x, y, z) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            # Index new rows in one statement
+            if self.rtree:
+                self.conn.execute(
+                    'INSERT INTO foci_rtree '
+                    'SELECT id, x, x, y, y, z, z FROM foci WHERE id > ?',
+                    (start,)
+                )
+        return cursor.rowcount
+
+    def add_tables(self, article, tables, space=None):
+        '''Add coordinates from parsed tables, replacing any previously
+        stored for the article.
+
+        Args:
+            article (str) : Article ID, e.g. DOI or PMID
+            tables (list) : Table instances from PDFTableParse.parse
+            space (str) : Coordinate space, e.g. "mni" or "tal"; defaults
+                to each table's detected space
+        Tables are stored under their number from the document, or
+        their position if they have none, as in corpus.parse_corpus.
+
+        Returns:
+            Number of coordinates added
+
+        '''
+        self.remove_article(article)
+        return self.add_coords(
+            (article,
+             table.number if table.number is not None else table_idx,
+             space or table.space, x, y, z)
+            for table_idx, table in enumerate(tables)
+            for x, y, z in table.array.tolist()
+        )
+
+    def add_frame(self, coords, space=None):
+        '''Add coordinates from a DataFrame, e.g. from
+        corpus.parse_corpus. Articles are identified by the "article"
+        column, or by "file" if absent.
+
+        Returns:
+            Number of coordinates added
+
+        '''
+        article_col = 'article' if 'article' in coords.columns else 'file'
+        spaces = coords['space'] if 'space' in coords.columns \
+            else [space] * len(coords)
+        return self.add_coords(zip(
+            coords[article_col].tolist(),
+            coords['table'].tolist(),
+            list(spaces),
+            coords['x'].tolist(),
+            coords['y'].tolist(),
+            coords['z'].tolist(),
+        ))
+
+    def remove_article(self, article):
+        '''Remove all coordinates for an article.'''
+        with self.conn:
+            if self.rtree:
+                self.conn.execute(
+                    'DELETE FROM foci_rtree WHERE id IN '
+                    '(SELECT id FROM foci WHERE article = ?)',
+                    (article,)
+                )
+            self.conn.execute('DELETE FROM foci WHERE article = ?', (article,))
+
+    def _query(self, lower, upper, space=None, extra='', params=()):
+        '''Get coordinates within a box, plus optional extra conditions.
+
+        The R-tree stores 32-bit bounds rounded outward, so candidates are
+        re-checked against the exact stored values.
+
+        '''
+        bounds = [
+            value
+            for lo, hi in zip(lower, upper)
+            for value in (float(lo), float(hi))
+        ]
+        conditions = [
+            'foci.x BETWEEN ? AND ?',
+            'foci.y BETWEEN ? AND ?',
+            'foci.z BETWEEN ? AND ?',
+        ]
+        if self.rtree:
+            sql = _SELECT + ' JOIN foci_rtree ON foci.id = foci_rtree.id WHERE ' + \
+                'min_x <= ? AND max_x >= ? AND ' \
+                'min_y <= ? AND max_y >= ? AND ' \
+                'min_z <= ? AND max_z >= ? AND '
+            args = [bounds[1], bounds[0], bounds[3], bounds[2], bounds[5], bounds[4]]
+        else:
+            sql = _SELECT + ' WHERE '
+            args = []
+        sql += ' AND '.join(conditions)
+        args += bounds
+        if space is not None:
+            sql += ' AND foci.space = ?'
+            args.append(space)
+        sql += extra
+        args.extend(params)
+
+        rows = self.conn.execute(sql, args).fetchall()
+        foci = pd.DataFrame(rows, columns=COLUMNS)
+
+        # Keep numeric dtypes for empty results
+        for col in ['x', 'y', 'z']:
+            foci[col] = foci[col].astype(float)
+        return foci
+
+    def box(self, lower, upper, space=None):
+        '''Get coordinates inside an axis-aligned box.
+
+        Args:
+            lower : (x, y, z) lower corner
+            upper : (x, y, z) upper corner
+            space (str) : Restrict to a coordinate space
+        Returns:
+            DataFrame with COLUMNS
+
+        '''
+        return self._query(lower, upper, space)
+
+    def radius(self, point, radius, space=None):
+        '''Get coordinates within `radius` of a point.
+
+        Args:
+            point : (x, y, z) center
+            radius (float) : Search radius, e.g. in mm
+            space (str) : Restrict to a coordinate space
+        Returns:
+            DataFrame with COLUMNS plus "distance", sorted by distance
+
+        '''
+        x, y, z = [float(value) for value in point]
+        lower = (x - radius, y - radius, z - radius)
+        upper = (x + radius, y + radius, z + radius)
+        extra = ' AND (foci.x - ?) * (foci.x - ?) + ' \
+            '(foci.y - ?) * (foci.y - ?) + ' \
+            '(foci.z - ?) * (foci.z - ?) <= ?'
+        params = (x, x, y, y, z, z, float(radius) ** 2)
+
+        foci = self._query(lower, upper, space, extra, params)
+        foci['distance'] = np.sqrt(
+            (foci['x'] - x) ** 2 + (foci['y'] - y) ** 2 + (foci['z'] - z) ** 2
+        )
+        return foci.sort_values(['distance', 'article', 'table'])\
+            .reset_index(drop=True)
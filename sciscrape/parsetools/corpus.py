@@ -0,0 +1,174 @@
+'''
+Parse coordinate tables from a corpus of PDFs across a process pool.
+Workers return compact coordinate rows rather than Table objects, and
+errors are captured per file, so one bad PDF does not stop the run:
+
+    >>> coords, errors = parse_corpus(glob.glob('pdfs/*.pdf'), processes=8)
+
+Usage:
+    python -m sciscrape.parsetools.corpus pdfs/ coords.csv --processes 8
+'''
+
+# Imports
+import os
+import glob
+import argparse
+import traceback
+import collections
+import multiprocessing
+import pandas as pd
+
+# Project imports
+from sciscrape.parsetools import sciparse
+from sciscrape.parsetools import coorddb
+from sciscrape.pdftools import local
+from sciscrape.pdftools import cache
+from sciscrape.pdftools import prescreen
+from sciscrape.pdftools import split
+
+# Columns of coordinate and error DataFrames
+COORD_COLUMNS = ['file', 'table', 'space', 'x', 'y', 'z']
+ERROR_COLUMNS = ['file', 'error']
+
+# Per-process parser; see _init_worker
+_parser = None
+
+def _init_worker(extractor):
+    global _parser
+    _parser = sciparse.PDFTableParse(extractor=extractor)
+
+def _parse_path(path):
+    '''Parse a single PDF in a worker process.
+
+    :return: Tuple of (path, coordinate rows, error, stats); coordinate
+        rows are (path, table number, space, x, y, z) tuples. Tables
+        without a number use their position in the document. stats is the change
+        in the extractor's `stats` counters, if it has any.
+
+    '''
+    stats = getattr(_parser.extractor, 'stats', None)
+    before = collections.Counter(stats)
+    try:
+        with open(path, 'rb') as pdf:
+            tables = _parser.parse(pdf)
+    except Exception:
+        error = traceback.format_exc().strip().split('\n')[-1]
+        return path, [], error, _stats_delta(stats, before)
+
+    rows = [
+        (path, table.number if table.number is not None else table_idx,
+         table.space, x, y, z)
+        for table_idx, table in enumerate(tables)
+        for x, y, z in table.array.tolist()
+    ]
+    return path, rows, None, _stats_delta(stats, before)
+
+def _stats_delta(stats, before):
+    '''Get counters incremented since `before`.'''
+    if stats is None:
+        return collections.Counter()
+    return collections.Counter(stats) - before
+
+def parse_corpus(paths, extractor=None, processes=None, chunksize=8):
+    '''Parse coordinate tables from many PDFs.
+
+    :param paths: List of PDF file paths
+    :param extractor: PDF extractor passed to PDFTableParse; defaults to
+        PDFx. Must be picklable.
+    :param processes: Number of worker processes; defaults to the
+        number of CPUs
+    :param chunksize: Number of PDFs sent to a worker at a time
+    :return: Tuple of (coordinate DataFrame, error DataFrame); see
+        COORD_COLUMNS and ERROR_COLUMNS
+
+    Workers each have a copy of the extractor; if it keeps `stats`
+    counters (e.g. PrescreenExtractor), their totals across workers are
+    added to the stats of `extractor`.
+
+    '''
+    coords = []
+    errors = []
+
+    pool = multiprocessing.Pool(
+        processes, initializer=_init_worker, initargs=(extractor,)
+    )
+    try:
+        for path, rows, error, stats in pool.imap_unordered(
+                _parse_path, paths, chunksize):
+            coords.extend(rows)
+            if error:
+                errors.append((path, error))
+            if stats and hasattr(extractor, 'stats'):
+                extractor.stats.update(stats)
+    finally:
+        pool.terminate()
+
+    return (
+        pd.DataFrame(coords, columns=COORD_COLUMNS),
+        pd.DataFrame(errors, columns=ERROR_COLUMNS),
+    )
+
+def find_pdfs(paths):
+    '''Expand directories to the PDFs they contain.'''
+    pdfs = []
+    for path in paths:
+        if os.path.isdir(path):
+            pdfs.extend(sorted(glob.glob(os.path.join(path, '*.pdf'))))
+        else:
+            pdfs.append(path)
+    return pdfs
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('paths', nargs='+', help='PDF files or directories')
+    parser.add_argument('out_file', help='output CSV file')
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--chunksize', type=int, default=8)
+    parser.add_argument('--local', action='store_true',
+                        help='extract tables locally instead of using PDFx')
+    parser.add_argument('--cache-dir', help='cache extraction results')
+    parser.add_argument('--prescreen', action='store_true',
+                        help='skip PDFs without coordinate-table keywords')
+    parser.add_argument('--split', action='store_true',
+                        help='extract only pages with coordinate-table keywords')
+    parser.add_argument('--db', help='also add coordinates to a CoordDB file')
+    args = parser.parse_args(argv)
+
+    extractor = None
+    if args.local:
+        extractor = local.LocalExtractor()
+    if args.cache_dir:
+        extractor = cache.CachedExtractor(
+            extractor or sciparse.PDFTableParse._extractor_klass(),
+            args.cache_dir
+        )
+    if args.split:
+        extractor = split.PageSplitExtractor(
+            extractor or sciparse.PDFTableParse._extractor_klass()
+        )
+    elif args.prescreen:
+        extractor = prescreen.PrescreenExtractor(
+            extractor or sciparse.PDFTableParse._extractor_klass()
+        )
+
+    coords, errors = parse_corpus(
+        find_pdfs(args.paths), extractor, args.processes, args.chunksize
+    )
+    coords.to_csv(args.out_file, index=False)
+    if args.db:
+        with coorddb.CoordDB(args.db) as db:
+            for path in coords['file'].unique():
+                db.remove_article(path)
+            db.add_frame(coords)
+    if len(errors):
+        base, ext = os.path.splitext(args.out_file)
+        errors.to_csv('%s_errors%s' % (base, ext), index=False)
+
+    print 'Coordinates: %d' % (len(coords))
+    print 'Errors: %d' % (len(errors))
+    for name, count in sorted(getattr(extractor, 'stats', {}).items()):
+        print '%s: %d' % (name, count)
+
+if __name__ == '__main__':
+    main()
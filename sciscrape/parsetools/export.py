@@ -0,0 +1,175 @@
+'''
+Bulk columnar export of parsed tables. Coordinates and raw table cells
+from many articles are buffered and written in chunks to numbered
+Parquet part files, so memory stays bounded and columns can be read
+back selectively:
+
+    >>> with ParquetWriter('out/') as writer:
+    ...     for article, tables in results:
+    ...         writer.add_tables(article, tables)
+    >>> coords = read_coords('out/', columns=['article', 'x', 'y', 'z'])
+
+Layout:
+    out/coords/part-00000.parquet    article, table, space, x, y, z
+    out/cells/part-00000.parquet     article, table, row, col, header, value
+
+Requires pandas with pyarrow or fastparquet, which are imported lazily.
+'''
+
+# Imports
+import os
+import glob
+
+# Columns of exported files
+COORD_COLUMNS = ['article', 'table', 'space', 'x', 'y', 'z']
+CELL_COLUMNS = ['article', 'table', 'row', 'col', 'header', 'value']
+
+def _pandas():
+    '''Import pandas, checking that a Parquet engine is available.'''
+    try:
+        import pyarrow
+    except ImportError:
+        try:
+            import fastparquet
+        except ImportError:
+            raise ImportError(
+                'Parquet export requires pyarrow or fastparquet'
+            )
+    import pandas as pd
+    return pd
+
+def _text(value):
+    '''Convert a cell value to text; numbers use repr for round-tripping.'''
+    if isinstance(value, float):
+        return unicode(repr(value))
+    if isinstance(value, str):
+        return value.decode('utf-8', 'replace')
+    return unicode(value)
+
+class ParquetWriter(object):
+    '''Buffered writer of coordinate and cell part files.'''
+
+    def __init__(self, out_dir, chunk_size=100000, cells=True):
+        '''
+        Args:
+            out_dir (str) : Output directory
+            chunk_size (int) : Number of coordinate or cell rows
+                buffered before writing part files
+            cells (bool) : Also export raw table cells
+
+        '''
+        self.pd = _pandas()
+        self.out_dir = out_dir
+        self.chunk_size = chunk_size
+        self.cells = cells
+
+        self._coords = []
+        self._cells = []
+        self._part = 0
+
+        for name in ['coords', 'cells']:
+            path = os.path.join(out_dir, name)
+            if not os.path.isdir(path):
+                os.makedirs(path)
+
+        # Continue numbering after existing parts
+        existing = glob.glob(os.path.join(out_dir, 'coords', 'part-*.parquet'))
+        if existing:
+            self._part = max(
+                int(os.path.basename(path)[5:10]) for path in existing
+            ) + 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def add_tables(self, article, tables):
+        '''Buffer coordinates and cells from parsed tables.
+
+        Args:
+            article (str) : Article ID, e.g. DOI or PMID
+            tables (list) : Table instances from PDFTableParse.parse
+
+        Tables are written under their number from the document, or
+        their position if they have none, as in corpus.parse_corpus.
+
+        '''
+        for table_idx, table in enumerate(tables):
+            table_num = table.number if table.number is not None \
+                else table_idx
+            self._coords.extend(
+                (article, table_num, table.space, x, y, z)
+                for x, y, z in table.array.tolist()
+            )
+            if self.cells and table.rows:
+                headers = table.headers
+                self._cells.extend(
+                    (article, table_num, row_idx, col_idx,
+                     _text(headers[col_idx]) if col_idx < len(headers) else None,
+                     _text(value))
+                    for row_idx, row in enumerate(table.rows)
+                    for col_idx, value in enumerate(row)
+                )
+
+        if max(len(self._coords), len(self._cells)) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        '''Write buffered rows to new part files.'''
+        if not self._coords and not self._cells:
+            return
+
+        name = 'part-%05d.parquet' % (self._part)
+        self._write(self._coords, COORD_COLUMNS, 'coords', name)
+        if self.cells:
+            self._write(self._cells, CELL_COLUMNS, 'cells', name)
+
+        self._coords = []
+        self._cells = []
+        self._part += 1
+
+    def _write(self, rows, columns, kind, name):
+        frame = self.pd.DataFrame(rows, columns=columns)
+        frame.to_parquet(
+            os.path.join(self.out_dir, kind, name), index=False
+        )
+
+    def close(self):
+        self.flush()
+
+def _read(out_dir, kind, columns):
+    pd = _pandas()
+    paths = sorted(glob.glob(os.path.join(out_dir, kind, 'part-*.parquet')))
+    default = COORD_COLUMNS if kind == 'coords' else CELL_COLUMNS
+    if not paths:
+        return pd.DataFrame(columns=columns or default)
+    return pd.concat(
+        [pd.read_parquet(path, columns=columns) for path in paths],
+        ignore_index=True
+    )
+
+def read_coords(out_dir, columns=None):
+    '''Read exported coordinates.
+
+    Args:
+        out_dir (str) : Directory written by ParquetWriter
+        columns (list) : Columns to read; defaults to all
+    Returns:
+        DataFrame of coordinates
+
+    '''
+    return _read(out_dir, 'coords', columns)
+
+def read_cells(out_dir, columns=None):
+    '''Read exported table cells.
+
+    Args:
+        out_dir (str) : Directory written by ParquetWriter
+        columns (list) : Columns to read; defaults to all
+    Returns:
+        DataFrame of cells
+
+    '''
+    return _read(out_dir, 'cells', columns)
@@ -1,15 +1,20 @@
 '''
-Classes for extracting coordinate tables from PDF documents.
+Classes for extracting coordinate tables from PDF and HTML documents.
 '''
 
 
 # Imports
 import re
+import collections
+import numpy as np
 import pandas as pd
-from pyquery import PyQuery
+import lxml.html
+from lxml import etree
 
 # Project imports
 from sciscrape.pdftools import pdfx
+from sciscrape.parsetools import spatial
+from sciscrape.parsetools import transforms
 
 # Utility functions
 
@@ -22,6 +27,13 @@ def isfloat(s):
     except ValueError:
         return False
 
+def _to_number(label):
+    '''Convert a table label to an int if it is numeric, e.g. "2" -> 2
+    but "S2" -> "S2".'''
+    if label is not None and label.isdigit():
+        return int(label)
+    return label
+
 def get_coord_groups(headers, max_space=2):
     '''Get evenly spaced, ordered groups of x, y, z columns from headers.
     
@@ -65,15 +77,28 @@ class PDFParse(SciParse):
     pass
 
 class Table(object):
+    '''Coordinate table. Coordinates are stored in a contiguous N x 3
+    float array (see Table.array); Table.coords provides a list-like view
+    of Coord-like rows for compatibility.'''
 
     def __init__(self, data_table):
         
         # Initialize coords
-        self.coords = []
+        self._values = np.empty((0, 3))
+        self._ncoords = 0
+
+        # Coordinate space ('mni', 'tal', or None if unknown); see
+        # transforms.detect_space
+        self.space = None
+
+        # Table number from the document, e.g. 2 for "Table 2", or None
+        self.number = None
 
         if not data_table:
             return
 
+        self.number = data_table.get('number')
+
         # Store original data
         self._header = data_table['headers']
         self._data = data_table['data']
@@ -88,31 +113,173 @@ class Table(object):
         # Get coordinate groups
         self._coord_groups = get_coord_groups(self._header)
 
-        # Extract coordinates
+        # Extract coordinates; use numeric columns from
+        # PDFTableParse._to_float if available
+        if 'numeric' in data_table:
+            self._add_numeric_coords(
+                data_table['numeric'], data_table['converted']
+            )
+            return
+
         for row in self._data:
             for coord_group in self._coord_groups:
                 self.add_coord(*[row[coord] for coord in coord_group])
 
+    @property
+    def headers(self):
+        '''Column headers of the parsed table.'''
+        return getattr(self, '_header', [])
+
+    @property
+    def rows(self):
+        '''Cell values of the parsed table, as a list of rows.'''
+        return getattr(self, '_data', [])
+
+    @property
+    def array(self):
+        '''N x 3 array of coordinates. Note: the array is a view, and
+        may stop reflecting the table once coordinates are added.'''
+        return self._values[:self._ncoords]
+
+    @property
+    def coords(self):
+        return CoordList(self)
+
+    @coords.setter
+    def coords(self, coords):
+        self._ncoords = 0
+        self.extend_coords(coords)
+
+    def _reserve(self, count):
+        '''Grow storage to fit `count` more coordinates.'''
+
+        needed = self._ncoords + count
+        if needed > len(self._values):
+            values = np.empty((max(needed, 2 * len(self._values)), 3))
+            values[:self._ncoords] = self.array
+            self._values = values
+
+    def extend_coords(self, coords):
+        '''Append coordinates from an N x 3 array or a sequence of
+        Coord objects or (x, y, z) tuples, without validation.'''
+
+        if not isinstance(coords, np.ndarray):
+            coords = [
+                (coord.x, coord.y, coord.z) if hasattr(coord, 'x') else coord
+                for coord in coords
+            ]
+        coords = np.asarray(coords, dtype=float).reshape(-1, 3)
+
+        self._reserve(len(coords))
+        self._values[self._ncoords:self._ncoords + len(coords)] = coords
+        self._ncoords += len(coords)
+
+    def _add_numeric_coords(self, numeric, converted):
+        '''Add coordinates from arrays of float cell values and of flags
+        marking which cells were numeric. Coordinates are added in row
+        order, skipping those with a non-numeric x, y, or z.'''
+
+        if not self._coord_groups:
+            return
+
+        # Arrays of shape (rows, groups, 3)
+        values, valid = [
+            np.stack([
+                array[:, coord_group]
+                for coord_group in self._coord_groups
+            ], axis=1)
+            for array in [numeric, converted]
+        ]
+        valid = valid.all(axis=2)
+
+        self.extend_coords(values[valid])
+
     def __eq__(self, other):
+        '''Tables are equal if they contain the same set of coordinates.'''
 
-        for coord in self.coords:
-            if coord not in other.coords:
-                return False
+        if not isinstance(other, Table):
+            return NotImplemented
 
-        for coord in other.coords:
-            if coord not in self.coords:
-                return False
+        this = spatial.unique_rows(self.array)
+        that = spatial.unique_rows(other.array)
+        return this.shape == that.shape and bool((this == that).all())
 
-        return True
+    def __ne__(self, other):
+
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
 
     def add_coord(self, x, y, z):
 
         coord = Coord(x, y, z)
         if coord.validate():
-            self.coords.append(coord)
+            self.extend_coords([(coord.x, coord.y, coord.z)])
+
+class CoordList(object):
+    '''List-like view of the coordinates in a Table. Items are CoordRow
+    views into the table's array.'''
+
+    __slots__ = ('_table',)
+
+    def __init__(self, table):
+        self._table = table
+
+    def __len__(self):
+        return self._table._ncoords
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[idx] for idx in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('coordinate index out of range')
+        return CoordRow(self._table, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield CoordRow(self._table, index)
+
+    def __contains__(self, coord):
+        target = np.array([coord.x, coord.y, coord.z], dtype=float)
+        return bool((self._table.array == target).all(axis=1).any())
+
+    def __eq__(self, other):
+        try:
+            if len(other) != len(self):
+                return False
+            other = [(coord.x, coord.y, coord.z) for coord in other]
+        except (TypeError, AttributeError):
+            return NotImplemented
+        return self._table.array.tolist() == [list(coord) for coord in other]
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def append(self, coord):
+        self._table.extend_coords([coord])
+
+    def extend(self, coords):
+        self._table.extend_coords(coords)
+
+    def __repr__(self):
+        return repr(list(self))
 
 class Coord(object):
 
+    __slots__ = ('x', 'y', 'z')
+
     def __init__(self, x, y, z):
 
         self.x = x
@@ -125,6 +292,18 @@ class Coord(object):
                self.y == other.y and \
                self.z == other.z
 
+    def __ne__(self, other):
+
+        return not self == other
+
+    def __hash__(self):
+
+        return hash((self.x, self.y, self.z))
+
+    def __reduce__(self):
+
+        return (Coord, (self.x, self.y, self.z))
+
     def validate(self):
 
         # Check for non-numeric values
@@ -143,24 +322,110 @@ class Coord(object):
         return 'Coord(%r, %r, %r)' % \
             (self.x, self.y, self.z)
 
+class CoordRow(Coord):
+    '''Coord backed by a row of a Table's array.'''
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def _get(axis):
+        def get(self):
+            return float(self._table._values[self._index, axis])
+        def set(self, value):
+            self._table._values[self._index, axis] = value
+        return property(get, set)
+
+    x = _get(0)
+    y = _get(1)
+    z = _get(2)
+
+    del _get
+
 class PDFTableParse(PDFParse):
     
     # Translation table
     _trans = [ 
         [u'[\x80-\xff]+', '-'],
     ]   
+
+    # Extractor class
+    _extractor_klass = pdfx.PDFExtractor
+
+    def __init__(self, extractor=None):
+        '''
+        Args:
+            extractor : object with an extract(pdf) method returning
+                        PDFx-style parsed XML; defaults to an instance
+                        of _extractor_klass, if set
+        '''
+        if extractor is None and self._extractor_klass is not None:
+            extractor = self._extractor_klass()
+        self.extractor = extractor
+        self._trans_compiled = [
+            (re.compile(pattern), repl)
+            for pattern, repl in self._trans
+        ]
     
     @staticmethod
-    def _get_text():
-        return PyQuery(this).text()
+    def _get_text(element):
+        '''Get text of an element and its descendants, matching
+        PyQuery.text(): stripped text nodes joined by spaces,
+        excluding comments and the element's own tail.'''
+
+        # Fast path: cell containing only text
+        if not len(element):
+            text = element.text
+            return text.strip() if text else ''
+
+        texts = []
+        stack = [(element, False)]
+        while stack:
+            node, tail = stack.pop()
+            if tail:
+                texts.append(node.tail)
+                continue
+            if node.text and not isinstance(node, etree._Comment):
+                texts.append(node.text)
+            # Visit children in order, each followed by its tail
+            for child in reversed(node):
+                if child.tail:
+                    stack.append((child, True))
+                stack.append((child, False))
+
+        return ' '.join([text.strip() for text in texts if text.strip()])
+
+    def _translate(self, text):
+        for pattern, repl in self._trans_compiled:
+            text = pattern.sub(repl, text)
+        return text
 
     def parse(self, pdf):
         
         # PDF -> XML
-        qpdf = pdfx.PDFExtractor().extract(pdf)
+        qpdf = self.extractor.extract(pdf)
+
+        # XML -> Coord tables
+        return self.parse_xml(qpdf)
+
+    def parse_xml(self, qpdf):
+        '''Get coordinate tables from parsed extractor output.
+
+        Args:
+            qpdf : PDFx-style parsed XML, e.g. from extractor.extract()
+        Returns:
+            List of Table instances
+
+        '''
 
         # Get XML tables
-        xml_tables = qpdf('table')
+        xml_tables = [
+            table
+            for root in qpdf
+            for table in root.iter('table')
+        ]
         xml_tables = self._consolidate_tables(xml_tables)
         
         # XML tables -> Data tables
@@ -178,14 +443,22 @@ class PDFTableParse(PDFParse):
             if not self._is_mri_table(data_table):
                 continue
 
+            # Detect coordinate space before headers are cleaned / split
+            space = transforms.detect_space(
+                data_table['headers'] + [data_table.get('context', '')]
+            )
+
             # Apply post-processing functions
             self._clean_headers(data_table)
+            self._to_frame(data_table)
             self._split_cols(data_table)
             self._sort_cols(data_table)
             self._to_float(data_table)
+            self._from_frame(data_table)
             
             # Convert data table to coord table
             coord_table = Table(data_table)
+            coord_table.space = space
 
             # Clear tables with all positive coordinates
             # May indicate that negative signs were lost in
@@ -199,91 +472,86 @@ class PDFTableParse(PDFParse):
         # Return coordinate tables
         return coord_tables
 
-    def _parse_table(self, table):
+    def _parse_table(self, tables):
+        '''Parse a group of <table> elements sharing a number into a
+        data table.
 
-        # Initialize table
-        parsed_rows = []
-        
-        # Parse table
-        qtable = PyQuery(table)
+        Args:
+            tables (list) : <table> elements
+        Returns:
+            Dictionary of headers and data rows, or None if no
+            headers were found
+
+        '''
 
         # Get headers
-        headers = self._get_headers(qtable)
+        headers = self._get_headers(tables)
         if not headers:
             return
 
-        # Get rows
-        rows = qtable.find('tr')
+        # Initialize table
+        parsed_rows = []
 
         # Loop over rows
-        for row in rows:
-
-            # Get columns
-            qrow = PyQuery(row)
-            cols = qrow.find('td').map(self._get_text)[:]
+        for table in tables:
+            for row in table.iter('tr'):
 
-            # Parse column values
-            for colidx in range(len(cols)):
-                col = reduce(
-                    lambda x, y: re.sub(y[0], y[1], x),
-                    self._trans,
-                    cols[colidx]
-                )
-                cols[colidx] = col
+                # Get and clean columns
+                cols = [
+                    self._translate(self._get_text(col))
+                    for col in row.iter('td')
+                ]
 
-            # Append parsed columns
-            if cols:
-                parsed_rows.append(cols)
+                # Append parsed columns
+                if cols:
+                    parsed_rows.append(cols)
 
         return {
             'headers' : headers,
             'data' : parsed_rows,
+            'context' : self._get_context(tables),
+            'number' : self._get_number(tables),
         }
 
-    def _consolidate_tables(self, qtables):
+    def _consolidate_tables(self, tables):
         '''When tables are split across pages, PDFX assigns them the same
-        "number" attribute. This method identifies unique table groups by number,
-        then groups all tables by number.'''
+        "number" attribute. This method groups tables by number in a
+        single pass, preserving document order within each group.
 
-        # Get table numbers
-        numbers = [PyQuery(t).attr('number') for t in qtables]
-        #numbers = map(int, numbers)
+        Returns:
+            List of lists of <table> elements, ordered by number
 
-        # Initialize consolidated tables
-        ctables = []
+        '''
 
-        # Loop over unique table numbers
-        for number in sorted(set(numbers)):
-            ntables = [PyQuery(qtables[t]) for t in range(len(numbers)) if
-                           numbers[t] == number]
-            ctable = reduce(lambda x, y: x + y, ntables)
-            ctables.append(ctable)
+        groups = collections.defaultdict(list)
+        for table in tables:
+            groups[table.get('number')].append(table)
 
-        # Return consolidated tables
-        return ctables
+        return [groups[number] for number in sorted(groups)]
     
     # Max number of <thead> / <tr> tags to check
     # for headers
     _max_header_tries = 5
 
-    def _get_headers(self, xml_table):
+    def _get_headers(self, tables):
         '''Extract headers from table. Headers may be stored in the
         <thead> element, or in one or more <tr> elements, or in an
         <h1 class="table"> element preceding the table. This method checks
         all of the above until it finds a valid table header (verified
         using the _is_mri_header() method).'''
         
-        # Parse table
-        qtable = PyQuery(xml_table)
-
         # Get headers from <thead> / <tr> tags
         
         # Get <thead> / <tr> tags
-        trs = qtable('thead,tr')
+        trs = [
+            tr
+            for table in tables
+            for tr in table.iter('thead', 'tr')
+        ]
 
         # Check up to _max_header_tries or the number of
         # <thead> / <tr> tags, whichever is least
-        ntry = min(trs.length, self._max_header_tries)
+        ntry = min(len(trs), self._max_header_tries)
         
         # Loop over rows in reverse order
         # Deals with empty / incomplete headers at the
@@ -291,15 +559,17 @@ class PDFTableParse(PDFParse):
         for tryidx in range(0, ntry)[::-1]:
             
             # Extract text from <th> / <td> children
-            headers = PyQuery(trs[tryidx])('th,td')\
-                .map(self._get_text)[:]
+            headers = [
+                self._get_text(cell)
+                for cell in trs[tryidx].iter('th', 'td')
+            ]
             
             # Done if current value is a valid header
             if self._is_mri_header(headers):
                 return headers
 
         # Get headers from <h1 class="table"> tags
-        h1_table = qtable.prev('h1.table').text()
+        h1_table = self._get_caption(tables)
         if h1_table:
             headers = re.split('\s+', h1_table)
             # Done if current value is a valid header
@@ -309,6 +579,35 @@ class PDFTableParse(PDFParse):
         # No headers found
         return []
 
+    def _get_caption(self, tables):
+        '''Get text of <h1 class="table"> captions preceding tables.'''
+
+        captions = [
+            self._get_text(table.getprevious())
+            for table in tables
+            if pdfx.is_table_caption(table.getprevious())
+        ]
+        return ' '.join([caption for caption in captions if caption])
+
+    def _get_number(self, tables):
+        '''Get the table number PDFx assigns to tables.'''
+        return _to_number(tables[0].get('number'))
+
+    def _get_context(self, tables):
+        '''Get caption and header-area text of tables, e.g. to detect
+        the coordinate space from "MNI coordinates" above the x / y / z
+        headers.'''
+
+        trs = [
+            tr
+            for table in tables
+            for tr in table.iter('thead', 'tr')
+        ][:self._max_header_tries]
+        return ' '.join(
+            [self._get_caption(tables)] +
+            [self._get_text(tr) for tr in trs]
+        )
+
     def _clean_headers(self, data_table):
         '''Clean up headers.'''
         
@@ -363,9 +662,43 @@ class PDFTableParse(PDFParse):
         ),
     ]
 
+    def _to_frame(self, data_table):
+        '''Store data rows as a 2-D object array of cell strings, for the
+        column-wise post-processing functions below. Short rows are
+        padded with empty strings.'''
+
+        rows = data_table['data']
+        ncols = max([len(row) for row in rows] + [len(data_table['headers'])])
+
+        frame = np.empty((len(rows), ncols), dtype=object)
+        frame[:] = ''
+        for ridx, row in enumerate(rows):
+            frame[ridx, :len(row)] = row
+
+        data_table['frame'] = frame
+
+    def _from_frame(self, data_table):
+        '''Copy processed cell values back to data rows.'''
+
+        data_table['data'] = data_table['frame'].tolist()
+
+    @staticmethod
+    def _float_column(cells):
+        '''Convert a column of cells to floats, or return None if any
+        cell is not numeric.'''
+        try:
+            return cells.astype(float)
+        except ValueError:
+            return None
+
+    # Separators for multi-value columns
+    _split_pattern = re.compile(r'[\s,;:]+')
+
     def _split_cols(self, data_table):
         '''Split multi-value columns (MNI Coordinates; x,y,z, ...)'''
 
+        frame = data_table['frame']
+
         # Identify columns to be split
         splits = []
         for idx, val in enumerate(data_table['headers']):
@@ -377,18 +710,26 @@ class PDFTableParse(PDFParse):
         # Split columns
         # Note: Apply splits in reverse order to avoid
         # messing up earlier columns
-        for split in splits[::-1]:
-            cidx = split[0]
-            data_table['headers'][cidx:cidx+1] = split[1].subcells
-            for ridx, row in enumerate(data_table['data']):
-                # Split coordinates
-                val_split = re.split('[\s,;:]+', row[cidx])
-                # Pad values with empty strings
-                val_split += [''] * (len(split[1].subcells) - len(val_split))
-                # Update row
-                row[cidx:cidx+1] = val_split
-                # Update table
-                data_table['data'][ridx] = row
+        for cidx, splitter in splits[::-1]:
+            nsub = len(splitter.subcells)
+            data_table['headers'][cidx:cidx+1] = splitter.subcells
+            # Split coordinates; pad values with empty strings and
+            # drop values beyond the number of subcells
+            vals = [
+                self._split_pattern.split(cell)
+                for cell in frame[:, cidx]
+            ]
+            split = np.empty((len(frame), nsub), dtype=object)
+            split[:] = ''
+            for ridx, val_split in enumerate(vals):
+                val_split = val_split[:nsub]
+                split[ridx, :len(val_split)] = val_split
+            frame = np.hstack([frame[:, :cidx], split, frame[:, cidx+1:]])
+
+        data_table['frame'] = frame
+
+    # Separators for values stuck together in coordinate columns
+    _sort_pattern = re.compile(r'[\s,]+')
 
     def _sort_cols(self, data_table):
         '''In some tables, X and Y coordinates, Y and Z coordinates,
@@ -399,40 +740,78 @@ class PDFTableParse(PDFParse):
         
         '''
 
-        # Get coordinate groups
-        coord_groups = get_coord_groups(data_table['headers'])
+        frame = data_table['frame']
 
-        # Loop over rows
-        for ridx, row in enumerate(data_table['data']):
-            for coord_group in coord_groups:
-                # Get coordinate values
-                vals = [row[coord] for coord in coord_group]
+        # Loop over coordinate groups
+        for coord_group in get_coord_groups(data_table['headers']):
+
+            cols = frame[:, coord_group]
+
+            # Skip groups whose values are all single numbers
+            if self._float_column(cols) is not None:
+                continue
+
+            for ridx, vals in enumerate(cols.tolist()):
                 # Join values by space
                 val_str = ' '.join(vals)
                 # Split value string by space / comma
-                val_split = re.split('[\s,]+', val_str)
+                val_split = self._sort_pattern.split(val_str)
                 # If we get three values back, reassign
                 # to X, Y, Z headers
                 if len(val_split) == 3:
-                    for cidx, coord in enumerate(coord_group):
-                        row[coord] = val_split[cidx]
-                    # Replace original row
-                    data_table['data'][ridx] = row
+                    frame[ridx, coord_group] = val_split
+
+    _rep_chars = re.compile(r'[\*,]')
+
+    # Cleaned values that float() accepts
+    _float_pattern = re.compile(
+        r'^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$'
+    )
 
-    _rep_chars = '[\*,]'
+    # Other cleaned values that float() may accept: nan, inf, and
+    # non-ASCII digits or whitespace
+    _float_fallback_pattern = re.compile(r'nan|inf|[^\x00-\x7f]', re.I)
 
     def _to_float(self, data_table):
-        '''Convert cell values to float.'''
-
-        for ridx, row in enumerate(data_table['data']):
-            for cidx, col in enumerate(row):
-                col = re.sub(self._rep_chars, '', col)
-                try:
-                    col = float(col)
-                    row[cidx] = col
-                except ValueError:
-                    pass
-            data_table['data'][ridx] = row
+        '''Convert cell values to float. Whole columns are converted at
+        once where possible. Also stores arrays of float values (NaN where
+        not numeric) and of conversion flags as "numeric" and
+        "converted", for vectorized coordinate extraction.'''
+
+        frame = data_table['frame']
+        numeric = np.full(frame.shape, np.nan)
+        converted = np.zeros(frame.shape, dtype=bool)
+
+        for cidx in range(frame.shape[1]):
+
+            cells = frame[:, cidx]
+
+            # Remove extra characters
+            if any('*' in cell or ',' in cell for cell in cells):
+                cells = np.array([
+                    self._rep_chars.sub('', cell) for cell in cells
+                ], dtype=object)
+
+            # Fast path: every value in the column is a float
+            values = self._float_column(cells)
+            if values is not None:
+                numeric[:, cidx] = values
+                converted[:, cidx] = True
+                frame[:, cidx] = values.tolist()
+                continue
+
+            # Otherwise, convert cells that look like floats
+            for ridx, cell in enumerate(cells):
+                if self._float_pattern.match(cell) or \
+                        self._float_fallback_pattern.search(cell):
+                    try:
+                        numeric[ridx, cidx] = frame[ridx, cidx] = float(cell)
+                        converted[ridx, cidx] = True
+                    except ValueError:
+                        pass
+
+        data_table['numeric'] = numeric
+        data_table['converted'] = converted
 
     # Header patterns indicating fMRI activation table
     _mri_header_patterns = [
@@ -475,5 +854,241 @@ class PDFTableParse(PDFParse):
         
         '''
 
-        return all([c.x >= 0 and c.y >= 0 and c.z >= 0 for c in coord_table.coords])
+        with np.errstate(invalid='ignore'):
+            return bool((coord_table.array >= 0).all())
+
+
+class HTMLTableParse(PDFTableParse):
+    '''Extract coordinate tables from full-text HTML, e.g. publisher or
+    PubMed Central pages. Tables are read from <table> markup directly,
+    so no PDF conversion is needed; header detection, column splitting,
+    and coordinate extraction are shared with PDFTableParse.'''
+
+    # Translation table: normalize spaces, then dashes and minus signs
+    _trans = [
+        [u'\xa0', ' '],
+        [u'[\u2010-\u2015\u2212\ufe63\uff0d]', '-'],
+    ] + PDFTableParse._trans
+
+    # Tables are read from HTML, so no extractor is needed
+    _extractor_klass = None
+
+    # Maximum row / column span; guards against malformed attributes
+    _max_span = 100
+
+    def parse(self, html):
+        '''Get coordinate tables from an HTML document.
+
+        Args:
+            html (str) : HTML document
+        Returns:
+            List of Table instances
+
+        '''
+
+        if not html or not html.strip():
+            return []
+
+        # HTML -> XML
+        root = lxml.html.fromstring(html)
+
+        # Drop footnote markers, e.g. "-42<sup>a</sup>"
+        etree.strip_elements(root, 'sup', with_tail=False)
+
+        # XML -> Coord tables
+        return self.parse_xml([root])
+
+    def _consolidate_tables(self, tables):
+        '''HTML tables aren't split across pages, so each table is its
+        own group. Layout tables containing other tables are skipped.
+
+        Returns:
+            List of lists of <table> elements
+
+        '''
+
+        return [
+            [table]
+            for table in tables
+            if table.find('.//table') is None
+        ]
+
+    def _span(self, cell, attr):
+        try:
+            return max(1, min(int(cell.get(attr, 1)), self._max_span))
+        except ValueError:
+            return 1
+
+    def _table_grid(self, table):
+        '''Expand a table into a grid of cells, filling in cells that
+        span multiple rows or columns.
+
+        Returns:
+            List of rows; each row is a list of (cell element, is header,
+            is column copy) tuples. Column copies are the extra positions
+            filled by a cell with colspan > 1.
+
+        '''
+
+        grid = []
+
+        # Cells spanning down from earlier rows: column -> [entry, rows left]
+        pending = {}
+
+        for row in table.iter('tr'):
+
+            entries = []
+
+            def fill_pending():
+                while len(entries) in pending:
+                    col = len(entries)
+                    entries.append(pending[col][0])
+                    pending[col][1] -= 1
+                    if not pending[col][1]:
+                        del pending[col]
+
+            for cell in row:
+                if cell.tag not in ('td', 'th'):
+                    continue
+                fill_pending()
+                rowspan = self._span(cell, 'rowspan')
+                for offset in range(self._span(cell, 'colspan')):
+                    entry = (cell, cell.tag == 'th', offset > 0)
+                    if rowspan > 1:
+                        pending[len(entries)] = [entry, rowspan - 1]
+                    entries.append(entry)
+            fill_pending()
+
+            if entries:
+                grid.append(entries)
+
+        return grid
+
+    def _row_text(self, entries, copies=True):
+        '''Get text of grid cells; column copies are blank unless
+        `copies` is set.'''
+        return [
+            self._translate(self._get_text(cell))
+            if copies or not is_copy else ''
+            for cell, _, is_copy in entries
+        ]
+
+    def _find_headers(self, table, grid):
+        '''Find the header row of a table, checking the first
+        _max_header_tries rows from the bottom up, then the <caption>.
+
+        Returns:
+            Tuple of (header row index, headers); the index is -1 for
+            headers taken from the caption
+
+        '''
+
+        ntry = min(len(grid), self._max_header_tries)
+        for tryidx in range(0, ntry)[::-1]:
+            headers = self._row_text(grid[tryidx])
+            if self._is_mri_header(headers):
+                return tryidx, headers
+
+        caption = self._get_caption([table])
+        if caption:
+            headers = re.split('\s+', caption)
+            if self._is_mri_header(headers):
+                return -1, headers
+
+        return -1, []
+
+    def _get_headers(self, tables):
+
+        table = tables[0]
+        return self._find_headers(table, self._table_grid(table))[1]
+
+    def _parse_table(self, tables):
+        '''Parse an HTML table into a data table. Rows after the header
+        row that contain at least one <td> are kept as data.
+
+        Args:
+            tables (list) : Single-element list of <table> elements
+        Returns:
+            Dictionary of headers and data rows, or None if no
+            headers were found
+
+        '''
+
+        table = tables[0]
+        grid = self._table_grid(table)
+
+        # Get headers
+        header_idx, headers = self._find_headers(table, grid)
+        if not headers:
+            return
+
+        parsed_rows = [
+            self._row_text(entries, copies=False)
+            for entries in grid[header_idx + 1:]
+            if not all(is_header for _, is_header, _ in entries)
+        ]
+
+        return {
+            'headers' : headers,
+            'data' : parsed_rows,
+            'context' : self._get_context(tables),
+            'number' : self._get_number(tables),
+        }
+
+    def _get_caption(self, tables):
+        '''Get text of the <caption> of an HTML table.'''
+        caption = tables[0].find('caption')
+        return self._get_text(caption) if caption is not None else ''
+
+    def _get_number(self, tables):
+        '''Get the table number from a "Table 2"-style caption label, or
+        None if the caption has no label.'''
+        match = re.match(
+            r'\s*table\s+([a-z]?\d+)', self._get_caption(tables), re.I
+        )
+        return _to_number(match.group(1)) if match else None
+
+    def _get_context(self, tables):
+        '''Get caption and header cell text of an HTML table.'''
+        return ' '.join(
+            [self._get_caption(tables)] +
+            [self._get_text(th) for th in tables[0].iter('th')]
+        )
+
+    def _all_coords_pos(self, coord_table):
+        '''Negative signs aren't lost in HTML, so tables with all
+        positive coordinates are kept.'''
+        return False
+
+def parse_info(info, order=('pmc', 'html', 'pdf'), pdf_parser=None):
+    '''Get coordinate tables from the documents of a ScrapeInfo,
+    preferring full-text HTML over PDF. Documents are tried in order
+    until one yields a table with coordinates.
+
+    Args:
+        info (ScrapeInfo) : Scrape results
+        order (tuple) : Document types to try
+        pdf_parser (PDFTableParse) : Parser for PDF documents; defaults
+            to a new PDFTableParse
+    Returns:
+        Tuple of (document type, list of Table instances); document type
+        is None if no document yielded coordinates
+
+    '''
+
+    for doc_type in order:
+
+        doc = info.docs.get(doc_type)
+        if not doc:
+            continue
+
+        if doc_type == 'pdf':
+            pdf_parser = pdf_parser or PDFTableParse()
+            tables = pdf_parser.parse(doc)
+        else:
+            tables = HTMLTableParse().parse(doc)
+
+        if tables and any(len(table.coords) for table in tables):
+            return doc_type, tables
 
+    return None, []
@@ -0,0 +1,160 @@
+'''
+Spatial indexing for coordinate matching. GridIndex hashes 3-D points
+into cubic cells, so fixed-radius neighbour queries only check nearby
+cells:
+
+    >>> index = GridIndex(points, 2.0)
+    >>> index.query((10, -20, 30), 2.0)
+'''
+
+# Imports
+import collections
+import numpy as np
+
+def as_points(points):
+    '''Convert points to an N x 3 float array.'''
+    return np.asarray(points, dtype=float).reshape(-1, 3)
+
+def unique_rows(values):
+    '''Get sorted unique rows of a 2-D array.'''
+
+    if not len(values):
+        return values
+
+    values = values[np.lexsort(values.T[::-1])]
+    keep = np.ones(len(values), dtype=bool)
+    keep[1:] = (values[1:] != values[:-1]).any(axis=1)
+    return values[keep]
+
+class GridIndex(object):
+    '''Index of 3-D points hashed into cubic cells.'''
+
+    def __init__(self, points, cell_size):
+        '''
+        Args:
+            points : N x 3 array or sequence of (x, y, z) points
+            cell_size (float) : Edge length of grid cells; queries are
+                fastest when this is close to the query radius
+
+        '''
+        if cell_size <= 0:
+            raise ValueError('cell_size must be positive')
+
+        self.points = as_points(points)
+        self.cell_size = float(cell_size)
+
+        # Plain tuples are faster than numpy for the handful of points
+        # checked per query
+        self._tuples = [tuple(point) for point in self.points.tolist()]
+
+        self.cells = collections.defaultdict(list)
+        for idx, key in enumerate(self._keys(self.points)):
+            self.cells[key].append(idx)
+
+    def _keys(self, points):
+        cells = np.floor(points / self.cell_size).astype(int)
+        return [tuple(cell) for cell in cells.tolist()]
+
+    def _candidates(self, key, radius):
+        '''Yield indices of points in cells within reach of a cell.'''
+        x, y, z = key
+        steps = int(np.ceil(radius / self.cell_size))
+        reach = range(-steps, steps + 1)
+        for dx in reach:
+            for dy in reach:
+                for dz in reach:
+                    for idx in self.cells.get((x + dx, y + dy, z + dz), ()):
+                        yield idx
+
+    def _within(self, point, key, radius):
+        '''Yield indices of points within `radius` of `point`.'''
+        px, py, pz = point
+        radius2 = radius * radius
+        for idx in self._candidates(key, radius):
+            x, y, z = self._tuples[idx]
+            if (x - px) ** 2 + (y - py) ** 2 + (z - pz) ** 2 <= radius2:
+                yield idx
+
+    def query(self, point, radius):
+        '''Get indices of points within `radius` of `point`.
+
+        Returns:
+            Sorted list of point indices
+
+        '''
+        point = as_points(point)
+        key = self._keys(point)[0]
+        return sorted(self._within(tuple(point[0]), key, radius))
+
+    def has_neighbor(self, points, radius):
+        '''Check whether each point has an indexed point within `radius`.
+
+        Returns:
+            Boolean array with one value per point
+
+        '''
+        points = as_points(points)
+        keys = self._keys(points)
+        return np.array([
+            any(True for _ in self._within(point, key, radius))
+            for point, key in zip(map(tuple, points.tolist()), keys)
+        ], dtype=bool)
+
+    def pairs(self, points, radius):
+        '''Find all pairs of points and indexed points within `radius`.
+
+        Returns:
+            List of (squared distance, point index, indexed point index)
+            tuples
+
+        '''
+        points = as_points(points)
+        keys = self._keys(points)
+        pairs = []
+        for point_idx, (point, key) in enumerate(
+                zip(map(tuple, points.tolist()), keys)):
+            px, py, pz = point
+            for idx in self._within(point, key, radius):
+                x, y, z = self._tuples[idx]
+                pairs.append((
+                    (x - px) ** 2 + (y - py) ** 2 + (z - pz) ** 2,
+                    point_idx, idx,
+                ))
+        return pairs
+
+def match_points(ref, cmp, tol=0.0):
+    '''Match two point sets by value.
+
+    Args:
+        ref : N x 3 array of reference points
+        cmp : M x 3 array of comparison points
+        tol (float) : Maximum Euclidean distance between matching
+            points; 0 requires exact equality. With tol > 0, each point
+            matches at most one point of the other set.
+    Returns:
+        Tuple of boolean arrays (ref matched, cmp matched)
+
+    '''
+    ref = as_points(ref)
+    cmp = as_points(cmp)
+
+    if tol <= 0:
+        ref_set = set(map(tuple, ref.tolist()))
+        cmp_set = set(map(tuple, cmp.tolist()))
+        return (
+            np.array([tuple(point) in cmp_set for point in ref.tolist()],
+                     dtype=bool),
+            np.array([tuple(point) in ref_set for point in cmp.tolist()],
+                     dtype=bool),
+        )
+
+    # Match one-to-one, closest pairs first, so a single comparison
+    # point near several reference points matches only one of them
+    ref_matched = np.zeros(len(ref), dtype=bool)
+    cmp_matched = np.zeros(len(cmp), dtype=bool)
+    for _, ref_idx, cmp_idx in sorted(GridIndex(cmp, tol).pairs(ref, tol)):
+        if not ref_matched[ref_idx] and not cmp_matched[cmp_idx]:
+            ref_matched[ref_idx] = True
+            cmp_matched[cmp_idx] = True
+
+    return ref_matched, cmp_matched
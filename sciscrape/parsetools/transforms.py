@@ -0,0 +1,189 @@
+'''
+Vectorized coordinate-space transforms. Transforms are applied to whole
+N x 3 arrays at once, so tables from many articles can be converted in a
+single batch:
+
+    >>> transform_tables(tables, target='mni')
+    >>> coords = transform_frame(coords, target='mni')
+
+Talairach <-> MNI conversions use the Lancaster et al. (2007)
+icbm_spm2tal affine by default, or Brett's piecewise mni2tal transform
+with method='brett'.
+'''
+
+# Imports
+import re
+import numpy as np
+
+# Coordinate spaces
+MNI = 'mni'
+TAL = 'tal'
+
+# Lancaster et al. (2007), Human Brain Mapping 28:1194-1205; MNI (SPM) to
+# Talairach
+ICBM_SPM2TAL = np.array([
+    [0.9254, 0.0024, -0.0118, -1.0207],
+    [-0.0048, 0.9316, -0.0871, -1.7667],
+    [0.0152, 0.0883, 0.8924, 4.0926],
+    [0.0, 0.0, 0.0, 1.0],
+])
+TAL2ICBM_SPM = np.linalg.inv(ICBM_SPM2TAL)
+
+# Brett's mni2tal: separate affines above and below the AC plane (z = 0)
+BRETT_UPPER = np.array([
+    [0.9900, 0.0, 0.0],
+    [0.0, 0.9688, 0.0460],
+    [0.0, -0.0485, 0.9189],
+])
+BRETT_LOWER = np.array([
+    [0.9900, 0.0, 0.0],
+    [0.0, 0.9688, 0.0420],
+    [0.0, -0.0485, 0.8390],
+])
+
+# Header / caption cues for coordinate spaces
+_space_patterns = [
+    (TAL, re.compile(r'talairach|\btal\b', re.I)),
+    (MNI, re.compile(r'\bmni\b|\bicbm\b|montreal', re.I)),
+]
+
+def detect_space(texts):
+    '''Detect coordinate space from table headers or captions.
+
+    Args:
+        texts (list) : Header or caption strings
+    Returns:
+        'mni', 'tal', or None if no space or more than one space is
+        mentioned
+
+    '''
+    text = ' '.join(texts)
+    spaces = [
+        space
+        for space, pattern in _space_patterns
+        if pattern.search(text)
+    ]
+    if len(spaces) == 1:
+        return spaces[0]
+
+def apply_affine(points, matrix):
+    '''Apply a 4 x 4 (or 3 x 4) affine to an N x 3 array.'''
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    return points.dot(matrix[:3, :3].T) + matrix[:3, 3]
+
+def apply_piecewise(points, upper, lower):
+    '''Apply separate 3 x 3 linear transforms to points with z >= 0 and
+    z < 0.'''
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    below = points[:, 2] < 0
+    out = points.dot(upper.T)
+    out[below] = points[below].dot(lower.T)
+    return out
+
+def mni2tal(points, method='lancaster'):
+    '''Convert N x 3 MNI coordinates to Talairach.'''
+    if method == 'lancaster':
+        return apply_affine(points, ICBM_SPM2TAL)
+    if method == 'brett':
+        return apply_piecewise(points, BRETT_UPPER, BRETT_LOWER)
+    raise ValueError('Unknown method: %s' % (method))
+
+def tal2mni(points, method='lancaster'):
+    '''Convert N x 3 Talairach coordinates to MNI.'''
+    if method == 'lancaster':
+        return apply_affine(points, TAL2ICBM_SPM)
+    if method == 'brett':
+        # As in Brett's tal2mni, pieces are chosen by Talairach z
+        return apply_piecewise(
+            points, np.linalg.inv(BRETT_UPPER), np.linalg.inv(BRETT_LOWER)
+        )
+    raise ValueError('Unknown method: %s' % (method))
+
+_transforms = {
+    (MNI, TAL): mni2tal,
+    (TAL, MNI): tal2mni,
+}
+
+def convert(points, source, target, method='lancaster'):
+    '''Convert N x 3 coordinates between spaces.
+
+    Args:
+        points : N x 3 array
+        source (str) : Space of points, e.g. 'tal'
+        target (str) : Target space, e.g. 'mni'
+        method (str) : 'lancaster' or 'brett'
+    Returns:
+        N x 3 array
+
+    '''
+    if source == target:
+        return np.array(points, dtype=float).reshape(-1, 3)
+    try:
+        transform = _transforms[(source, target)]
+    except KeyError:
+        raise ValueError(
+            'No transform from %s to %s' % (source, target)
+        )
+    return transform(points, method)
+
+def transform_tables(tables, target=MNI, method='lancaster', default=None):
+    '''Convert tables to a target space in place, batching all tables
+    in the same source space into one transform.
+
+    Args:
+        tables (list) : Table instances with a `space` attribute
+        target (str) : Target space
+        method (str) : 'lancaster' or 'brett'
+        default (str) : Space assumed for tables without a detected
+            space; tables are left unchanged if None
+    Returns:
+        List of tables
+
+    '''
+    groups = {}
+    for table in tables:
+        space = table.space or default
+        if space and space != target:
+            groups.setdefault(space, []).append(table)
+
+    for space, group in groups.items():
+        sizes = [len(table.array) for table in group]
+        converted = convert(
+            np.concatenate([table.array for table in group]),
+            space, target, method
+        )
+        for table, chunk in zip(group, np.split(converted, np.cumsum(sizes)[:-1])):
+            table.array[:] = chunk
+            table.space = target
+
+    return tables
+
+def transform_frame(coords, target=MNI, method='lancaster', default=None):
+    '''Convert a coordinate DataFrame with x, y, z, and space columns
+    (e.g. from CoordDB queries) to a target space.
+
+    Args:
+        coords (DataFrame) : Coordinates
+        target (str) : Target space
+        method (str) : 'lancaster' or 'brett'
+        default (str) : Space assumed for rows with no space; rows are
+            left unchanged if None
+    Returns:
+        Converted copy of coords
+
+    '''
+    coords = coords.copy()
+    spaces = coords['space'].where(coords['space'].notnull(), default).values
+    values = coords[['x', 'y', 'z']].values.astype(float)
+
+    # Boolean indexing through DataFrame.loc is slow; work on arrays
+    for space in set(spaces) - set([None, target]):
+        rows = spaces == space
+        values[rows] = convert(values[rows], space, target, method)
+        spaces[rows] = target
+
+    for idx, col in enumerate(['x', 'y', 'z']):
+        coords[col] = values[:, idx]
+    coords['space'] = spaces
+
+    return coords
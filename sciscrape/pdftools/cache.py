@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+'''
+On-disk cache for PDF extraction results. Results are gzip-compressed and
+keyed by a hash of the PDF data and the extractor version, so the same PDF
+is only sent through an extractor (e.g. the remote PDFx service) once:
+
+    >>> extractor = CachedExtractor(pdfx.PDFExtractor(), 'cache')
+    >>> parser = sciparse.PDFTableParse(extractor=extractor)
+'''
+
+# Imports
+import os
+import re
+import gzip
+import hashlib
+import tempfile
+
+# Project imports
+from sciscrape.pdftools import pdfx
+from sciscrape.utils import utils
+
+class ExtractionCache(object):
+    '''Compressed XML files keyed by content hash.'''
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def key(data, version):
+        '''Build cache key from PDF data and extractor version.'''
+        digest = hashlib.sha1()
+        digest.update(str(version))
+        digest.update('\0')
+        digest.update(data)
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key[:2], '%s.xml.gz' % (key))
+
+    def get(self, key):
+        '''Get cached XML, or None if not cached.'''
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        with gzip.open(path, 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def set(self, key, xml):
+        '''Cache XML. Writes are atomic, so concurrent processes can
+        share a cache directory.'''
+
+        if isinstance(xml, unicode):
+            xml = xml.encode('utf-8')
+
+        path = self.path(key)
+        utils.mkdir_p(os.path.dirname(path))
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb') as f:
+                f.write(xml)
+        os.rename(tmp_path, path)
+
+class CachedExtractor(pdfx.BaseExtractor):
+    '''Wrap an extractor with an ExtractionCache.'''
+
+    # Extraction errors are not cached, since they may be transient
+    _error_pattern = r'^\s*(<\?xml[^>]*>\s*)?<error'
+
+    def __init__(self, extractor, cache_dir):
+        self.extractor = extractor
+        self.cache = ExtractionCache(cache_dir)
+
+    @property
+    def version(self):
+        return self.extractor.version or type(self.extractor).__name__
+
+    def extract_xml(self, pdf):
+
+        data = pdfx.read_pdf(pdf)
+        key = self.cache.key(data, self.version)
+
+        xml = self.cache.get(key)
+        if xml is None:
+            xml = self.extractor.extract_xml(data)
+            if xml and not re.search(self._error_pattern, xml):
+                self.cache.set(key, xml)
+
+        return xml
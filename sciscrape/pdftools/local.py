@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+'''
+In-process table extraction from PDFs. LocalExtractor uses pdfminer's
+layout analysis to find text lines, groups them into rows by vertical
+position, finds tables by their "Table N" captions, and assigns cells to
+columns by horizontal position. Output uses the same PDFx-style XML
+(<h1 class="table"> / <table number="N"> / <tr> / <td>) that
+PDFTableParse expects, so it can replace the remote PDFx service:
+
+    >>> parser = sciparse.PDFTableParse(extractor=LocalExtractor())
+
+Unlike PDFx, LocalExtractor runs offline and can be spread across a
+process pool with extract_many().
+'''
+
+# Imports
+import re
+import StringIO
+from lxml import etree
+
+# Project imports
+from sciscrape.pdftools import pdfx
+
+class TextLine(object):
+    '''Positioned line of text on a page.'''
+
+    def __init__(self, x0, y0, x1, y1, text):
+        self.x0 = x0
+        self.y0 = y0
+        self.x1 = x1
+        self.y1 = y1
+        self.text = text
+
+    @property
+    def height(self):
+        return self.y1 - self.y0
+
+    @property
+    def ycenter(self):
+        return (self.y0 + self.y1) / 2.0
+
+    @property
+    def xcenter(self):
+        return (self.x0 + self.x1) / 2.0
+
+    def __repr__(self):
+        return 'TextLine(%r, %r, %r)' % (self.x0, self.y0, self.text)
+
+class LocalExtractor(pdfx.BaseExtractor):
+    '''Extract tables from PDFs in-process using pdfminer.'''
+
+    version = 'local-1'
+
+    # Layout analysis parameters; a small char_margin keeps table cells
+    # separated by whitespace gaps as separate text lines
+    char_margin = 1.0
+    line_margin = 0.2
+    word_margin = 0.1
+
+    # Maximum vertical offset between lines in the same row, as a
+    # fraction of line height
+    row_tolerance = 0.5
+
+    # Pattern identifying table captions
+    _caption_pattern = r'^\s*table\s+(\d+)'
+
+    def extract_xml(self, pdf):
+
+        data = pdfx.read_pdf(pdf)
+
+        root = etree.Element('pdfx')
+        article = etree.SubElement(root, 'article')
+
+        for page_number, lines in enumerate(self._page_lines(data), 1):
+            rows = self._group_rows(lines)
+            for caption, number, table_rows in self._find_tables(rows):
+
+                h1 = etree.SubElement(article, 'h1', {'class': 'table'})
+                h1.text = caption
+
+                table = etree.SubElement(article, 'table', {
+                    'number': number,
+                    'page': str(page_number),
+                })
+                for cells in self._assign_columns(table_rows):
+                    tr = etree.SubElement(table, 'tr')
+                    for cell in cells:
+                        td = etree.SubElement(tr, 'td')
+                        td.text = cell
+
+        return etree.tostring(root)
+
+    def _page_lines(self, data):
+        '''Yield lists of TextLine objects for each page.'''
+
+        # pdfminer is only required for local extraction
+        from pdfminer.pdfpage import PDFPage
+        from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+        from pdfminer.converter import PDFPageAggregator
+        from pdfminer.layout import LAParams, LTTextBox, LTTextLine
+
+        laparams = LAParams(
+            char_margin=self.char_margin,
+            line_margin=self.line_margin,
+            word_margin=self.word_margin,
+        )
+        manager = PDFResourceManager()
+        device = PDFPageAggregator(manager, laparams=laparams)
+        interpreter = PDFPageInterpreter(manager, device)
+
+        def walk(obj):
+            if isinstance(obj, LTTextLine):
+                yield obj
+            elif isinstance(obj, LTTextBox) or hasattr(obj, '_objs'):
+                for child in obj:
+                    for line in walk(child):
+                        yield line
+
+        for page in PDFPage.get_pages(StringIO.StringIO(data)):
+            interpreter.process_page(page)
+            lines = []
+            for line in walk(device.get_result()):
+                text = line.get_text().strip()
+                if text:
+                    lines.append(TextLine(
+                        line.x0, line.y0, line.x1, line.y1, text
+                    ))
+            yield lines
+
+    def _group_rows(self, lines):
+        '''Group lines into rows, ordered top to bottom and left to right.'''
+
+        rows = []
+        for line in sorted(lines, key=lambda line: -line.ycenter):
+            if rows:
+                last = rows[-1][0]
+                tolerance = self.row_tolerance * max(last.height, line.height)
+                if abs(last.ycenter - line.ycenter) <= tolerance:
+                    rows[-1].append(line)
+                    continue
+            rows.append([line])
+
+        return [sorted(row, key=lambda line: line.x0) for row in rows]
+
+    def _find_tables(self, rows):
+        '''Find tables following "Table N" captions. A table continues
+        while rows have multiple cells; isolated single-cell rows (e.g.
+        section labels) are kept, but two in a row end the table.
+
+        Returns:
+            List of (caption, number, rows) tuples
+
+        '''
+        tables = []
+        current = None
+        pending = []
+
+        for row in rows:
+
+            match = re.search(self._caption_pattern, row[0].text, re.I)
+            if match:
+                current = {
+                    'caption': ' '.join(line.text for line in row),
+                    'number': match.group(1),
+                    'rows': [],
+                }
+                tables.append(current)
+                pending = []
+                continue
+
+            if current is None:
+                continue
+
+            if len(row) > 1:
+                current['rows'].extend(pending)
+                current['rows'].append(row)
+                pending = []
+            elif not current['rows']:
+                # Caption continued on the next line
+                current['caption'] += ' ' + row[0].text
+            elif not pending:
+                pending.append(row)
+            else:
+                current = None
+                pending = []
+
+        return [
+            (table['caption'], table['number'], table['rows'])
+            for table in tables
+            if table['rows']
+        ]
+
+    def _assign_columns(self, rows):
+        '''Assign cells to columns. Column extents are taken from the
+        rows with the most cells (usually body rows), so cells spanning
+        several columns (e.g. "MNI coordinates") don't merge columns.
+
+        Returns:
+            List of lists of cell strings
+
+        '''
+        ncols = max(len(row) for row in rows)
+
+        # Merge overlapping cell extents from the widest rows
+        extents = sorted(
+            [line.x0, line.x1]
+            for row in rows if len(row) == ncols
+            for line in row
+        )
+        columns = []
+        for x0, x1 in extents:
+            if columns and x0 <= columns[-1][1]:
+                columns[-1][1] = max(columns[-1][1], x1)
+            else:
+                columns.append([x0, x1])
+
+        def column_index(line):
+            overlaps = [
+                min(line.x1, x1) - max(line.x0, x0)
+                for x0, x1 in columns
+            ]
+            best = max(range(len(columns)), key=lambda idx: overlaps[idx])
+            if overlaps[best] > 0:
+                return best
+            return min(
+                range(len(columns)),
+                key=lambda idx: abs(sum(columns[idx]) / 2.0 - line.xcenter)
+            )
+
+        table = []
+        for row in rows:
+            cells = [[] for _ in columns]
+            for line in row:
+                cells[column_index(line)].append(line.text)
+            table.append([' '.join(cell) for cell in cells])
+
+        return table
@@ -2,54 +2,335 @@
 
 # Imports
 import re
+import abc
+import copy
+import Queue
+import logging
 import requests
+import threading
+import StringIO
+import multiprocessing
+from lxml import etree
 from pyquery import PyQuery
 
 # Sciscrape imports
 from sciscrape.utils import retry
 
-class PDFExtractor(object):
-    '''Base class for extracting information from
-    PDFs using PDFx.
+logger = logging.getLogger(__name__)
+
+def read_pdf(pdf):
+    '''Get PDF data from a string or file object.'''
+    if hasattr(pdf, 'read'):
+        return pdf.read()
+    return pdf
+
+def is_table_caption(element):
+    '''Check whether an element is an <h1 class="table"> caption.'''
+    return element is not None and \
+        element.tag == 'h1' and \
+        'table' in (element.get('class') or '').split()
+
+def _detached_copy(element):
+    '''Copy an element subtree, without its tail text.'''
+    element_copy = copy.deepcopy(element)
+    element_copy.tail = None
+    return element_copy
+
+def _drop_previous(element):
+    '''Remove preceding siblings of a parsed element.'''
+    parent = element.getparent()
+    if parent is not None:
+        while element.getprevious() is not None:
+            del parent[0]
+
+def iterparse_tables(source):
+    '''Incrementally parse PDFx XML, keeping only <table> elements and
+    the <h1 class="table"> captions immediately preceding them. All
+    other elements are cleared as soon as they are parsed, so memory
+    use is bounded by the size of the tables rather than the document.
+
+    Args:
+        source (str / file) : XML data or file-like object, e.g. a
+            streamed response body
+    Returns:
+        PyQuery document with a <pdfx> root containing captions and
+        tables, or None if extraction failed
 
     '''
-    
-    #TODO: Figure out which exception(s) this may throw
-    @retry.retry(Exception)
-    def extract(self, pdf):
-        '''Get XML representation of PDF. For details, see 
-        http://pdfx.cs.man.ac.uk/usage
+    if isinstance(source, basestring):
+        source = StringIO.StringIO(source)
+
+    out = etree.Element('pdfx')
+    root = None
+
+    # Depth within kept (table / caption) subtrees
+    depth = 0
+
+    try:
+        for event, elem in etree.iterparse(
+                source, events=('start', 'end'), recover=True):
+
+            if event == 'start':
+                if root is None:
+                    root = elem
+                    # Quit if <error>
+                    if elem.tag == 'error':
+                        return
+                if depth or elem.tag == 'table' or is_table_caption(elem):
+                    depth += 1
+                continue
+
+            if depth:
+                depth -= 1
+                if depth:
+                    continue
+                if elem.tag != 'table':
+                    # Keep caption until its next sibling is parsed
+                    _drop_previous(elem)
+                    continue
+                prev = elem.getprevious()
+                if is_table_caption(prev):
+                    out.append(_detached_copy(prev))
+                out.append(_detached_copy(elem))
+
+            elem.clear()
+            _drop_previous(elem)
+    except etree.XMLSyntaxError:
+        # Raised on empty documents
+        if root is None:
+            return
+        raise
+
+    return PyQuery(out)
+
+def _extract_path(args, method='extract_xml'):
+    '''Extract XML from a PDF path; used by BaseExtractor.extract_many.
+    Errors are logged, and None is returned.'''
+    extractor, path = args
+    try:
+        with open(path, 'rb') as pdf:
+            return path, getattr(extractor, method)(pdf)
+    except Exception as error:
+        logger.warning('Extraction failed for {0}: {1!r}'.format(path, error))
+        return path, None
+
+class BaseExtractor(object):
+    '''Base class for extracting tables from PDFs. Subclasses implement
+    extract_xml(), which returns PDFx-style XML: <table number="...">
+    elements containing <tr> / <td> cells, optionally preceded by
+    <h1 class="table"> captions. See http://pdfx.cs.man.ac.uk/usage.
+
+    '''
+    __metaclass__ = abc.ABCMeta
+
+    # Version of extraction output; change when output changes
+    version = None
+
+    @abc.abstractmethod
+    def extract_xml(self, pdf):
+        '''Get raw XML representation of PDF.
 
         Args:
             pdf (str / file) : PDF data
         Returns:
-            Parsed XML from PDFX
+            XML string
 
-        Example:
-            >>> pdf = open('doc.pdf', 'rb').read()
-            >>> qxml = PDFExtractor().extract(pdf)
+        '''
+
+    def parse_xml(self, xml_raw):
+        '''Parse XML from extract_xml().
+
+        Returns:
+            Parsed XML, or None if extraction failed
 
         '''
-        
-        # Send request to PDFX
-        req = requests.post(
-            'http://pdfx.cs.man.ac.uk', 
-            headers={'content-type' : 'application/pdf'},
-            data=pdf,
-        )
+        if not xml_raw:
+            return
 
         # Remove encoding
-        # Note: PyQuery / LXML will fail if 
+        # Note: PyQuery / LXML will fail if
         # encodings present
-        xml_raw = req.text
         xml_clean = re.sub('encoding=\'.*?\'', '', xml_raw)
 
         # Parse XML
         qxml = PyQuery(xml_clean)
-        
+
         # Quit if <error>
         if qxml[0].tag == 'error':
             return
 
         # Return parsed XML
         return qxml
+
+    def extract(self, pdf):
+        '''Get parsed XML representation of PDF.
+
+        Args:
+            pdf (str / file) : PDF data
+        Returns:
+            Parsed XML
+
+        Example:
+            >>> pdf = open('doc.pdf', 'rb').read()
+            >>> qxml = PDFExtractor().extract(pdf)
+
+        '''
+        return self.parse_xml(self.extract_xml(pdf))
+
+    def extract_many(self, paths, processes=None, chunksize=1):
+        '''Extract many PDFs across a process pool.
+
+        Args:
+            paths (list) : PDF file paths
+            processes (int) : Number of worker processes; defaults to the
+                number of CPUs
+            chunksize (int) : Number of PDFs sent to a worker at a time
+        Yields:
+            Tuples of (path, parsed XML), in completion order; parsed
+            XML is None if extraction failed
+
+        '''
+        pool = multiprocessing.Pool(processes)
+        try:
+            tasks = [(self, path) for path in paths]
+            for path, xml in pool.imap_unordered(_extract_path, tasks, chunksize):
+                yield path, self.parse_xml(xml)
+        finally:
+            pool.terminate()
+
+class PDFExtractor(BaseExtractor):
+    '''Extract information from PDFs using the remote PDFx service.
+    Requests share a pooled session; use extract_many() to send many
+    PDFs concurrently. With stream=True, extract() parses the response
+    incrementally and keeps only tables and their captions; see
+    iterparse_tables().
+
+    '''
+    version = 'pdfx'
+
+    url = 'http://pdfx.cs.man.ac.uk'
+
+    # Default request timeout, in seconds; PDFx may take minutes on
+    # long documents
+    timeout = 300
+
+    def __init__(self, url=None, timeout=None, pool_size=10, stream=False):
+        '''
+        Args:
+            url (str) : PDFx service URL
+            timeout (float) : Request timeout in seconds
+            pool_size (int) : Maximum number of pooled connections
+            stream (bool) : Parse responses incrementally, keeping
+                only tables and captions
+
+        '''
+        self.url = url or self.url
+        self.timeout = timeout or self.timeout
+        self.pool_size = pool_size
+        self.stream = stream
+        self._session = None
+
+    @property
+    def session(self):
+        if self._session is None:
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1, pool_maxsize=self.pool_size
+            )
+            self._session = requests.Session()
+            self._session.mount('http://', adapter)
+            self._session.mount('https://', adapter)
+        return self._session
+
+    def __getstate__(self):
+        # Sessions are not shared across processes
+        state = self.__dict__.copy()
+        state['_session'] = None
+        return state
+
+    @retry.retry(requests.RequestException, tries=3, delay=1, logger=logger)
+    def _post(self, pdf, stream=False):
+
+        # Rewind file objects before retries
+        if hasattr(pdf, 'seek'):
+            pdf.seek(0)
+
+        # Send request to PDFX; file objects are streamed
+        req = self.session.post(
+            self.url,
+            headers={'content-type' : 'application/pdf'},
+            data=pdf,
+            timeout=self.timeout,
+            stream=stream,
+        )
+        req.raise_for_status()
+
+        return req
+
+    def extract_xml(self, pdf):
+        return self._post(pdf).text
+
+    def extract(self, pdf):
+
+        if not self.stream:
+            return super(PDFExtractor, self).extract(pdf)
+
+        # Parse response body as it arrives; decode_content undoes
+        # any gzip / deflate transfer encoding
+        req = self._post(pdf, stream=True)
+        try:
+            req.raw.decode_content = True
+            return iterparse_tables(req.raw)
+        finally:
+            req.close()
+
+    def extract_many(self, paths, processes=None, chunksize=1):
+        '''Send many PDFs to PDFx, with at most `processes` requests in
+        flight. PDFs are streamed from disk. Requests run in threads
+        rather than processes, since they only wait on the network.
+
+        Args:
+            paths (list) : PDF file paths
+            processes (int) : Maximum number of concurrent requests;
+                defaults to pool_size
+            chunksize (int) : Ignored; accepted for compatibility with
+                BaseExtractor.extract_many
+        Yields:
+            Tuples of (path, parsed XML), in completion order; parsed
+            XML is None if extraction failed
+
+        '''
+        paths = list(paths)
+        concurrency = processes or self.pool_size
+
+        # The connection pool is sized when the session is created, so
+        # replace a session too small for this many requests
+        if concurrency > self.pool_size:
+            self.pool_size = concurrency
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+        self.session
+
+        tasks = Queue.Queue()
+        for path in paths:
+            tasks.put(path)
+        results = Queue.Queue()
+
+        def worker():
+            while True:
+                try:
+                    path = tasks.get_nowait()
+                except Queue.Empty:
+                    return
+                results.put(_extract_path((self, path), 'extract'))
+
+        threads = [
+            threading.Thread(target=worker)
+            for _ in range(min(concurrency, len(paths)))
+        ]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        for _ in range(len(paths)):
+            yield results.get()
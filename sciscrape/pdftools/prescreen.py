@@ -0,0 +1,166 @@
+'''
+Cheap keyword pre-screen for PDF table extraction. Page text is pulled
+locally with PyPDF2 and searched for coordinate-table vocabulary (x / y /
+z headers, MNI, Talairach, Brodmann areas, "coordinates"); PDFs with no
+candidate pages are skipped instead of being sent through the expensive
+extractor:
+
+    >>> extractor = PrescreenExtractor(pdfx.PDFExtractor())
+    >>> parser = sciparse.PDFTableParse(extractor=extractor)
+    >>> ...
+    >>> extractor.stats
+    Counter({'pdfs': 120, 'pdfs_skipped': 85, ...})
+
+PyPDF2 often drops spaces between text runs, so patterns don't rely on
+word boundaries.
+'''
+
+# Imports
+import re
+import logging
+import StringIO
+import collections
+
+# Project imports
+from sciscrape.pdftools import pdfx
+
+logger = logging.getLogger(__name__)
+
+# Patterns indicating a page may contain a coordinate table; compare
+# PDFTableParse._mri_header_patterns. Bare "region" and "lobe" are left
+# out: they occur in the running text of nearly every neuroimaging page,
+# and coordinate tables also carry one of the cues below.
+COORD_PATTERNS = [
+    re.compile(r'x\W{0,3}y\W{0,3}z', re.I),
+    re.compile(r'talairach', re.I),
+    re.compile(r'coordinates', re.I),
+    re.compile(r'brodmann', re.I),
+    # "mni" in any case, but not inside words such as "omnibus" or
+    # "OMNI"
+    re.compile(r'(?<![a-z])mni(?![a-z])', re.I),
+    # Brodmann area columns, e.g. "BA" or "BA 46"; matched in uppercase
+    # only and as a word, since "ba" starts many words and uppercase
+    # headings such as "BACKGROUND"
+    re.compile(r'\bBA(?=\s*\d|\b)'),
+]
+
+# Output for skipped PDFs: a valid document with no tables
+EMPTY_XML = '<pdfx><article></article></pdfx>'
+
+def open_pdf(pdf):
+    '''Open a PDF with PyPDF2.
+
+    Args:
+        pdf (str / file) : PDF data
+    Returns:
+        PdfFileReader, or None if the PDF can't be read
+
+    '''
+    # PyPDF2 is only required for pre-screening
+    import PyPDF2
+
+    # PyPDF2 may not terminate on input without a PDF header
+    data = pdfx.read_pdf(pdf)
+    if '%PDF-' not in data[:1024]:
+        return None
+
+    try:
+        return PyPDF2.PdfFileReader(StringIO.StringIO(data))
+    except Exception as error:
+        logger.debug('Could not read PDF: %s', error)
+        return None
+
+def page_texts(pdf):
+    '''Get the text of each page of a PDF.
+
+    Args:
+        pdf (str / file / PdfFileReader) : PDF data or opened PDF
+    Returns:
+        List of page text strings, or None if the PDF can't be read
+
+    '''
+    reader = pdf if hasattr(pdf, 'getPage') else open_pdf(pdf)
+    if reader is None:
+        return None
+
+    try:
+        return [page.extractText() for page in reader.pages]
+    except Exception as error:
+        logger.debug('Could not read PDF text: %s', error)
+        return None
+
+def is_candidate_text(text):
+    '''Check whether text contains coordinate-table vocabulary.'''
+    return any(pattern.search(text) for pattern in COORD_PATTERNS)
+
+def candidate_pages(texts):
+    '''Get indices of pages that may contain coordinate tables.
+
+    Args:
+        texts (list) : Page texts from page_texts()
+    Returns:
+        List of zero-based page indices, or None if the PDF has no
+        extractable text (e.g. scanned or encrypted) and can't be
+        screened
+
+    '''
+    if texts is None or not any(text.strip() for text in texts):
+        return None
+    return [
+        idx
+        for idx, text in enumerate(texts)
+        if is_candidate_text(text)
+    ]
+
+class PrescreenExtractor(pdfx.BaseExtractor):
+    '''Wrap an extractor, skipping PDFs without candidate pages. PDFs
+    that can't be screened are passed through.
+
+    Counters in `stats`:
+        pdfs : PDFs seen
+        pdfs_skipped : PDFs not sent to the wrapped extractor
+        pdfs_unscreened : PDFs without extractable text
+        pages : Pages in screened PDFs
+        pages_candidate : Pages with coordinate-table vocabulary
+
+    '''
+
+    def __init__(self, extractor):
+        self.extractor = extractor
+        self.stats = collections.Counter()
+
+    @property
+    def version(self):
+        return '%s+prescreen-1' % (
+            self.extractor.version or type(self.extractor).__name__
+        )
+
+    def screen(self, pdf):
+        '''Get candidate page indices and update counters.
+
+        Args:
+            pdf (str / file / PdfFileReader) : PDF data or opened PDF
+
+        Returns:
+            List of page indices, or None if the PDF can't be screened
+
+        '''
+        self.stats['pdfs'] += 1
+        texts = page_texts(pdf)
+        pages = candidate_pages(texts)
+        if pages is None:
+            self.stats['pdfs_unscreened'] += 1
+            return None
+        self.stats['pages'] += len(texts)
+        self.stats['pages_candidate'] += len(pages)
+        return pages
+
+    def extract_xml(self, pdf):
+
+        data = pdfx.read_pdf(pdf)
+
+        if self.screen(data) == []:
+            self.stats['pdfs_skipped'] += 1
+            return EMPTY_XML
+
+        return self.extractor.extract_xml(data)
@@ -0,0 +1,151 @@
+'''
+Page-level PDF splitting for table extraction. Pages likely to contain
+coordinate tables are found with the keyword pre-screen, copied into a
+smaller PDF, and only that PDF is sent to the wrapped extractor; page
+numbers in the output are mapped back to the original document:
+
+    >>> extractor = PageSplitExtractor(pdfx.PDFExtractor())
+    >>> parser = sciparse.PDFTableParse(extractor=extractor)
+
+Tables split across pages keep their caption numbers, so
+PDFTableParse._consolidate_tables still groups them. The page after each
+candidate page is included, since tables often continue there.
+'''
+
+# Imports
+import StringIO
+from lxml import etree
+
+# Project imports
+from sciscrape.pdftools import pdfx
+from sciscrape.pdftools import prescreen
+
+def select_pages(candidates, npages, before=0, after=1):
+    '''Add neighbouring pages to candidate pages.
+
+    Args:
+        candidates (list) : Zero-based candidate page indices
+        npages (int) : Number of pages in document
+        before (int) : Number of preceding pages to include
+        after (int) : Number of following pages to include
+    Returns:
+        Sorted list of zero-based page indices
+
+    '''
+    pages = set()
+    for page in candidates:
+        pages.update(range(
+            max(page - before, 0), min(page + after + 1, npages)
+        ))
+    return sorted(pages)
+
+def build_pdf(reader, pages):
+    '''Copy selected pages of a PDF into a new PDF.
+
+    Args:
+        reader (PdfFileReader) : Source PDF
+        pages (list) : Zero-based page indices
+    Returns:
+        PDF data
+
+    '''
+    import PyPDF2
+
+    writer = PyPDF2.PdfFileWriter()
+    for page in pages:
+        writer.addPage(reader.getPage(page))
+
+    out = StringIO.StringIO()
+    writer.write(out)
+    return out.getvalue()
+
+def map_pages(xml, pages):
+    '''Map "page" attributes of extracted XML from a split PDF back to
+    the original document.
+
+    Args:
+        xml (str) : Extracted XML
+        pages (list) : Zero-based original page index of each page in
+            the split PDF
+    Returns:
+        XML string
+
+    '''
+    if not xml:
+        return xml
+    if isinstance(xml, unicode):
+        xml = xml.encode('utf-8')
+    try:
+        root = etree.fromstring(xml)
+    except etree.XMLSyntaxError:
+        return xml
+
+    for element in root.iter():
+        page = element.get('page')
+        if page is not None and page.isdigit() and \
+                0 < int(page) <= len(pages):
+            element.set('page', str(pages[int(page) - 1] + 1))
+
+    return etree.tostring(root)
+
+class PageSplitExtractor(prescreen.PrescreenExtractor):
+    '''Wrap an extractor, sending it only the pages likely to contain
+    coordinate tables. PDFs without candidate pages are skipped, and
+    PDFs that can't be screened are passed through whole.
+
+    Counters in `stats`, in addition to PrescreenExtractor's:
+        pdfs_split : PDFs sent as a subset of pages
+        pages_extracted : Pages sent to the wrapped extractor
+        bytes_in : Size of PDFs sent to the wrapped extractor
+        bytes_saved : Reduction in size from splitting
+
+    '''
+
+    # Neighbouring pages to include around candidate pages
+    pages_before = 0
+    pages_after = 1
+
+    # Send the whole PDF if at least this fraction of pages is selected
+    max_fraction = 0.75
+
+    @property
+    def version(self):
+        return '%s+split-1' % (
+            self.extractor.version or type(self.extractor).__name__
+        )
+
+    def extract_xml(self, pdf):
+
+        data = pdfx.read_pdf(pdf)
+        reader = prescreen.open_pdf(data)
+        candidates = self.screen(reader if reader is not None else data)
+
+        if candidates == []:
+            self.stats['pdfs_skipped'] += 1
+            return prescreen.EMPTY_XML
+
+        if candidates is not None:
+            npages = reader.getNumPages()
+            pages = select_pages(
+                candidates, npages, self.pages_before, self.pages_after
+            )
+            split = None
+            if len(pages) < self.max_fraction * npages:
+                split = self._split(reader, pages)
+            if split:
+                self.stats['pdfs_split'] += 1
+                self.stats['pages_extracted'] += len(pages)
+                self.stats['bytes_in'] += len(split)
+                self.stats['bytes_saved'] += max(len(data) - len(split), 0)
+                return map_pages(self.extractor.extract_xml(split), pages)
+            self.stats['pages_extracted'] += npages
+
+        self.stats['bytes_in'] += len(data)
+        return self.extractor.extract_xml(data)
+
+    def _split(self, reader, pages):
+        '''Build PDF of selected pages, or None if PyPDF2 can't copy them.'''
+        try:
+            return build_pdf(reader, pages)
+        except Exception:
+            return None
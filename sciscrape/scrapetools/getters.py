@@ -4,6 +4,9 @@ Utilities to download documents from various publishers.
 
 import re
 import json
+import sre_parse
+import sre_constants
+import logging
 import urllib
 import urlparse
 from pyquery import PyQuery
@@ -12,9 +15,12 @@ from sciscrape.utils import retry
 from sciscrape.utils import utils
 
 from sciscrape.exceptions import (
-    NotFoundError, NoAccessError, BadDocumentError
+    NotFoundError, NoAccessError, BadDocumentError,
+    ProbeError, ProbeNoAccessError, ProbeBadDocumentError
 )
 
+logger = logging.getLogger(__name__)
+
 # TODO: Move access rules
 class AccessRule(object):
     """ Base class for access checkers. """
@@ -32,6 +38,9 @@ class RegexAccessRule(AccessRule):
     def __call__(self, text, qtext):
         return bool(re.search(self.regex, text, self.flags))
 
+    def __repr__(self):
+        return 'RegexAccessRule(%r)' % (self.regex)
+
 class ElsevierAccessRule(AccessRule):
     """ Custom black-list rule for Elsevier HTML documents. """
 
@@ -46,6 +55,123 @@ class ThiemeAccessRule(AccessRule):
         )
         return not bool(full_text_tab)
 
+def _is_html(text, qtext):
+    """ Cheap check for whether a document can be searched with
+    DOM-based access rules. """
+    return qtext is not None and not text.lstrip()[:4].lower() == '%pdf'
+
+class AccessMatcher(object):
+    """ Matcher for a list of access rules, compiled once per getter class.
+    Most regex rules are plain phrases; these are matched with substring
+    search on a single lower-cased copy of the text, which is much faster
+    than running each pattern (or one combined alternation) through the
+    regex engine. Remaining regex rules are pre-compiled. Other rules
+    (which inspect the parsed DOM) only run on HTML documents. Rules are
+    checked in list order, so the first rule that fires is reported. """
+
+    # Check types
+    LITERAL, REGEX, DOM = range(3)
+
+    def __init__(self, rules):
+
+        self.rules = rules
+        self.checks = []
+
+        for rule in rules:
+            if not isinstance(rule, RegexAccessRule):
+                self.checks.append((self.DOM, None, rule))
+                continue
+            literal = self._to_literal(rule.regex, rule.flags)
+            if literal is not None:
+                self.checks.append((self.LITERAL, literal, rule))
+            else:
+                pattern = re.compile(rule.regex, rule.flags)
+                self.checks.append((self.REGEX, pattern, rule))
+
+    @property
+    def literals(self):
+        return [
+            (literal, rule)
+            for kind, literal, rule in self.checks
+            if kind == self.LITERAL
+        ]
+
+    @staticmethod
+    def _to_literal(regex, flags):
+        """ Get the literal string matched by a regex, or None if the regex
+        is not a plain string. Case-insensitive literals are lower-cased. """
+
+        if flags & ~re.I:
+            return None
+        try:
+            parsed = sre_parse.parse(regex, flags)
+        except re.error:
+            return None
+        if not all(op == sre_constants.LITERAL for op, _ in parsed):
+            return None
+        if any(code > 127 for _, code in parsed):
+            return None
+        literal = ''.join(chr(code) for _, code in parsed)
+        return literal.lower() if flags & re.I else literal
+
+    def match(self, text, qtext):
+        """ Return the first rule that fires on a document, or None. """
+
+        lowered = None
+        is_html = None
+
+        for kind, check, rule in self.checks:
+            if kind == self.LITERAL:
+                if rule.flags & re.I:
+                    if lowered is None:
+                        lowered = text.lower()
+                    found = check in lowered
+                else:
+                    found = check in text
+            elif kind == self.REGEX:
+                found = check.search(text)
+            else:
+                if is_html is None:
+                    is_html = _is_html(text, qtext)
+                found = is_html and rule(text, qtext)
+            if found:
+                return rule
+
+        return None
+
+class NavPage(object):
+    """ Page reached by a navigation step. """
+
+    def __init__(self, url, html, qhtml):
+        self.url = url
+        self.html = html
+        self.qhtml = qhtml
+
+class NavigationCache(object):
+    """ Per-article cache of pages reached by multi-step navigation, so
+    that sibling getters (e.g. HTML and PDF) share intermediate pages
+    instead of fetching them again. Failed steps are not cached. """
+
+    def __init__(self):
+        self.pages = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        return key in self.pages
+
+    def get(self, key, fetch):
+        """ Get a cached page, or call fetch() and cache the result. """
+
+        if key in self.pages:
+            self.hits += 1
+            return self.pages[key]
+
+        self.misses += 1
+        page = fetch()
+        self.pages[key] = page
+        return page
+
 class DocGetter(object):
     """ Base class for document getters. """
 
@@ -82,55 +208,196 @@ class DocGetter(object):
                         r'article now'), # LWW
     ]
 
+    @classmethod
+    def _access_matchers(cls):
+        """ Get white- and black-list matchers, compiling them once per
+        class. Matchers are rebuilt if the rule lists are replaced. """
+
+        compiled = cls.__dict__.get('_compiled_access')
+        if compiled is None or \
+                compiled[0] is not cls._access_whitelist or \
+                compiled[1] is not cls._access_blacklist:
+            compiled = (
+                cls._access_whitelist,
+                cls._access_blacklist,
+                AccessMatcher(cls._access_whitelist),
+                AccessMatcher(cls._access_blacklist),
+            )
+            cls._compiled_access = compiled
+        return compiled[2], compiled[3]
+
+    def match_access(self, text, qtext):
+        """ Check whether we have access to an article.
+
+        :return: Tuple of (has access, rule that fired or None)
+
+        """
+        whitelist, blacklist = self._access_matchers()
+
+        # Check white-list rules
+        rule = whitelist.match(text, qtext)
+        if rule is not None:
+            return True, rule
+
+        # Check black-list rules
+        rule = blacklist.match(text, qtext)
+        if rule is not None:
+            return False, rule
+
+        # If no hits, article is valid
+        return True, None
+
     def check_access(self, text, qtext):
         """ Check whether we have access to an article. """
 
-        # Check white-list functions
-        for wfun in self._access_whitelist:
-            if wfun(text, qtext):
-                return True
+        return self.match_access(text, qtext)[0]
 
-        # Check black-list functions
-        for bfun in self._access_blacklist:
-            if bfun(text, qtext):
-                return False
+    # Probe document links before downloading them; off by default, since
+    # each probe costs an extra request
+    probe = False
 
-        # If no hits, article is valid
-        return True
+    # 'HEAD', or 'GET' to request only the first KB with a Range header
+    probe_method = 'HEAD'
+
+    # Content types that can't be valid documents
+    _probe_reject_types = [
+        r'^image/',
+        r'^audio/',
+        r'^video/',
+    ]
+
+    # Largest acceptable Content-Length in bytes, or None
+    probe_max_length = None
+
+    def probe_link(self, browser, link):
+        """ Check the status and headers of a document link before
+        downloading it. Probes that fail to connect are ignored, and the
+        document is downloaded as usual.
+
+        :return: ProbeResult, or None if the probe failed
+        :raises ProbeNoAccessError: If the link returns a client error
+            status; reget doesn't retry these
+        :raises NoAccessError: If the link returns a server error status
+        :raises ProbeBadDocumentError: If the response can't be a valid
+            document
+
+        """
+        try:
+            result = browser.probe(link, method=self.probe_method)
+            # Fall back to a Range request if HEAD is not allowed; some
+            # servers forbid HEAD but serve GET
+            if result.code in (403, 405, 501) and self.probe_method == 'HEAD':
+                result = browser.probe(link, method='GET')
+        except Exception as error:
+            logger.debug('Probe of {0} failed: {1!r}'.format(link, error))
+            return None
+
+        self.check_probe(result)
+        return result
 
-    def get(self, cache, browser):
-        """ Download document, then store in cache. """
+    def check_probe(self, result):
+        """ Raise an error if a probed response is known to be bad. """
+
+        if result.code in (405, 501):
+            return
+        if 400 <= result.code < 500:
+            raise ProbeNoAccessError(
+                'No access: status {0}'.format(result.code)
+            )
+        # Server errors may be transient, so the download is retried
+        if result.code >= 500:
+            raise NoAccessError('No access: status {0}'.format(result.code))
+
+        content_type = result.content_type or ''
+        for pattern in self._probe_reject_types:
+            if re.search(pattern, content_type, re.I):
+                raise ProbeBadDocumentError(
+                    'Bad content type: {0}'.format(content_type)
+                )
+
+        if self.probe_max_length and result.length and \
+                result.length > self.probe_max_length:
+            raise ProbeBadDocumentError(
+                'Document too large: {0} bytes'.format(result.length)
+            )
+
+    def get(self, cache, browser, link=None):
+        """ Download document, then store in cache.
+
+        :param link: Known document link (e.g. from linkpredict); if
+            given, get_link() is skipped
+
+        """
+        timings = cache.timings
+        getter = self.__class__.__name__
 
         # Get document link
-        link = self.get_link(cache, browser)
+        if link is None:
+            with timings.span('get_link', getter=getter):
+                link = self.get_link(cache, browser)
         if not link:
             raise NoAccessError('No access')
+
+        # Check link before downloading
+        if self.probe:
+            with timings.span('probe', getter=getter):
+                self.probe_link(browser, link)
+
         if link:
-            try:
-                browser.open(link)
-            except:
-                raise NoAccessError('No access')
-            cache.html, cache.qhtml = browser.get_docs()
+            with timings.span('download', getter=getter):
+                try:
+                    browser.open(link)
+                except:
+                    raise NoAccessError('No access')
+                cache.html, cache.qhtml = browser.get_docs()
         else:
             cache.html, cache.qhtml = cache.init_html, cache.init_qhtml
 
         # Run optional post-processing steps
-        self.post_process(cache, browser)
+        with timings.span('post_process', getter=getter):
+            self.post_process(cache, browser)
 
         # Check access
-        if not self.check_access(cache.html, cache.qhtml):
+        with timings.span('check_access', getter=getter):
+            has_access, rule = self.match_access(cache.html, cache.qhtml)
+        cache.access_rule = rule
+        if not has_access:
+            logger.info('No access: {0} matched {1!r}'.format(getter, rule))
             raise NoAccessError('No access')
 
         # Validate result
-        if not self.validate(cache.html):
+        with timings.span('validate', getter=getter):
+            valid = self.validate(cache.html)
+        if not valid:
             raise BadDocumentError('Bad document')
 
         return True
 
-    @retry.retry(Exception)
+    # Links rejected by probes fail fast
+    @retry.retry(Exception, giveup=ProbeError)
     def reget(self, cache, browser):
         return self.get(cache, browser)
 
+    def navigate(self, cache, browser, key, steps):
+        """ Run navigation steps once per article. Links in the returned
+        page are absolute (see PubBrowser.get_docs), so they can be
+        followed from any browser state.
+
+        :param key: Name of navigation step, shared by sibling getters
+        :param steps: Function of (cache, browser) that browses to a page
+        :return: NavPage of the resulting page
+
+        """
+        def fetch():
+            steps(cache, browser)
+            html, qhtml = browser.get_docs()
+            return NavPage(browser.geturl(), html, qhtml)
+
+        nav = getattr(cache, 'nav', None)
+        if nav is None:
+            return fetch()
+        return nav.get(key, fetch)
+
 class MetaGetter(DocGetter):
     """Base class for getters that use <meta> tags.
 
@@ -158,6 +425,18 @@ class HTMLGetter(DocGetter):
     """Base class for HTML getters.
 
     """
+    _probe_reject_types = DocGetter._probe_reject_types + [
+        r'application/pdf',
+    ]
+
+    def check_probe(self, result):
+
+        super(HTMLGetter, self).check_probe(result)
+
+        # Range probes can catch PDFs served with generic content types
+        if '%PDF-' in result.head[:1024]:
+            raise ProbeBadDocumentError('Bad document: PDF')
+
     def validate(self, text):
 
         return not utils.ispdf(text)
@@ -194,7 +473,7 @@ class PMCGetter(HTMLGetter):
     def validate(self, text):
         return not bool(re.search('ipmc11|ipmc12', text, re.I))
 
-    @retry.retry(Exception, tries=3, backoff=1)
+    @retry.retry(Exception, tries=3, backoff=1, giveup=ProbeError)
     def reget(self, cache, browser):
         return self.get(cache, browser)
 
@@ -301,13 +580,16 @@ class APAGetter(DocGetter):
         browser._b['GuidedSearchFormData[1].SearchTerm'] = apa_id
         browser._b.submit(type='submit')
 
+    def splash(self, cache, browser):
+        '''Get APA splash page, shared by HTML and PDF getters.'''
+        return self.navigate(cache, browser, 'apa_splash', self.open_splash)
+
 class APAHTMLGetter(APAGetter, HTMLGetter):
 
     def get_link(self, cache, browser):
 
         # Open splash page
-        self.open_splash(cache, browser)
-        html, qhtml = browser.get_docs()
+        qhtml = self.splash(cache, browser).qhtml
 
         # Return full-text HTML link
         return qhtml('[title^="HTML Full Text"]').attr('href')
@@ -317,8 +599,7 @@ class APAPDFGetter(APAGetter, PDFGetter):
     def get_link(self, cache, browser):
 
         # Open splash page
-        self.open_splash(cache, browser)
-        html, qhtml = browser.get_docs()
+        qhtml = self.splash(cache, browser).qhtml
 
         # Open PDF wrapper page
         pdf_wrap_link = qhtml('[title^="PDF Full Text"]').attr('href')
@@ -365,6 +646,19 @@ class WoltersKluwerGetter(DocGetter):
             urllib.urlencode(lww_params)
         )
 
+    def open_welcome(self, cache, browser):
+        '''Browse to LWW welcome page.'''
+
+        # Get welcome link
+        welcome_link = WoltersKluwerGetter.get_link(self, cache, browser)
+
+        # Browse to welcome link
+        browser.open(welcome_link)
+
+    def welcome(self, cache, browser):
+        '''Get LWW welcome page, shared by HTML and PDF getters.'''
+        return self.navigate(cache, browser, 'lww_welcome', self.open_welcome)
+
 class WoltersKluwerHTMLGetter(WoltersKluwerGetter, MetaHTMLGetter):
 
     _attrs = [
@@ -373,14 +667,11 @@ class WoltersKluwerHTMLGetter(WoltersKluwerGetter, MetaHTMLGetter):
 
     def get_link(self, cache, browser):
 
-        # Get welcome link
-        welcome_link = WoltersKluwerGetter.get_link(self, cache, browser)
-
-        # Browse to welcome link
-        browser.open(welcome_link)
+        # Browse to welcome page
+        page = self.welcome(cache, browser)
 
         # Hack: Overwrite initial documents with LWW page
-        cache.init_html, cache.init_qhtml = browser.get_docs()
+        cache.init_html, cache.init_qhtml = page.html, page.qhtml
 
         # Get full-text link
         return MetaHTMLGetter.get_link(self, cache, browser)
@@ -389,12 +680,8 @@ class WoltersKluwerPDFGetter(WoltersKluwerGetter, PDFGetter):
 
     def get_link(self, cache, browser):
 
-        # Get welcome link
-        welcome_link = WoltersKluwerGetter.get_link(self, cache, browser)
-
-        # Browse to welcome link
-        browser.open(welcome_link)
-        _, qhtml = browser.get_docs()
+        # Browse to welcome page
+        qhtml = self.welcome(cache, browser).qhtml
 
         # Get PDF link
         link = qhtml('.ej-box-01-body-li-article-tools-pdf a')\
@@ -508,7 +795,7 @@ class NPGPDFGetter(NPGGetter, PDFGetter):
 
 class NatureOldGetter(NPGGetter):
 
-    def get_link(self, cache, browser):
+    def open_doifinder(self, cache, browser):
         """Some old Nature articles (e.g. PMID 10862705) are routed through
         Nature's doifinder service; detect doifinder links and browse to real
         content.
@@ -518,17 +805,21 @@ class NatureOldGetter(NPGGetter):
         if doifinder_link:
             browser.open(doifinder_link)
 
+    def content(self, cache, browser):
+        """Get content page, shared by HTML and PDF getters."""
+        return self.navigate(
+            cache, browser, 'npg_doifinder', self.open_doifinder
+        )
+
 class NPGOldHTMLGetter(NatureOldGetter, HTMLGetter):
 
     def get_link(self, cache, browser):
-        NatureOldGetter.get_link(self, cache, browser)
-        return browser.geturl()
+        return self.content(cache, browser).url
 
 class NPGOldPDFGetter(NatureOldGetter, PDFGetter):
 
     def get_link(self, cache, browser):
-        NatureOldGetter.get_link(self, cache, browser)
-        html, qhtml = browser.get_docs()
+        qhtml = self.content(cache, browser).qhtml
         return qhtml('a[href$="pdf"]').attr('href')
 
 ########
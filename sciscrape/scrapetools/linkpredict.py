@@ -0,0 +1,141 @@
+"""
+Rule-based prediction of full-text and PDF links. Many publishers serve
+documents at URLs derived from the landing page URL (e.g. /doi/abs/ ->
+/doi/full/), so the document can be fetched directly, without parsing
+the landing page or browsing back to it first:
+
+    >>> predictor = LinkPredictor()
+    >>> predictor.predict('mit', 'pdf', 'http://www.mitpressjournals.org/doi/abs/10.1162/jocn.2009.21407')
+    'http://www.mitpressjournals.org/doi/pdfplus/10.1162/jocn.2009.21407'
+
+Scrape falls back to the getter's get_link() logic when a predicted link
+fails, and the predictor keeps per-publisher hit / miss counts so that
+unreliable rules can be spotted.
+"""
+
+# Imports
+import re
+import collections
+
+class LinkRule(object):
+    """Rewrite a landing page URL using a regular expression."""
+
+    def __init__(self, pattern, template):
+        """
+
+        :param pattern: Regular expression matching the whole landing URL
+        :param template: Replacement template, as in re.sub
+
+        """
+        self.pattern = re.compile(pattern, re.I)
+        self.template = template
+
+    def __repr__(self):
+        return 'LinkRule({0!r}, {1!r})'.format(
+            self.pattern.pattern, self.template
+        )
+
+    def apply(self, url):
+        """Predict a link from a landing URL, or None if the rule does
+        not match."""
+        match = self.pattern.match(url)
+        if match:
+            return match.expand(self.template)
+
+# Atypon-style /doi/abs/<doi> landing pages; query strings are dropped
+DOI_FULL = LinkRule(r'^(.*?/doi/)abs/([^?#]+)', r'\1full/\2')
+DOI_PDFPLUS = LinkRule(r'^(.*?/doi/)abs/([^?#]+)', r'\1pdfplus/\2')
+
+# Rules by publisher and document type. Publishers whose HTML getter
+# reuses the landing page (e.g. PassHTMLGetter) have no HTML rule, since
+# prediction would only add a request.
+RULES = {
+    'mit': {
+        'html': [DOI_FULL],
+        'pdf': [DOI_PDFPLUS],
+    },
+    'informa': {
+        'html': [DOI_FULL],
+        'pdf': [DOI_PDFPLUS],
+    },
+    'maney': {
+        'html': [DOI_FULL],
+        'pdf': [DOI_PDFPLUS],
+    },
+    'wiley': {
+        'html': [LinkRule(r'^(.*)/abstract(?:[?#].*)?$', r'\1/full')],
+    },
+    'npg': {
+        'pdf': [LinkRule(
+            r'^(.*)/full/([^/?#]+)\.html(?:[?#].*)?$', r'\1/pdf/\2.pdf'
+        )],
+    },
+    'highwire': {
+        'html': [LinkRule(r'^(.*)\.(?:long|abstract)(?:[?#].*)?$', r'\1.full')],
+        'pdf': [LinkRule(
+            r'^(.*?)\.(?:long|abstract|full)(?:[?#].*)?$', r'\1.full.pdf'
+        )],
+    },
+    'frontiers': {
+        'html': [LinkRule(r'^(.*)/abstract(?:[?#].*)?$', r'\1/full')],
+        'pdf': [LinkRule(r'^(.*)/(?:full|abstract)(?:[?#].*)?$', r'\1/pdf')],
+    },
+    'thieme': {
+        'html': [LinkRule(
+            r'^(.*?)/DOI/DOI\?(.+)$', r'\1/products/ejournals/html/\2'
+        )],
+        'pdf': [LinkRule(
+            r'^(.*?)/DOI/DOI\?(.+)$', r'\1/products/ejournals/pdf/\2.pdf'
+        )],
+    },
+    'jstage': {
+        'pdf': [LinkRule(r'^(.*)/_article(?:[/?#].*)?$', r'\1/_pdf')],
+    },
+}
+
+class LinkPredictor(object):
+    """Predict document links from landing URLs and track hit rates.
+
+    Counters in `stats`, by publisher:
+        hits : Predicted links that returned a valid document
+        misses : Predicted links that failed
+    """
+
+    def __init__(self, rules=None):
+        """
+
+        :param rules: Dictionary of publisher -> document type -> list
+            of LinkRules; defaults to RULES
+
+        """
+        self.rules = RULES if rules is None else rules
+        self.stats = collections.defaultdict(collections.Counter)
+
+    def predict(self, publisher, doc_type, url):
+        """Predict a document link.
+
+        :param publisher: Publisher name from pubdet
+        :param doc_type: Document type, e.g. 'pdf'
+        :param url: Landing page URL
+        :return: Predicted link, or None if no rule matches
+
+        """
+        if not url:
+            return None
+        rules = self.rules.get(publisher, {}).get(doc_type, [])
+        for rule in rules:
+            link = rule.apply(url)
+            if link:
+                return link
+
+    def record(self, publisher, hit):
+        """Record the outcome of a predicted link."""
+        self.stats[publisher]['hits' if hit else 'misses'] += 1
+
+    def hit_rate(self, publisher):
+        """Fraction of predicted links that succeeded, or None if no
+        links have been predicted for a publisher."""
+        counts = self.stats.get(publisher, {})
+        total = counts.get('hits', 0) + counts.get('misses', 0)
+        if total:
+            return float(counts.get('hits', 0)) / total
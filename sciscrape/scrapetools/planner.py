@@ -0,0 +1,147 @@
+"""
+Cost-aware planning of document downloads. Given a goal, FetchPlanner
+orders getters by preference and expected cost, using per-publisher
+success rates and latencies from a MetricsRegistry when available, and
+tells Scrape when to stop:
+
+    >>> registry = metrics.MetricsRegistry()
+    >>> scraper = scrape.Scrape(sink=registry, registry=registry)
+    >>> info = scraper.scrape(doi=doi, goal='tables')
+
+Goals:
+    all : Fetch every document type (default)
+    any : Stop after any full-text document
+    pdf : Prefer PDF; fall back to HTML / PMC if it fails
+    tables : Prefer documents with <table> markup (PMC, publisher HTML)
+        for table extraction; stop once an HTML document has coordinate
+        tables, and otherwise fall back to PDF
+"""
+
+# Imports
+import logging
+import collections
+
+logger = logging.getLogger(__name__)
+
+# Prior cost of each getter in seconds, used until metrics are available
+DEFAULT_COSTS = {
+    'pmc': 2.0,
+    'html': 3.0,
+    'pdf': 6.0,
+}
+
+def has_tables(doc_type, doc):
+    """Check whether a document may contain coordinate tables. HTML
+    documents are parsed; PDFs can only be checked by extraction, so
+    they are accepted."""
+    if doc_type == 'pdf':
+        return True
+    # Imported here so that scraping doesn't require the parsing stack
+    from lxml import etree
+    from sciscrape.parsetools import sciparse
+    try:
+        tables = sciparse.HTMLTableParse().parse(doc)
+    except (etree.LxmlError, ValueError) as error:
+        logger.debug('Could not parse {0} tables: {1!r}'.format(
+            doc_type, error
+        ))
+        return False
+    return any(len(table.coords) for table in tables)
+
+# Goal definitions. Tiers order getters before cost is considered;
+# doc types missing from tiers are tried last. accept is a function of
+# (doc_type, doc) checking whether a fetched document meets the goal, or
+# None to accept any document.
+Goal = collections.namedtuple('Goal', ['tiers', 'stop_early', 'accept'])
+
+GOALS = {
+    'all': Goal({}, False, None),
+    'any': Goal({}, True, None),
+    'pdf': Goal({'pdf': 0}, True, None),
+    'tables': Goal({'pmc': 0, 'html': 0}, True, has_tables),
+}
+
+class FetchPlanner(object):
+    """Order getters for a goal by preference and expected cost."""
+
+    # Pseudo-counts for smoothing success rates toward 1/2
+    prior_count = 1.0
+
+    def __init__(self, registry=None, costs=None):
+        """
+
+        :param registry: Optional MetricsRegistry with historical
+            outcomes and latencies
+        :param costs: Prior cost per document type; see DEFAULT_COSTS
+
+        """
+        self.registry = registry
+        self.costs = dict(DEFAULT_COSTS)
+        self.costs.update(costs or {})
+
+    def success_rate(self, publisher, doc_type):
+        """Smoothed historical success rate of a getter."""
+        successes, total = 0, 0
+        if self.registry is not None:
+            outcomes = self.registry.outcomes(publisher, doc_type)
+            successes = outcomes.get('success', 0)
+            total = sum(outcomes.values())
+        return (successes + self.prior_count) / (total + 2 * self.prior_count)
+
+    def latency(self, publisher, doc_type):
+        """Mean historical latency of a getter, or its prior cost."""
+        if self.registry is not None:
+            mean = self.registry.mean_latency(publisher, doc_type, 'get')
+            if mean is not None:
+                return mean
+        return self.costs.get(doc_type, max(self.costs.values()))
+
+    def expected_cost(self, publisher, doc_type):
+        """Expected seconds per successful download: mean latency
+        divided by success rate."""
+        return self.latency(publisher, doc_type) / \
+            self.success_rate(publisher, doc_type)
+
+    def plan(self, publisher, goal, doc_types):
+        """Order document types to fetch.
+
+        :param publisher: Publisher name from pubdet
+        :param goal: Goal name; see GOALS
+        :param doc_types: Candidate document types
+        :return: List of document types, in fetch order
+
+        """
+        goal = get_goal(goal)
+        if not goal.stop_early:
+            return list(doc_types)
+        return sorted(
+            doc_types,
+            key=lambda doc_type: (
+                goal.tiers.get(doc_type, len(goal.tiers) + 1),
+                self.expected_cost(publisher, doc_type),
+            )
+        )
+
+    def satisfied(self, goal, info):
+        """Check whether fetched documents satisfy a goal. Checks are
+        cached in info.accepted, so each document is checked once per
+        article even though this is called before every getter."""
+        goal = get_goal(goal)
+        if not goal.stop_early:
+            return False
+        if goal.accept is None:
+            return bool(info.docs)
+        for doc_type, doc in info.docs.items():
+            key = (goal.accept, doc_type)
+            if key not in info.accepted:
+                info.accepted[key] = goal.accept(doc_type, doc)
+            if info.accepted[key]:
+                return True
+        return False
+
+def get_goal(goal):
+
+    try:
+        return GOALS[goal]
+    except KeyError:
+        raise ValueError('Unknown goal: {0}'.format(goal))
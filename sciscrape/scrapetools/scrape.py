@@ -9,6 +9,7 @@ files using the appropriate Getter classes from getters.py.
 # Imports
 import os
 import re
+import socket
 import logging
 import urlparse
 import collections
@@ -18,12 +19,17 @@ from httplib import HTTPException
 # Project imports
 from sciscrape.scrapetools import pubdet
 from sciscrape.scrapetools import getters
+from sciscrape.scrapetools.planner import FetchPlanner
 from sciscrape.utils import utils
 from sciscrape.utils import pubtools
 from sciscrape.utils import mechtools
 from sciscrape.utils import pmid_doi
 from sciscrape.utils import retry
-from sciscrape.exceptions import ScrapeError, BadDOIError
+from sciscrape.utils import timing
+from sciscrape.utils import replay
+from sciscrape.exceptions import (
+    ScrapeError, BadDOIError, NotFoundError, NoAccessError, BadDocumentError
+)
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +40,13 @@ pubtools.email = 'foo@bar.com'
 DOI_URL = 'http://dx.doi.org/'
 PUBMED_URL = 'http://www.ncbi.nlm.nih.gov/pubmed/'
 
+# Errors from fetching or validating a document, as opposed to bugs in
+# getters; a predicted link failing with one of these is a miss
+FETCH_ERRORS = (
+    NotFoundError, NoAccessError, BadDocumentError,
+    URLError, HTTPException, socket.error,
+)
+
 EXTENSIONS = {
     'pmc': 'pmc',
     'html': 'html',
@@ -106,7 +119,7 @@ getter_map['pdf']['maney'] = getters.ManeyPDFGetter
 
 class ScrapeInfo(object):
 
-    def __init__(self, doi=None, pmid=None):
+    def __init__(self, doi=None, pmid=None, sink=None):
 
         # Initialize identifiers
         self.doi = doi
@@ -116,6 +129,17 @@ class ScrapeInfo(object):
         self.docs = {}
         self.status = {}
 
+        # Document types in the order they were planned, and goal checks
+        # of fetched documents; see planner
+        self.plan = []
+        self.accepted = {}
+
+        # Pages shared by getters for this article
+        self.nav = getters.NavigationCache()
+
+        # Initialize stage timings
+        self.timings = timing.Timings(sink)
+
     @property
     def pretty_status(self):
         return '; '.join(['%s: %s' % (k, self.status[k]) for k in self.status])
@@ -155,19 +179,46 @@ class Scrape(object):
     # Browser class
     _browser_klass = mechtools.PubBrowser
 
-    def __init__(self, agent='sciscrape', timeout=None, **kwargs):
+    def __init__(self, agent='sciscrape', timeout=None, sink=None,
+                 planner=None, registry=None, predictor=None, probe=False,
+                 **kwargs):
+        """
+
+        :param agent: Agent string
+        :param timeout: Default timeout for browser requests
+        :param sink: Optional MetricsSink notified of stage timings;
+            see sciscrape.utils.timing
+        :param planner: FetchPlanner used to order getters; defaults to
+            one using the history in `registry`
+        :param registry: Optional MetricsRegistry with historical
+            outcomes and latencies for the default planner; pass the
+            same registry as `sink` to keep it up to date
+        :param predictor: Optional LinkPredictor used to fetch documents
+            without parsing the landing page, e.g. LinkPredictor() for
+            the built-in rules. Mispredicted links cost extra requests
+            before the getter's usual logic runs.
+        :param probe: Check status and headers of document links before
+            downloading them; see DocGetter.probe_link
 
+        """
         self.browser = self._browser_klass(
             agent=agent, timeout=timeout, **kwargs
         )
+        self.sink = sink
+        self.planner = planner or FetchPlanner(registry=registry)
+        self.predictor = predictor
+        self.probe = probe
         self.info = ScrapeInfo()
 
-    def scrape(self, doi=None, pmid=None, fetch_pmid=True, fetch_types=None):
+    def scrape(self, doi=None, pmid=None, fetch_pmid=True, fetch_types=None,
+               goal='all'):
         """Download documents for a target article.
 
         :param doi: Article DOI
         :param pmid: Article PubMed ID
         :param fetch_pmid: Look up PMID if not provided
+        :param goal: Stop once documents satisfy this goal; see
+            sciscrape.scrapetools.planner
         :return: ScrapeInfo instance
 
         """
@@ -175,68 +226,158 @@ class Scrape(object):
             doi, pmid,
         ))
         # Initialize ScrapeInfo object to store results
-        self.info = ScrapeInfo(doi, pmid)
+        self.info = ScrapeInfo(doi, pmid, sink=self.sink)
+        timings = self.info.timings
+        self.browser.timings = timings
 
         # Get publisher link
         pub_link = None
         if doi:
             try:
-                pub_link = self._resolve_doi(doi)
+                with timings.span('resolve_doi'):
+                    pub_link = self._resolve_doi(doi)
             except BadDOIError:
                 logger.info('Could not resolve DOI {}'.format(doi))
             if not pmid and fetch_pmid:
                 logger.info('Looking up PMID by DOI')
-                self.info.pmid = pmid_doi.pmid_doi({'doi': doi})['pmid']
+                with timings.span('lookup_pmid'):
+                    self.info.pmid = pmid_doi.pmid_doi({'doi': doi})['pmid']
         if pmid and not pub_link:
-            pub_link = self._resolve_pmid(pmid)
+            with timings.span('resolve_pmid'):
+                pub_link = self._resolve_pmid(pmid)
 
         # Quit if no publisher link found
         if not pub_link:
             raise ScrapeError('No publisher link found')
 
+        return self._fetch_documents(pub_link, fetch_types, goal)
+
+    def scrape_link(self, link, doi=None, pmid=None, fetch_types=None,
+                    goal='all'):
+        """Download documents for a target article, starting from a
+        known publisher link rather than resolving a DOI or PMID.
+
+        :param link: Publisher link
+        :param doi: Article DOI
+        :param pmid: Article PubMed ID
+        :param goal: Stop once documents satisfy this goal
+        :return: ScrapeInfo instance
+
+        """
+        logger.info('Fetching article from link {0}'.format(link))
+
+        # Initialize ScrapeInfo object to store results
+        self.info = ScrapeInfo(doi, pmid, sink=self.sink)
+        self.browser.timings = self.info.timings
+
+        # Follow publisher link
+        with self.info.timings.span('resolve_link'):
+            pub_link = self._resolve_link(link)
+
+        return self._fetch_documents(pub_link, fetch_types, goal)
+
+    def _fetch_documents(self, pub_link, fetch_types=None, goal='all'):
+        """Detect publisher and download documents from the current
+        publisher link."""
+
+        timings = self.info.timings
+
         # Log publisher link to ScrapeInfo
         self.info.pub_link = pub_link
 
         # Detect publisher
-        self.info.publisher = pubdet.pubdet(self.info.init_html)
+        with timings.span('pubdet'):
+            self.info.publisher = pubdet.pubdet(self.info.init_html)
+
+        # Skip documents not to be included and getters set to false-y
+        doc_types = [
+            doc_type
+            for doc_type in getter_map
+            if not (fetch_types and doc_type not in fetch_types)
+            and getter_map[doc_type][self.info.publisher]
+        ]
+
+        # Order getters for goal
+        self.info.plan = self.planner.plan(
+            self.info.publisher, goal, doc_types
+        )
 
         # Get documents
-        for doc_type in getter_map:
+        for doc_type in self.info.plan:
 
-            # Skip documents not to be included
-            if fetch_types and doc_type not in fetch_types:
-                continue
+            # Stop if goal is met
+            if self.planner.satisfied(goal, self.info):
+                break
 
             # Identify getter
             getter_class = getter_map[doc_type][self.info.publisher]
 
-            # Skip if getter is set to false-y
-            if not getter_class:
-                continue
-
             # Construct getter
             getter = getter_class()
-
-            # Browser to publisher link
-            if self.browser.geturl() != pub_link:
-                try:
-                    self.browser.reopen(pub_link)
-                except URLError:
-                    self.info.status[doc_type] = 'Timeout'
+            if self.probe:
+                getter.probe = True
 
             # Get document
             try:
                 # Success
-                get_success = getter.reget(self.info, self.browser)
+                with timings.span('get', doc_type=doc_type,
+                                  publisher=self.info.publisher):
+                    if not self._get_predicted(getter, doc_type, pub_link):
+                        self._get_linked(getter, doc_type, pub_link)
                 self.info.docs[doc_type] = self.info.html
                 self.info.status[doc_type] = 'Success'
             except Exception as error:
                 # Failure
                 self.info.status[doc_type] = repr(error)
 
+        # Notify metrics sink
+        if self.sink:
+            self.sink.finish(self.info)
+
         # Return ScrapeInfo object
         return self.info
 
+    def _get_predicted(self, getter, doc_type, pub_link):
+        """Fetch a document from its predicted link, skipping the
+        landing page. Return True on success and False if there is no
+        prediction or the predicted link fails. Predicted links get a
+        single attempt, without the retries of reget, so that a miss
+        falls back quickly."""
+
+        if not self.predictor:
+            return False
+        link = self.predictor.predict(
+            self.info.publisher, doc_type, pub_link
+        )
+        if not link:
+            return False
+
+        try:
+            with self.info.timings.span('get_predicted', doc_type=doc_type):
+                getter.get(self.info, self.browser, link=link)
+        except FETCH_ERRORS as error:
+            logger.info('Predicted link {0} failed: {1!r}'.format(
+                link, error
+            ))
+            self.predictor.record(self.info.publisher, False)
+            return False
+
+        self.predictor.record(self.info.publisher, True)
+        return True
+
+    def _get_linked(self, getter, doc_type, pub_link):
+        """Fetch a document using the getter's link logic, starting from
+        the publisher link."""
+
+        # Browse to publisher link
+        if self.browser.geturl() != pub_link:
+            try:
+                self.browser.reopen(pub_link)
+            except URLError:
+                self.info.status[doc_type] = 'Timeout'
+
+        return getter.reget(self.info, self.browser)
+
 
     @retry.retry((HTTPError, HTTPException, URLError), tries=3, default='')
     def _resolve_doi(self, doi):
@@ -274,16 +415,31 @@ class Scrape(object):
 
         # Follow publisher link
         if pub_link:
+            return self._resolve_link(pub_link)
 
-            # Browse to link
-            self.browser.open(pub_link)
+    def _resolve_link(self, link):
+        """Follow publisher link, store HTML, and return final URL."""
 
-            # Read documents and save in ScrapeInfo
-            self.info.init_html, self.info.init_qhtml = self.browser.get_docs()
+        # Browse to link
+        self.browser.open(link)
 
-            # Return URL
-            return self.browser.geturl()
+        # Read documents and save in ScrapeInfo
+        self.info.init_html, self.info.init_qhtml = self.browser.get_docs()
+
+        # Return URL
+        return self.browser.geturl()
 
 class UMScrape(Scrape):
 
     _browser_klass = mechtools.UMBrowser
+
+class RecordScrape(Scrape):
+    """Scraper that records all responses; pass cassette=Cassette()."""
+
+    _browser_klass = replay.RecordingBrowser
+
+class ReplayScrape(Scrape):
+    """Scraper that replays recorded responses; pass
+    server_url=CassetteServer.url."""
+
+    _browser_klass = replay.ReplayBrowser
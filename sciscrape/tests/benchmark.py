@@ -0,0 +1,243 @@
+'''
+Accuracy benchmark for PDF table extraction. Compares tables extracted
+from PDFs with hand-coded tables for several journals, spreading
+articles across a process pool and reusing cached extraction results,
+so that parser changes can be evaluated without re-querying PDFx.
+Results are saved as CSV so runs can be diffed:
+
+    python -m sciscrape.tests.benchmark run jocn nimg --out new.csv
+    python -m sciscrape.tests.benchmark diff old.csv new.csv
+'''
+
+# Imports
+import os
+import glob
+import time
+import argparse
+import multiprocessing
+import pandas as pd
+
+# Project imports
+from sciscrape.parsetools import sciparse
+from sciscrape.pdftools import pdfx
+from sciscrape.pdftools import local
+from sciscrape.pdftools import cache
+from sciscrape.tests import pdftest
+from sciscrape.tests import populate
+from sciscrape.utils import timing
+from sciscrape import tests
+
+# Pipeline stages timed for each article
+STAGES = ['read_csv', 'extract', 'parse', 'compare']
+
+# Score columns
+SCORES = ['tp', 'fp', 'fn']
+
+# Per-process parser and tolerance; see _init_worker
+_parser = None
+_tol = None
+
+def find_articles(journal, data_dir=tests.data_dir):
+    '''Get (journal, article ID, CSV path, PDF path) tuples for a journal.'''
+    articles = []
+    for csv_file in sorted(glob.glob('%s/csv/%s/*.csv' % (data_dir, journal))):
+        article_id = os.path.split(csv_file)[1].split('.csv')[0]
+        pdf_file = csv_file\
+            .replace('/csv/', '/doc/')\
+            .replace('.csv', '.pdf')
+        articles.append((journal, article_id, csv_file, pdf_file))
+    return articles
+
+def _init_worker(extractor, tol):
+    global _parser, _tol
+    _parser = sciparse.PDFTableParse(extractor=extractor)
+    _tol = tol
+
+def _evaluate(article):
+    '''Evaluate a single article in a worker process.'''
+    return evaluate(article, _parser, _tol)
+
+def evaluate(article, parser, tol=0.0):
+    '''Compare extracted and hand-coded tables for an article.
+
+    :param article: Tuple from find_articles()
+    :param parser: PDFTableParse instance
+    :param tol: Maximum distance between matching coordinates
+    :return: Dictionary of scores, coordinate counts, and seconds per
+        stage; "error" is set if the article could not be evaluated
+
+    '''
+    journal, article_id, csv_file, pdf_file = article
+    result = {'jn': journal, 'id': article_id, 'error': None}
+    timings = timing.Timings()
+
+    try:
+        with timings.span('read_csv'):
+            csv_tables = pdftest.read_tables_csv(csv_file)
+        with timings.span('extract'):
+            with open(pdf_file, 'rb') as pdf:
+                qpdf = parser.extractor.extract(pdf)
+        if qpdf is None:
+            raise ValueError('Extraction failed')
+        with timings.span('parse'):
+            pdf_tables = parser.parse_xml(qpdf)
+        with timings.span('compare'):
+            result.update(
+                pdftest.compare_table_groups(csv_tables, pdf_tables, tol)
+            )
+        result['n_ref'] = sum(len(table.coords) for table in csv_tables)
+        result['n_cmp'] = sum(len(table.coords) for table in pdf_tables)
+    except Exception as error:
+        result['error'] = '{0}: {1}'.format(type(error).__name__, error)
+
+    for stage in STAGES:
+        result['t_' + stage] = timings.total(stage)
+
+    return result
+
+def run(journals, extractor=None, cache_dir=pdftest.CACHE_DIR, tol=0.0,
+        processes=None, data_dir=tests.data_dir, download=False):
+    '''Evaluate extraction accuracy for several journals in parallel.
+
+    :param journals: List of journal names
+    :param extractor: PDF extractor; defaults to PDFx
+    :param cache_dir: Directory for cached extraction results; set to
+        None to disable caching
+    :param tol: Maximum distance between matching coordinates
+    :param processes: Number of worker processes; defaults to the
+        number of CPUs
+    :param data_dir: Directory containing csv/ and doc/ folders
+    :param download: Download missing PDFs with populate() first
+    :return: DataFrame with one row per article
+
+    '''
+    extractor = extractor or pdfx.PDFExtractor()
+    if cache_dir:
+        extractor = cache.CachedExtractor(extractor, cache_dir)
+
+    if download:
+        for journal in journals:
+            populate.populate(journal)
+
+    articles = [
+        article
+        for journal in journals
+        for article in find_articles(journal, data_dir)
+    ]
+
+    pool = multiprocessing.Pool(
+        processes, initializer=_init_worker, initargs=(extractor, tol)
+    )
+    try:
+        results = pool.map(_evaluate, articles, chunksize=1)
+    finally:
+        pool.terminate()
+
+    columns = ['jn', 'id'] + SCORES + ['n_ref', 'n_cmp'] + \
+        ['t_' + stage for stage in STAGES] + ['error']
+    return pd.DataFrame(results, columns=columns)
+
+def summarize(results):
+    '''Get mean scores and total seconds per stage, by journal and
+    overall. Articles that could not be evaluated are excluded from
+    scores and counted separately.'''
+
+    rows = []
+    for journal, group in [('all', results)] + list(results.groupby('jn')):
+        ok = group[group['error'].isnull()]
+        row = {'jn': journal, 'articles': len(group), 'errors': len(group) - len(ok)}
+        for score in SCORES:
+            row[score] = ok[score].mean()
+        for stage in STAGES:
+            row['t_' + stage] = group['t_' + stage].sum()
+        rows.append(row)
+
+    columns = ['jn', 'articles', 'errors'] + SCORES + \
+        ['t_' + stage for stage in STAGES]
+    return pd.DataFrame(rows, columns=columns)
+
+def save(results, path):
+    '''Save per-article results as CSV, sorted for stable diffs.'''
+    results.sort_values(['jn', 'id']).to_csv(
+        path, index=False, float_format='%.6f'
+    )
+
+def load(path):
+    return pd.read_csv(path, dtype={'id': str})
+
+def diff(old, new, tol=1e-6):
+    '''Compare scores between two runs.
+
+    :param old: Results DataFrame or path to saved results
+    :param new: Results DataFrame or path to saved results
+    :param tol: Smallest score difference reported; saved scores are
+        rounded to six decimal places
+    :return: DataFrame of articles whose scores changed, with old and
+        new scores and their differences
+
+    '''
+    if isinstance(old, basestring):
+        old = load(old)
+    if isinstance(new, basestring):
+        new = load(new)
+
+    merged = pd.merge(
+        old[['jn', 'id'] + SCORES], new[['jn', 'id'] + SCORES],
+        on=['jn', 'id'], how='outer', suffixes=('_old', '_new'),
+    )
+    changed = pd.Series(False, index=merged.index)
+    for score in SCORES:
+        delta = merged[score + '_new'] - merged[score + '_old']
+        merged['d_' + score] = delta
+        changed |= (delta.abs() > tol) | \
+            (merged[score + '_new'].isnull() != merged[score + '_old'].isnull())
+
+    return merged[changed].sort_values(['jn', 'id']).reset_index(drop=True)
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    subparsers = parser.add_subparsers(dest='command')
+
+    run_parser = subparsers.add_parser('run', help='run benchmark')
+    run_parser.add_argument('journals', nargs='+')
+    run_parser.add_argument('--out', help='save per-article results')
+    run_parser.add_argument('--processes', type=int, default=None)
+    run_parser.add_argument('--tol', type=float, default=0.0)
+    run_parser.add_argument('--local', action='store_true',
+                            help='extract tables locally instead of using PDFx')
+    run_parser.add_argument('--no-cache', action='store_true')
+    run_parser.add_argument('--download', action='store_true',
+                            help='download missing PDFs first')
+
+    diff_parser = subparsers.add_parser('diff', help='compare two runs')
+    diff_parser.add_argument('old')
+    diff_parser.add_argument('new')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        start = time.time()
+        results = run(
+            args.journals,
+            extractor=local.LocalExtractor() if args.local else None,
+            cache_dir=None if args.no_cache else pdftest.CACHE_DIR,
+            tol=args.tol,
+            processes=args.processes,
+            download=args.download,
+        )
+        if args.out:
+            save(results, args.out)
+        print summarize(results).to_string(index=False)
+        print 'Seconds: %.2f' % (time.time() - start)
+    elif args.command == 'diff':
+        old, new = load(args.old), load(args.new)
+        print summarize(old).to_string(index=False)
+        print summarize(new).to_string(index=False)
+        changed = diff(old, new)
+        print 'Changed articles: %d' % (len(changed))
+        if len(changed):
+            print changed.to_string(index=False)
+
+if __name__ == '__main__':
+    main()
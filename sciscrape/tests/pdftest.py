@@ -6,15 +6,21 @@ tables. The main function most users will call is test().
 # Imports
 import os
 import glob
-import operator
+import numpy as np
 import pandas as pd
 
 # Project imports
 from sciscrape.scrapetools import scrape
 from sciscrape.parsetools import sciparse
+from sciscrape.parsetools import spatial
+from sciscrape.pdftools import pdfx
+from sciscrape.pdftools import cache
 from sciscrape.tests import populate
 from sciscrape import tests
 
+# Directory for cached extraction results
+CACHE_DIR = '%s/cache' % (tests.data_dir)
+
 def read_tables_csv(csv_name):
     '''Read Table objects from a CSV file.
 
@@ -42,30 +48,40 @@ def read_tables_csv(csv_name):
 
     return csv_tables
 
-def compare_table_groups(tref, tcmp):
-    '''Compare two Table instances, computing true positives, false
-    positives, and false negatives.
+def _group_coords(tables):
+    '''Get unique coordinates across a list of Table instances.'''
+    if not tables:
+        return np.empty((0, 3))
+    return spatial.unique_rows(np.vstack([t.array for t in tables]))
+
+def compare_table_groups(tref, tcmp, tol=0.0):
+    '''Compare two groups of Table instances, computing true positives,
+    false positives, and false negatives. Coordinates are deduplicated
+    and matched by value.
 
     Args:
-        tref (Table): Reference table
-        tcmp (Table): Comparison table
+        tref (list): Reference tables
+        tcmp (list): Comparison tables
+        tol (float): Maximum distance between matching coordinates
     Returns:
         Dictionary containing proportions of true positives, false
-            positives, and false negatives
+            positives, and false negatives; values are NaN if there
+            are no reference coordinates
     
     '''
     
-    tref_coords = reduce(operator.add, [t.coords for t in tref], [])
-    tcmp_coords = reduce(operator.add, [t.coords for t in tcmp], [])
+    tref_coords = _group_coords(tref)
+    tcmp_coords = _group_coords(tcmp)
 
-    tref_coords = list(set(tref_coords))
-    tcmp_coords = list(set(tcmp_coords))
-    
-    n_coords = float(len(tref_coords))
+    ref_matched, cmp_matched = spatial.match_points(
+        tref_coords, tcmp_coords, tol
+    )
 
-    tp = len([t for t in tref_coords if t in tcmp_coords]) / n_coords
-    fp = len([t for t in tcmp_coords if t not in tref_coords]) / n_coords
-    fn = len([t for t in tref_coords if t not in tcmp_coords]) / n_coords
+    n_coords = float(len(tref_coords)) or np.nan
+
+    tp = ref_matched.sum() / n_coords
+    fp = (~cmp_matched).sum() / n_coords
+    fn = (~ref_matched).sum() / n_coords
 
     return {
         'tp' : tp,
@@ -73,13 +89,18 @@ def compare_table_groups(tref, tcmp):
         'fn' : fn,
     }
 
-def test(journal, scrape_klass=scrape.Scrape):
+def test(journal, scrape_klass=scrape.Scrape, extractor=None,
+         cache_dir=CACHE_DIR, tol=0.0):
     '''Compare tables extracted from PDFs with hand-coded tables
     for all available article for a journal.
 
     Args:
         journal (str): Journal name
         scrape_klass (Scrape): Type of scraper to use
+        extractor (BaseExtractor): PDF extractor; defaults to PDFx
+        cache_dir (str): Directory for cached extraction results;
+            set to None to disable caching
+        tol (float): Maximum distance between matching coordinates
     Returns:
         pandas.DataFrame containing performance for each article
     
@@ -88,6 +109,12 @@ def test(journal, scrape_klass=scrape.Scrape):
     # Initialize results
     cmps = []
 
+    # Initialize extractor
+    extractor = extractor or pdfx.PDFExtractor()
+    if cache_dir:
+        extractor = cache.CachedExtractor(extractor, cache_dir)
+    parser = sciparse.PDFTableParse(extractor=extractor)
+
     # Make sure PDFs have been downloaded
     populate.populate(journal, scrape_klass)
 
@@ -107,12 +134,12 @@ def test(journal, scrape_klass=scrape.Scrape):
 
         # Extract tables from PDF
         with open(pdf_file, 'rb') as pdf:
-            pdf_tables = sciparse.PDFTableParse().parse(pdf)
+            pdf_tables = parser.parse(pdf)
         
         # Extract tables from CSV
         csv_tables = read_tables_csv(csv_file)
         
-        cmp = compare_table_groups(csv_tables, pdf_tables)
+        cmp = compare_table_groups(csv_tables, pdf_tables, tol)
         cmp['id'] = base_file
         cmp['jn'] = journal
         cmps.append(cmp)
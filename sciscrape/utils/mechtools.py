@@ -11,11 +11,18 @@ import re
 import getpass
 import urlparse
 import mechanize
+import collections
 from pyquery import PyQuery
 from urllib2 import URLError
 
 from sciscrape.utils import retry
 
+# Result of PubBrowser.probe(); head holds the first bytes of the body for
+# Range probes and is empty for HEAD probes
+ProbeResult = collections.namedtuple(
+    'ProbeResult', ['url', 'code', 'content_type', 'length', 'headers', 'head']
+)
+
 class PubBrowser(object):
         
     class NoHistory(object):
@@ -34,6 +41,9 @@ class PubBrowser(object):
         """
         self.timeout = timeout
 
+        # Optional Timings object; see sciscrape.utils.timing
+        self.timings = None
+
         # Initialize Browser
         self._b = mechanize.Browser(history=self.NoHistory())
         
@@ -72,12 +82,66 @@ class PubBrowser(object):
     def open(self, url, *args, **kwargs):
         if self.timeout and 'timeout' not in kwargs:
             kwargs['timeout'] = self.timeout
-        self._b.open(url, *args, **kwargs)
+        if self.timings is None:
+            self._b.open(url, *args, **kwargs)
+            return
+        with self.timings.span('open', url=url):
+            self._b.open(url, *args, **kwargs)
 
     @retry.retry(URLError, tries=3, default='')
     def reopen(self, url, *args, **kwargs):
         self.open(url, *args, **kwargs)
 
+    def probe(self, url, method='HEAD', nbytes=1024):
+        '''Check the status and headers of a URL without downloading the
+        body or changing the current page.
+
+        :param url: URL to check
+        :param method: 'HEAD', or 'GET' to request only the first
+            `nbytes` bytes with a Range header (for servers that don't
+            support HEAD)
+        :param nbytes: Number of bytes to read for Range probes
+        :return: ProbeResult
+
+        '''
+        request = mechanize.Request(url)
+        if method == 'HEAD':
+            request.get_method = lambda: 'HEAD'
+        else:
+            request.add_header('Range', 'bytes=0-%d' % (nbytes - 1))
+
+        kwargs = {}
+        if self.timeout:
+            kwargs['timeout'] = self.timeout
+
+        try:
+            if self.timings is None:
+                response = self._b.open_novisit(request, **kwargs)
+            else:
+                with self.timings.span('open', url=url, method=method):
+                    response = self._b.open_novisit(request, **kwargs)
+        except mechanize.HTTPError as error:
+            # Error responses still carry status and headers
+            response = error
+
+        try:
+            info = response.info()
+            length = info.getheader('Content-Length')
+            content_range = info.getheader('Content-Range')
+            # Full size of partial responses, e.g. "bytes 0-1023/52342"
+            if content_range and '/' in content_range:
+                length = content_range.rsplit('/', 1)[-1]
+            return ProbeResult(
+                url=response.geturl(),
+                code=getattr(response, 'code', 200),
+                content_type=info.getheader('Content-Type', ''),
+                length=int(length) if length and length.isdigit() else None,
+                headers=info,
+                head=response.read(nbytes) if method != 'HEAD' else '',
+            )
+        finally:
+            response.close()
+
     def geturl(self):
         try:
             return self._b.geturl()
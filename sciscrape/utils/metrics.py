@@ -0,0 +1,245 @@
+"""
+Aggregated scrape metrics for long-running batch jobs. A MetricsRegistry
+is a MetricsSink (see sciscrape.utils.timing): pass it to Scrape(sink=...)
+and it will count document outcomes, bytes downloaded, and stage latencies
+by publisher and document type. Metrics can be exported in the Prometheus
+text exposition format, either to a file (for the node exporter's textfile
+collector) or over HTTP.
+
+Example:
+    >>> registry = MetricsRegistry()
+    >>> scraper = scrape.Scrape(sink=registry)
+    >>> registry.serve(9200)
+"""
+
+# Imports
+import os
+import re
+import bisect
+import tempfile
+import threading
+import BaseHTTPServer
+
+# Project imports
+from sciscrape.utils import timing
+
+# Latency histogram buckets, in seconds
+DEFAULT_BUCKETS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+
+# Map ScrapeInfo.status values to outcome labels
+OUTCOME_PATTERNS = [
+    (r'^Success$', 'success'),
+    (r'^NoAccessError', 'no_access'),
+    (r'^NotFoundError', 'not_found'),
+    (r'^BadDocumentError', 'bad_document'),
+    (r'^Timeout$|^URLError|timeout', 'timeout'),
+]
+
+def classify_status(status):
+    """Convert a ScrapeInfo.status value to an outcome label.
+
+    >>> classify_status("NoAccessError('No access',)")
+    'no_access'
+
+    """
+    for pattern, outcome in OUTCOME_PATTERNS:
+        if re.search(pattern, status, re.I):
+            return outcome
+    return 'error'
+
+def _escape(value):
+    return str(value)\
+        .replace('\\', r'\\')\
+        .replace('\n', r'\n')\
+        .replace('"', r'\"')
+
+def _format_labels(labels):
+    return '{%s}' % ','.join(
+        '%s="%s"' % (key, _escape(value))
+        for key, value in labels
+    )
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Histogram(object):
+    """Cumulative histogram with fixed bucket bounds."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+
+        self.buckets = sorted(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """List of (upper bound, cumulative count) pairs."""
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets + [float('inf')], self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+class MetricsRegistry(timing.MetricsSink):
+    """Thread-safe registry of per-publisher scrape metrics."""
+
+    prefix = 'sciscrape'
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+
+        self.buckets = buckets
+        self._lock = threading.Lock()
+
+        # Articles scraped, keyed by publisher
+        self.articles = {}
+
+        # Document outcomes, keyed by (publisher, doc_type, outcome)
+        self.documents = {}
+
+        # Bytes downloaded, keyed by (publisher, doc_type)
+        self.bytes = {}
+
+        # Stage latencies, keyed by (publisher, doc_type, stage)
+        self.latencies = {}
+
+    def finish(self, info):
+        """Update metrics from a finished ScrapeInfo."""
+
+        publisher = getattr(info, 'publisher', None) or 'unknown'
+
+        with self._lock:
+
+            self.articles[publisher] = self.articles.get(publisher, 0) + 1
+
+            for doc_type, status in info.status.items():
+                key = (publisher, doc_type, classify_status(status))
+                self.documents[key] = self.documents.get(key, 0) + 1
+
+            for doc_type, doc in info.docs.items():
+                key = (publisher, doc_type)
+                self.bytes[key] = self.bytes.get(key, 0) + len(doc)
+
+            for span in info.timings.spans:
+                key = (publisher, span.tags.get('doc_type', ''), span.name)
+                if key not in self.latencies:
+                    self.latencies[key] = Histogram(self.buckets)
+                self.latencies[key].observe(span.duration)
+
+    def outcomes(self, publisher, doc_type):
+        """Outcome counts for a publisher and document type."""
+        return {
+            key[2]: count
+            for key, count in self.documents.items()
+            if key[:2] == (publisher, doc_type)
+        }
+
+    def success_rate(self, publisher, doc_type):
+        """Share of documents fetched successfully, or None if no
+        documents have been attempted.
+
+        """
+        outcomes = self.outcomes(publisher, doc_type)
+        total = sum(outcomes.values())
+        if not total:
+            return None
+        return outcomes.get('success', 0) / float(total)
+
+    def mean_latency(self, publisher, doc_type, stage):
+        """Mean latency of a stage in seconds, or None if the stage
+        has not been observed.
+
+        """
+        histogram = self.latencies.get((publisher, doc_type, stage))
+        if not histogram or not histogram.count:
+            return None
+        return histogram.sum / histogram.count
+
+    def to_prometheus(self):
+        """Render metrics in the Prometheus text exposition format."""
+
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append('# HELP %s_%s %s' % (self.prefix, name, help_text))
+            lines.append('# TYPE %s_%s %s' % (self.prefix, name, kind))
+
+        def sample(name, labels, value):
+            lines.append('%s_%s%s %s' % (
+                self.prefix, name, _format_labels(labels), _format_value(value)
+            ))
+
+        with self._lock:
+
+            header('articles_total', 'counter', 'Articles scraped.')
+            for publisher in sorted(self.articles):
+                sample('articles_total', [('publisher', publisher)],
+                       self.articles[publisher])
+
+            header('documents_total', 'counter', 'Documents by outcome.')
+            for key in sorted(self.documents):
+                labels = zip(('publisher', 'doc_type', 'outcome'), key)
+                sample('documents_total', labels, self.documents[key])
+
+            header('downloaded_bytes_total', 'counter', 'Bytes downloaded.')
+            for key in sorted(self.bytes):
+                labels = zip(('publisher', 'doc_type'), key)
+                sample('downloaded_bytes_total', labels, self.bytes[key])
+
+            header('stage_seconds', 'histogram', 'Scrape stage latency.')
+            for key in sorted(self.latencies):
+                labels = zip(('publisher', 'doc_type', 'stage'), key)
+                histogram = self.latencies[key]
+                for bound, count in histogram.cumulative():
+                    sample('stage_seconds_bucket',
+                           labels + [('le', _format_value(bound))], count)
+                sample('stage_seconds_sum', labels, histogram.sum)
+                sample('stage_seconds_count', labels, histogram.count)
+
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path):
+        """Atomically write metrics to a file, e.g. for the node
+        exporter's textfile collector.
+
+        """
+        out_dir = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=out_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            f.write(self.to_prometheus())
+        os.rename(tmp_path, path)
+
+    def serve(self, port, host=''):
+        """Serve metrics over HTTP from a background thread.
+
+        :return: HTTPServer instance; call shutdown() to stop
+
+        """
+        registry = self
+
+        class MetricsHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                body = registry.to_prometheus()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = BaseHTTPServer.HTTPServer((host, port), MetricsHandler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return server
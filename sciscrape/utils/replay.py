@@ -0,0 +1,231 @@
+'''
+Utilities for recording and replaying browser traffic. A RecordingBrowser
+saves every response it receives to a Cassette, keyed by URL. A
+CassetteServer serves recorded responses from a local HTTP server, and a
+ReplayBrowser routes all requests through that server, so that the full
+scrape pipeline can be run (and benchmarked) without the network.
+'''
+
+# Imports
+import re
+import json
+import base64
+import urllib
+import urlparse
+import threading
+import SocketServer
+import BaseHTTPServer
+import mechanize
+
+# Project imports
+from sciscrape.utils.mechtools import PubBrowser
+
+# Headers not copied from recorded responses
+SKIP_HEADERS = [
+    'connection',
+    'content-encoding',
+    'content-length',
+    'keep-alive',
+    'transfer-encoding',
+]
+
+# Header holding the final (post-redirect) URL of a replayed response
+URL_HEADER = 'X-Replay-Url'
+
+class Cassette(object):
+    '''Recorded responses, keyed by request URL.'''
+
+    def __init__(self, entries=None):
+        self.entries = entries or {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, url):
+        return url in self.entries
+
+    def add(self, url, final_url, code, headers, body):
+        '''Record a response under both the requested and final URLs.'''
+
+        entry = {
+            'url': final_url,
+            'code': code,
+            'headers': [
+                [key, value]
+                for key, value in headers
+                if key.lower() not in SKIP_HEADERS
+            ],
+            'body': base64.b64encode(body),
+        }
+        self.entries[url] = entry
+        self.entries.setdefault(final_url, entry)
+
+    def get(self, url):
+        '''Get recorded response for a URL.
+
+        :return: Tuple of (final URL, status code, headers, body), or None
+            if the URL was not recorded
+
+        '''
+        entry = self.entries.get(url)
+        if entry is None:
+            return None
+        return (
+            entry['url'],
+            entry['code'],
+            entry['headers'],
+            base64.b64decode(entry['body']),
+        )
+
+    def update(self, other):
+        self.entries.update(other.entries)
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.entries, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(json.load(f))
+
+class RecordingBrowser(PubBrowser):
+    '''Browser that records every response to a Cassette.'''
+
+    def __init__(self, agent='sciscrape', timeout=None, cassette=None):
+
+        super(RecordingBrowser, self).__init__(agent, timeout)
+        self.cassette = cassette if cassette is not None else Cassette()
+
+    def open(self, url, *args, **kwargs):
+
+        try:
+            super(RecordingBrowser, self).open(url, *args, **kwargs)
+        except mechanize.HTTPError as error:
+            self._record(url, error)
+            raise
+        self._record(url, self._b.response())
+
+    def _record(self, url, response):
+        self.cassette.add(
+            url,
+            response.geturl(),
+            getattr(response, 'code', 200),
+            response.info().items(),
+            response.read(),
+        )
+
+class ReplayBrowser(PubBrowser):
+    '''Browser that fetches every URL from a CassetteServer.'''
+
+    def __init__(self, agent='sciscrape', timeout=None, server_url=None):
+
+        super(ReplayBrowser, self).__init__(agent, timeout)
+        self.server_url = server_url
+        self._url = None
+
+    def _replay_url(self, url):
+        return '%s/replay?%s' % (
+            self.server_url.rstrip('/'),
+            urllib.urlencode({'url': url}),
+        )
+
+    def open(self, url, *args, **kwargs):
+
+        try:
+            super(ReplayBrowser, self).open(
+                self._replay_url(url), *args, **kwargs
+            )
+        finally:
+            response = self._b.response()
+            if response is not None:
+                self._url = response.info().getheader(URL_HEADER, url)
+
+    def probe(self, url, *args, **kwargs):
+
+        result = super(ReplayBrowser, self).probe(
+            self._replay_url(url), *args, **kwargs
+        )
+        return result._replace(
+            url=result.headers.getheader(URL_HEADER, url)
+        )
+
+    def geturl(self):
+        return self._url
+
+class CassetteHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    def _respond(self, send_body=True):
+
+        query = urlparse.parse_qs(urlparse.urlparse(self.path).query)
+        url = query.get('url', [None])[0]
+        recorded = self.server.cassette.get(url)
+
+        if recorded is None:
+            self.send_error(404, 'Not recorded: %s' % url)
+            return
+
+        final_url, code, headers, body = recorded
+
+        # Serve byte ranges of successful responses, e.g. "bytes=0-1023"
+        byte_range = self.headers.getheader('Range', '')
+        match = re.match(r'bytes=(\d+)-(\d*)$', byte_range)
+        if match and code == 200:
+            size = len(body)
+            start = int(match.group(1))
+            end = min(int(match.group(2) or size - 1), size - 1)
+            body = body[start:end + 1]
+            code = 206
+            headers = [
+                (key, value) for key, value in headers
+                if key.lower() != 'content-range'
+            ] + [('Content-Range', 'bytes %d-%d/%d' % (start, end, size))]
+
+        self.send_response(code)
+        for key, value in headers:
+            self.send_header(key, value)
+        self.send_header(URL_HEADER, final_url)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond()
+
+    def do_POST(self):
+        length = int(self.headers.getheader('Content-Length') or 0)
+        self.rfile.read(length)
+        self._respond()
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def log_message(self, *args):
+        pass
+
+class CassetteServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    '''Local HTTP stand-in for publisher sites.
+
+    Example:
+        >>> server = CassetteServer(Cassette.load('plos.json'))
+        >>> server.start()
+        >>> browser = ReplayBrowser(server_url=server.url)
+
+    '''
+    daemon_threads = True
+
+    def __init__(self, cassette, host='127.0.0.1', port=0):
+
+        BaseHTTPServer.HTTPServer.__init__(self, (host, port), CassetteHandler)
+        self.cassette = cassette
+
+    @property
+    def url(self):
+        return 'http://%s:%d' % self.server_address
+
+    def start(self):
+        '''Serve requests from a background thread.'''
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
@@ -3,7 +3,8 @@
 import time
 from functools import wraps
 
-def retry(ExceptionToCheck, tries=4, delay=3, backoff=2, default=None, logger=None):
+def retry(ExceptionToCheck, tries=4, delay=3, backoff=2, default=None, logger=None,
+          giveup=()):
     """Retry calling the decorated function using an exponential backoff.
 
     http://www.saltycrane.com/blog/2009/11/trying-out-retry-decorator-python/
@@ -21,6 +22,9 @@ def retry(ExceptionToCheck, tries=4, delay=3, backoff=2, default=None, logger=No
     :type backoff: int
     :param logger: logger to use. If None, print
     :type logger: logging.Logger instance
+    :param giveup: exceptions to raise without retrying, even if they
+        match ExceptionToCheck
+    :type giveup: Exception or tuple
     """
     def deco_retry(f):
 
@@ -30,6 +34,8 @@ def retry(ExceptionToCheck, tries=4, delay=3, backoff=2, default=None, logger=No
             while mtries > 1:
                 try:
                     return f(*args, **kwargs)
+                except giveup:
+                    raise
                 except ExceptionToCheck, e:
                     msg = "%s, Retrying in %d seconds..." % (str(e), mdelay)
                     if logger:
@@ -0,0 +1,113 @@
+"""
+Utilities for timing the stages of a scrape. A Timings object records
+named spans (DOI resolution, publisher detection, getter steps, browser
+requests, etc.) and forwards each finished span to an optional metrics
+sink. Spans opened inside another span inherit its tags, so e.g. a
+browser request made by a getter is tagged with the getter's document type.
+"""
+
+# Imports
+import time
+import logging
+import contextlib
+
+logger = logging.getLogger(__name__)
+
+class Span(object):
+    """A single timed stage."""
+
+    def __init__(self, name, tags=None):
+
+        self.name = name
+        self.tags = tags or {}
+        self.start = time.time()
+        self.end = None
+        self.error = None
+
+    @property
+    def duration(self):
+        if self.end is None:
+            return None
+        return self.end - self.start
+
+    def __repr__(self):
+        return 'Span(%r, %r, %r)' % (self.name, self.duration, self.tags)
+
+class MetricsSink(object):
+    """Base class for metrics sinks. Sinks are notified when each span
+    finishes and when a scrape finishes.
+
+    """
+    def record(self, span):
+        """Handle a finished span."""
+        pass
+
+    def finish(self, info):
+        """Handle a finished ScrapeInfo."""
+        pass
+
+class LoggingSink(MetricsSink):
+    """Write finished spans to a logger."""
+
+    def __init__(self, log=logger, level=logging.DEBUG):
+        self.log = log
+        self.level = level
+
+    def record(self, span):
+        self.log.log(
+            self.level, '%s took %.3fs %r', span.name, span.duration, span.tags
+        )
+
+class Timings(object):
+    """Collection of timing spans for a single article."""
+
+    def __init__(self, sink=None):
+
+        self.spans = []
+        self.sink = sink
+        self._stack = []
+
+    @contextlib.contextmanager
+    def span(self, name, **tags):
+        """Time the enclosed block.
+
+        Example:
+            >>> timings = Timings()
+            >>> with timings.span('pubdet'):
+            ...     publisher = pubdet.pubdet(html)
+
+        """
+        # Inherit tags from enclosing spans
+        span_tags = {}
+        for parent in self._stack:
+            span_tags.update(parent.tags)
+        span_tags.update(tags)
+
+        span = Span(name, span_tags)
+        self._stack.append(span)
+        try:
+            yield span
+        except Exception as error:
+            span.error = type(error).__name__
+            raise
+        finally:
+            span.end = time.time()
+            self._stack.pop()
+            self.spans.append(span)
+            if self.sink:
+                self.sink.record(span)
+
+    def total(self, name):
+        """Total time spent in spans with a given name."""
+        return sum(
+            span.duration
+            for span in self.spans
+            if span.name == name
+        )
+
+    def summary(self):
+        """Total time spent in each span name."""
+        totals = {}
+        for span in self.spans:
+            totals[span.name] = totals.get(span.name, 0) + span.duration
+        return totals
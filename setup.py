@@ -8,7 +8,7 @@ setup(
     name='sciscrape',
     version='0.1',
     packages=find_packages(),
-    package_data={'' : ['tests/data/csv/*/*.csv']},
+    package_data={'' : ['tests/data/csv/*/*.csv', 'benchmarks/baseline.json']},
     include_package_data=True,
     install_requires=[
         str(requirement.req)
@@ -0,0 +1,67 @@
+"""
+Synthetic PDFs shared by PDF extraction and parsing tests.
+"""
+
+def build_pages_pdf(pages, font_size=9):
+    """Build a multi-page PDF with text at the given positions.
+
+    :param pages: List of lists of (x, y, text) tuples
+
+    """
+    npages = len(pages)
+    kids = ' '.join('%d 0 R' % (4 + 2 * idx) for idx in range(npages))
+    objects = [
+        '<< /Type /Catalog /Pages 2 0 R >>',
+        '<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, npages),
+        '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    for idx, lines in enumerate(pages):
+        content = ''.join(
+            'BT /F1 %d Tf %d %d Td (%s) Tj ET\n' % (font_size, x, y, text)
+            for x, y, text in lines
+        )
+        objects.append(
+            '<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            '/Contents %d 0 R /Resources << /Font << /F1 3 0 R >> >> >>'
+            % (5 + 2 * idx)
+        )
+        objects.append(
+            '<< /Length %d >>\nstream\n%sendstream' % (len(content), content)
+        )
+    pdf = '%PDF-1.4\n'
+    offsets = []
+    for idx, obj in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += '%d 0 obj\n%s\nendobj\n' % (idx, obj)
+    xref = len(pdf)
+    pdf += 'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    pdf += ''.join('%010d 00000 n \n' % offset for offset in offsets)
+    pdf += 'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+        len(objects) + 1, xref
+    )
+    return pdf
+
+def build_pdf(lines, font_size=9):
+    """Build a single-page PDF with text at the given positions.
+
+    :param lines: List of (x, y, text) tuples
+
+    """
+    return build_pages_pdf([lines], font_size)
+
+def row(y, *cells):
+    return [
+        (x, y, cell)
+        for x, cell in zip([72, 200, 260, 300, 340], cells)
+    ]
+
+TABLE_PDF = build_pdf(
+    [(72, 740, 'Participants completed the task in the scanner.')] +
+    [(72, 700, 'Table 1. Regions showing greater activation')] +
+    row(680, 'Region', 'BA', 'x', 'y', 'z') +
+    row(665, 'Frontal', '9', '-42', '12', '30') +
+    [(72, 650, 'Left hemisphere')] +
+    row(635, 'Parietal', '7', '-30', '-60', '48') +
+    [(72, 600, 'Discussion of the results follows here.')] +
+    [(72, 585, 'More discussion of the results.')]
+)
@@ -0,0 +1,32 @@
+"""
+Saved article documents and a Cassette replaying them, shared by tests
+that run scrapers offline.
+"""
+
+import os
+
+from sciscrape.utils import replay
+
+FIXTURE_PATH = 'tests/fixtures'
+
+START_URL = 'http://www.plosone.org/article/info%3Adoi%2F10.1371%2Fjournal.pone.0062405'
+PDF_URL = 'http://dx.plos.org/10.1371/journal.pone.0062405.pdf'
+PMC_URL = 'http://www.ncbi.nlm.nih.gov/pmc/articles/pmid/23638070'
+
+def read_fixture(document_type):
+    path = os.path.join(
+        FIXTURE_PATH, '23638070', '23638070.{}'.format(document_type)
+    )
+    with open(path, 'rb') as f:
+        return f.read()
+
+def build_cassette():
+
+    cassette = replay.Cassette()
+    html_headers = [('Content-Type', 'text/html; charset=utf-8')]
+    cassette.add(START_URL, START_URL, 200, html_headers, read_fixture('html'))
+    cassette.add(PDF_URL, PDF_URL, 200, [('Content-Type', 'application/pdf')],
+                 read_fixture('pdf'))
+    cassette.add(PMC_URL, 'http://www.ncbi.nlm.nih.gov/pmc/articles/PMC3634848/',
+                 200, html_headers, read_fixture('pmc'))
+    return cassette
@@ -0,0 +1,45 @@
+"""
+PDFx-style and HTML tables shared by table parsing tests.
+"""
+
+from sciscrape.pdftools import pdfx
+
+XML = '''<pdfx><article>
+<h1 class="table">Table 2 x y z</h1>
+<table number="2">
+<tr><td>Frontal</td><td>9</td><td>-40</td><td>20</td><td>30</td></tr>
+</table>
+<p>Text between tables</p>
+<table number="1">
+<thead><tr><th>Region</th><th>x</th><th>y</th><th>z</th></tr></thead>
+<tr><td>Occipital <!-- note -->cortex</td><td>-10</td><td>-90</td><td><i>2</i></td></tr>
+</table>
+<h1 class="table">Table 1. (continued)</h1>
+<table number="1">
+<tr><td>Parietal</td><td>\xc2\xad30</td><td>-60</td><td>50</td></tr>
+</table>
+</article></pdfx>'''
+
+class StaticExtractor(pdfx.BaseExtractor):
+
+    def extract_xml(self, pdf):
+        return XML
+
+HTML = '''<html><body>
+<table><tr><td>
+<table id="t1">
+<caption>Table 1. Activations</caption>
+<thead>
+<tr><th rowspan="2">Region</th><th rowspan="2">BA</th><th colspan="3">MNI coordinates</th></tr>
+<tr><th>x</th><th>y</th><th>z</th></tr>
+</thead>
+<tbody>
+<tr><td rowspan="2">Frontal</td><td>9</td><td>&#8722;40</td><td>20<sup>a</sup></td><td>30</td></tr>
+<tr><td>46</td><td>44</td><td>36</td><td>&#8722;8</td></tr>
+<tr><td colspan="5">Deactivations</td></tr>
+<tr><th>Parietal</th><td>7</td><td>12</td><td>&#8722;60&#160;</td><td>50</td></tr>
+</tbody>
+</table>
+</td></tr></table>
+<table><tr><th>Age</th><th>Score</th></tr><tr><td>20</td><td>3</td></tr></table>
+</body></html>'''
@@ -0,0 +1,123 @@
+import unittest
+from nose.tools import *
+from nose_parameterized import parameterized
+from pyquery import PyQuery
+
+from sciscrape.scrapetools import getters
+
+def naive_check_access(getter, text, qtext):
+    for rule in getter._access_whitelist:
+        if rule(text, qtext):
+            return True
+    for rule in getter._access_blacklist:
+        if rule(text, qtext):
+            return False
+    return True
+
+documents = [
+    ('open', '<html><body><div class="svArticle section">Text</div></body></html>'),
+    ('paywall', '<html><body><div class="svArticle section">'
+                'Purchase short-term access</div></body></html>'),
+    ('whitelist', '<html><body>identitieswelcome; why don\'t I have access?'
+                  '</body></html>'),
+    ('elsevier_abstract', '<html><body><div class="abstract">Text</div>'
+                          '</body></html>'),
+]
+
+class TestAccessMatcher(unittest.TestCase):
+
+    @parameterized.expand([
+        (name, getter_class, text)
+        for name, text in documents
+        for getter_class in [
+            getters.DocGetter,
+            getters.ElsevierHTMLGetter,
+            getters.WileyHTMLGetter,
+            getters.IEEEHTMLGetter,
+        ]
+    ])
+    def test_matches_naive(self, _, getter_class, text):
+
+        getter = getter_class()
+        qtext = PyQuery(text)
+        assert_equal(
+            getter.check_access(text, qtext),
+            naive_check_access(getter, text, qtext)
+        )
+
+    def test_reports_rule(self):
+
+        text = documents[1][1]
+        has_access, rule = getters.DocGetter().match_access(text, PyQuery(text))
+
+        assert_false(has_access)
+        assert_equal(rule.regex, r'purchase short-term access')
+
+    def test_reports_dom_rule(self):
+
+        text = documents[3][1]
+        has_access, rule = getters.ElsevierHTMLGetter().match_access(
+            text, PyQuery(text)
+        )
+
+        assert_false(has_access)
+        assert_is_instance(rule, getters.ElsevierAccessRule)
+
+    def test_skips_dom_rules_for_pdf(self):
+
+        text = '%PDF-1.4 binary content'
+        has_access, rule = getters.ElsevierHTMLGetter().match_access(
+            text, PyQuery('<html></html>')
+        )
+
+        assert_true(has_access)
+        assert_is_none(rule)
+
+    def test_compiled_once(self):
+
+        first = getters.ElsevierHTMLGetter._access_matchers()
+        second = getters.ElsevierHTMLGetter._access_matchers()
+
+        assert_is(first[1], second[1])
+        assert_is_not(first[1], getters.DocGetter._access_matchers()[1])
+
+    def test_rules_with_groups(self):
+
+        rules = [
+            getters.RegexAccessRule(r'(foo|bar)(baz)'),
+            getters.RegexAccessRule(r'qux'),
+        ]
+        matcher = getters.AccessMatcher(rules)
+
+        assert_is(matcher.match('xx barbaz', None), rules[0])
+        assert_is(matcher.match('xx QUX', None), rules[1])
+        assert_is_none(matcher.match('foo', None))
+
+    def test_literal_rules(self):
+
+        rules = [
+            getters.RegexAccessRule(r'why don\'t i have access'),
+            getters.RegexAccessRule(r'purchase on springer.com'),
+            getters.RegexAccessRule(r'Case', flags=0),
+        ]
+        matcher = getters.AccessMatcher(rules)
+
+        assert_equal(
+            [literal for literal, _ in matcher.literals],
+            ["why don't i have access", 'Case']
+        )
+        assert_is(matcher.match("Why Don't I have access?", None), rules[0])
+        assert_is(matcher.match('Purchase on Springer-com', None), rules[1])
+        assert_is_none(matcher.match('case', None))
+        assert_is(matcher.match('Case', None), rules[2])
+
+    def test_back_reference(self):
+
+        rules = [
+            getters.RegexAccessRule(r'(a)\1'),
+            getters.RegexAccessRule(r'b'),
+        ]
+        matcher = getters.AccessMatcher(rules)
+
+        assert_is(matcher.match('aa', None), rules[0])
+        assert_is(matcher.match('b', None), rules[1])
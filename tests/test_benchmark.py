@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import unittest
+from nose.tools import *
+
+from sciscrape.pdftools import local
+from sciscrape.tests import benchmark
+
+from tests.pdf_fixtures import TABLE_PDF
+
+class TestBenchmark(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmp_dir, 'cache')
+
+        # Hand-coded tables; "b" has an extra coordinate and "c" has no PDF
+        articles = [
+            ('jn1', 'a', '-42,12,30\r-30,-60,48'),
+            ('jn1', 'b', '-42,12,30\r-30,-60,48\r0,0,0'),
+            ('jn2', 'c', '-42,12,30'),
+        ]
+        for journal, article_id, csv_data in articles:
+            for kind in ['csv', 'doc']:
+                path = os.path.join(self.tmp_dir, kind, journal)
+                if not os.path.isdir(path):
+                    os.makedirs(path)
+            csv_file = os.path.join(self.tmp_dir, 'csv', journal, article_id + '.csv')
+            with open(csv_file, 'w') as f:
+                f.write(csv_data)
+            if article_id != 'c':
+                pdf_file = os.path.join(self.tmp_dir, 'doc', journal, article_id + '.pdf')
+                with open(pdf_file, 'wb') as f:
+                    f.write(TABLE_PDF)
+
+    def tearDown(self):
+
+        shutil.rmtree(self.tmp_dir)
+
+    def run_benchmark(self):
+
+        return benchmark.run(
+            ['jn1', 'jn2'], extractor=local.LocalExtractor(),
+            cache_dir=self.cache_dir, processes=2, data_dir=self.tmp_dir,
+        )
+
+    def test_run(self):
+
+        results = self.run_benchmark().set_index('id')
+
+        assert_equal(sorted(results.index), ['a', 'b', 'c'])
+        assert_equal(results.loc['a', 'tp'], 1.0)
+        assert_almost_equal(results.loc['b', 'tp'], 2 / 3.0)
+        assert_almost_equal(results.loc['b', 'fn'], 1 / 3.0)
+        assert_true(results.loc['a', 't_extract'] > 0)
+        assert_true(results.loc['c', 'error'].startswith('IOError'))
+
+        # Extraction results are cached
+        assert_true(os.listdir(self.cache_dir))
+
+        summary = benchmark.summarize(results.reset_index()).set_index('jn')
+        assert_equal(summary.loc['all', 'articles'], 3)
+        assert_equal(summary.loc['all', 'errors'], 1)
+        assert_almost_equal(summary.loc['jn1', 'tp'], 5 / 6.0)
+
+    def test_save_diff(self):
+
+        old = self.run_benchmark()
+        path = os.path.join(self.tmp_dir, 'old.csv')
+        benchmark.save(old, path)
+
+        assert_equal(len(benchmark.diff(path, old)), 0)
+
+        new = old.copy()
+        new.loc[new['id'] == 'a', 'tp'] = 0.5
+        changed = benchmark.diff(path, new)
+        assert_equal(list(changed['id']), ['a'])
+        assert_almost_equal(changed['d_tp'][0], -0.5)
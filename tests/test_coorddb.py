@@ -0,0 +1,96 @@
+import unittest
+import numpy as np
+import pandas as pd
+from nose.tools import *
+
+from sciscrape.parsetools import coorddb
+from sciscrape.parsetools import sciparse
+
+def make_table(coords):
+    table = sciparse.Table(None)
+    table.coords = coords
+    return table
+
+class TestCoordDB(unittest.TestCase):
+
+    rtree = True
+
+    def setUp(self):
+
+        self.db = coorddb.CoordDB(rtree=self.rtree)
+
+        rand = np.random.RandomState(0)
+        self.points = np.round(rand.uniform(-70, 70, size=(300, 3)), 1)
+        rows = [
+            ('art%d' % (idx % 10), idx % 3, 'mni' if idx % 2 else 'tal',
+             x, y, z)
+            for idx, (x, y, z) in enumerate(self.points.tolist())
+        ]
+        self.db.add_coords(rows)
+        self.frame = pd.DataFrame(rows, columns=coorddb.COLUMNS)
+
+    def tearDown(self):
+
+        self.db.close()
+
+    def test_radius_matches_brute_force(self):
+
+        center = (-10.0, 20.0, 5.0)
+        for radius in [5.0, 20.0, 45.3]:
+            distances = np.sqrt(((self.points - center) ** 2).sum(axis=1))
+            expected = sorted(distances[distances <= radius].tolist())
+            result = self.db.radius(center, radius)
+            assert_equal(list(result.columns), coorddb.COLUMNS + ['distance'])
+            assert_equal(len(result), len(expected))
+            assert_true(np.allclose(result['distance'], expected))
+
+    def test_box(self):
+
+        lower, upper = (-30, -30, 0), (30, 10.5, 40)
+        inside = ((self.points >= lower) & (self.points <= upper)).all(axis=1)
+        result = self.db.box(lower, upper)
+        assert_equal(
+            sorted(map(tuple, result[['x', 'y', 'z']].values.tolist())),
+            sorted(map(tuple, self.points[inside].tolist()))
+        )
+
+        result = self.db.box(lower, upper, space='mni')
+        expected = self.frame[inside & (self.frame['space'] == 'mni').values]
+        assert_equal(len(result), len(expected))
+
+    def test_add_tables_replaces_article(self):
+
+        assert_equal(len(self.db), 300)
+        tables = [make_table([(1, 2, 3)]), make_table([(4, 5, 6), (7, 8, 9)])]
+        assert_equal(self.db.add_tables('art0', tables, space='mni'), 3)
+        assert_equal(len(self.db), 273)
+
+        result = self.db.radius((4, 5, 6), 0.5)
+        assert_equal(
+            result[coorddb.COLUMNS].values.tolist(),
+            [['art0', 1, 'mni', 4.0, 5.0, 6.0]]
+        )
+
+    def test_add_tables_number_space(self):
+
+        tables = [make_table([(1, 2, 3)]), make_table([(4, 5, 6)])]
+        tables[0].number = 2
+        tables[0].space = 'tal'
+        self.db.add_tables('art10', tables)
+
+        # Document number if known, else position; detected space
+        result = self.db.box((0, 0, 0), (7, 7, 7))
+        result = result[result['article'] == 'art10']
+        assert_equal(
+            sorted(result[coorddb.COLUMNS].values.tolist()),
+            [['art10', 1, None, 4.0, 5.0, 6.0],
+             ['art10', 2, 'tal', 1.0, 2.0, 3.0]]
+        )
+
+    def test_articles(self):
+
+        assert_equal(self.db.articles(), ['art%d' % idx for idx in range(10)])
+
+class TestCoordDBFallback(TestCoordDB):
+
+    rtree = False
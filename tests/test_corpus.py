@@ -0,0 +1,99 @@
+import os
+import shutil
+import tempfile
+import unittest
+from nose.tools import *
+
+from sciscrape.pdftools import local
+from sciscrape.pdftools import prescreen
+from sciscrape.parsetools import corpus
+from sciscrape.parsetools import coorddb
+
+from tests.pdf_fixtures import TABLE_PDF, build_pdf, row
+
+MNI_PDF = build_pdf(
+    [(72, 700, 'Table 2. Regions showing greater activation (MNI)')] +
+    row(680, 'Region', 'BA', 'x', 'y', 'z') +
+    row(665, 'Frontal', '9', '-42', '12', '30')
+)
+
+class TestParseCorpus(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tmp_dir = tempfile.mkdtemp()
+        self.paths = []
+        for name, data in [('a', TABLE_PDF), ('b', 'not a pdf'), ('c', TABLE_PDF)]:
+            path = os.path.join(self.tmp_dir, '%s.pdf' % (name))
+            with open(path, 'wb') as f:
+                f.write(data)
+            self.paths.append(path)
+
+    def tearDown(self):
+
+        shutil.rmtree(self.tmp_dir)
+
+    def test_parse_corpus(self):
+
+        coords, errors = corpus.parse_corpus(
+            self.paths, local.LocalExtractor(), processes=2, chunksize=1
+        )
+
+        assert_equal(list(coords.columns), corpus.COORD_COLUMNS)
+        coords = coords.sort_values(['file', 'x'])
+        assert_equal(
+            [tuple(row) for row in coords.values],
+            [
+                (self.paths[0], 1, None, -42.0, 12.0, 30.0),
+                (self.paths[0], 1, None, -30.0, -60.0, 48.0),
+                (self.paths[2], 1, None, -42.0, 12.0, 30.0),
+                (self.paths[2], 1, None, -30.0, -60.0, 48.0),
+            ]
+        )
+
+        assert_equal(list(errors['file']), [self.paths[1]])
+
+    def test_worker_stats(self):
+
+        extractor = prescreen.PrescreenExtractor(local.LocalExtractor())
+        corpus.parse_corpus(self.paths, extractor, processes=2, chunksize=1)
+
+        # Counters from all workers are summed into the parent's extractor
+        assert_equal(extractor.stats['pdfs'], 3)
+        assert_equal(extractor.stats['pdfs_unscreened'], 1)
+        assert_equal(extractor.stats['pages_candidate'], 2)
+
+    def test_main(self):
+
+        out_file = os.path.join(self.tmp_dir, 'coords.csv')
+        corpus.main([self.tmp_dir, out_file, '--local', '--processes', '2'])
+
+        with open(out_file) as f:
+            assert_equal(len(f.read().strip().split('\n')), 5)
+        assert_true(os.path.exists(
+            os.path.join(self.tmp_dir, 'coords_errors.csv')
+        ))
+
+    def test_main_db(self):
+
+        path = os.path.join(self.tmp_dir, 'd.pdf')
+        with open(path, 'wb') as f:
+            f.write(MNI_PDF)
+        out_file = os.path.join(self.tmp_dir, 'coords.csv')
+        db_file = os.path.join(self.tmp_dir, 'coords.db')
+        corpus.main([
+            self.tmp_dir, out_file, '--local', '--processes', '2',
+            '--db', db_file,
+        ])
+
+        # Table numbers and detected spaces are stored
+        with coorddb.CoordDB(db_file) as db:
+            result = db.box((-50, 0, 0), (0, 20, 40))
+        assert_equal(
+            sorted(result[coorddb.COLUMNS].values.tolist()),
+            [
+                [self.paths[0], 1, None, -42.0, 12.0, 30.0],
+                [self.paths[2], 1, None, -42.0, 12.0, 30.0],
+                [path, 2, 'mni', -42.0, 12.0, 30.0],
+            ]
+        )
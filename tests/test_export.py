@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+import unittest
+from nose.tools import *
+
+from sciscrape.parsetools import export
+from sciscrape.parsetools import sciparse
+
+class TestParquetWriter(unittest.TestCase):
+
+    def setUp(self):
+
+        self.out_dir = tempfile.mkdtemp()
+        self.table = sciparse.Table({
+            'headers': ['region', 'x', 'y', 'z'],
+            'data': [['Frontal', -40.0, 20.0, 30.0], ['Parietal', 1.5, 2.0, 3.0]],
+        })
+        self.table.space = 'mni'
+
+    def tearDown(self):
+
+        shutil.rmtree(self.out_dir)
+
+    def test_chunked_roundtrip(self):
+
+        with export.ParquetWriter(self.out_dir, chunk_size=16) as writer:
+            for idx in range(4):
+                writer.add_tables('art%d' % (idx), [self.table])
+
+        parts = os.listdir(os.path.join(self.out_dir, 'coords'))
+        assert_equal(len(parts), 2)
+
+        coords = export.read_coords(self.out_dir)
+        assert_equal(list(coords.columns), export.COORD_COLUMNS)
+        assert_equal(len(coords), 8)
+        assert_equal(
+            coords.iloc[1].tolist(), ['art0', 0, 'mni', 1.5, 2.0, 3.0]
+        )
+
+        cells = export.read_cells(self.out_dir, columns=['header', 'value'])
+        assert_equal(list(cells.columns), ['header', 'value'])
+        assert_equal(cells.iloc[1].tolist(), ['x', '-40.0'])
+
+    def test_table_number(self):
+
+        numbered = sciparse.Table({
+            'headers': ['x', 'y', 'z'],
+            'data': [[4.0, 5.0, 6.0]],
+            'number': 3,
+        })
+        with export.ParquetWriter(self.out_dir) as writer:
+            writer.add_tables('art', [self.table, numbered])
+
+        # Document number if known, else position
+        coords = export.read_coords(self.out_dir, columns=['table', 'x'])
+        assert_equal(coords['table'].tolist(), [0, 0, 3])
+        cells = export.read_cells(self.out_dir, columns=['table'])
+        assert_equal(sorted(set(cells['table'])), [0, 3])
+
+    def test_unknown_space(self):
+
+        self.table.space = None
+        with export.ParquetWriter(self.out_dir, cells=False) as writer:
+            writer.add_tables('art', [self.table])
+
+        coords = export.read_coords(self.out_dir, columns=['space', 'x'])
+        assert_equal(list(coords.columns), ['space', 'x'])
+        assert_true(coords['space'].isnull().all())
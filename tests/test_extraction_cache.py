@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+from nose.tools import *
+
+from sciscrape.pdftools import pdfx
+from sciscrape.pdftools import cache
+
+XML = u'<pdfx><article><table number="1"><tr><td>x −</td></tr></table></article></pdfx>'
+
+class CountingExtractor(pdfx.BaseExtractor):
+
+    version = 'counting-1'
+
+    def __init__(self, xml=XML):
+        self.xml = xml
+        self.calls = 0
+
+    def extract_xml(self, pdf):
+        self.calls += 1
+        return self.xml
+
+class TestCachedExtractor(unittest.TestCase):
+
+    def setUp(self):
+
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+
+        shutil.rmtree(self.cache_dir)
+
+    def test_cache_hit(self):
+
+        inner = CountingExtractor()
+        extractor = cache.CachedExtractor(inner, self.cache_dir)
+
+        first = extractor.extract_xml('%PDF-1.4 one')
+        second = extractor.extract_xml('%PDF-1.4 one')
+
+        assert_equal(inner.calls, 1)
+        assert_equal(first, XML)
+        assert_equal(second, XML)
+
+    def test_cache_shared_across_instances(self):
+
+        cache.CachedExtractor(CountingExtractor(), self.cache_dir)\
+            .extract_xml('%PDF-1.4 one')
+
+        inner = CountingExtractor()
+        qxml = cache.CachedExtractor(inner, self.cache_dir)\
+            .extract('%PDF-1.4 one')
+
+        assert_equal(inner.calls, 0)
+        assert_equal(len(qxml('table')), 1)
+
+    def test_key_includes_data_and_version(self):
+
+        inner = CountingExtractor()
+        extractor = cache.CachedExtractor(inner, self.cache_dir)
+        extractor.extract_xml('%PDF-1.4 one')
+        extractor.extract_xml('%PDF-1.4 two')
+
+        other = CountingExtractor()
+        other.version = 'counting-2'
+        cache.CachedExtractor(other, self.cache_dir).extract_xml('%PDF-1.4 one')
+
+        assert_equal(inner.calls, 2)
+        assert_equal(other.calls, 1)
+
+    def test_errors_not_cached(self):
+
+        inner = CountingExtractor('<error>Service unavailable</error>')
+        extractor = cache.CachedExtractor(inner, self.cache_dir)
+        extractor.extract_xml('%PDF-1.4 one')
+        extractor.extract_xml('%PDF-1.4 one')
+
+        assert_equal(inner.calls, 2)
+
+    def test_compressed(self):
+
+        inner = CountingExtractor(u'<pdfx>%s</pdfx>' % (u'<p>text</p>' * 1000))
+        extractor = cache.CachedExtractor(inner, self.cache_dir)
+        extractor.extract_xml('%PDF-1.4 one')
+
+        key = extractor.cache.key('%PDF-1.4 one', 'counting-1')
+        assert_less(os.path.getsize(extractor.cache.path(key)), 1000)
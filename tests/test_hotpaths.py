@@ -0,0 +1,34 @@
+import unittest
+from nose.tools import *
+
+from sciscrape.benchmarks import hotpaths
+
+class TestHotpaths(unittest.TestCase):
+
+    def test_run_case(self):
+
+        results = hotpaths.run(['pubdet.fixtures'], repeat=1)
+        assert_equal(results.keys(), ['pubdet.fixtures'])
+
+        result = results['pubdet.fixtures']
+        assert_not_in('error', result)
+        assert_true(result['calls'] > 0)
+        assert_true(result['seconds_per_call'] > 0)
+        assert_true(result['peak_kb'] > 0)
+        assert_in('retained_objects_per_call', result)
+
+        report = hotpaths.format_report(results, {})
+        assert_in('pubdet.fixtures', report)
+
+    def test_compare(self):
+
+        baseline = {'case': {'seconds_per_call': 1.0}}
+        results = {
+            'case': {'seconds_per_call': 1.5},
+            'new': {'seconds_per_call': 9.0},
+        }
+        assert_equal(
+            hotpaths.compare(results, baseline, tolerance=0.25),
+            [('case', 1.0, 1.5, 1.5)]
+        )
+        assert_equal(hotpaths.compare(results, baseline, tolerance=0.6), [])
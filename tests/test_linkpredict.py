@@ -0,0 +1,132 @@
+import unittest
+from nose.tools import *
+
+from sciscrape.utils import replay
+from sciscrape.scrapetools import scrape
+from sciscrape.scrapetools import getters
+from sciscrape.scrapetools import linkpredict
+
+from .fixtures import fixtures
+from .replay_fixtures import build_cassette, read_fixture, START_URL, PDF_URL
+
+class TestLinkPredictor(unittest.TestCase):
+
+    def setUp(self):
+
+        self.predictor = linkpredict.LinkPredictor()
+
+    def test_fixtures(self):
+
+        # Every predicted link should match the expected fixture link
+        predicted = 0
+        for fixture in fixtures:
+            for doc_type, expected in fixture.expected_urls.items():
+                link = self.predictor.predict(
+                    fixture.publisher, doc_type, fixture.start_url
+                )
+                if link is not None:
+                    assert_equal(link, expected)
+                    predicted += 1
+        assert_true(predicted >= 15)
+
+    def test_drop_query(self):
+
+        link = self.predictor.predict(
+            'mit', 'html',
+            'http://www.mitpressjournals.org/doi/abs/10.1162/jocn.2009.21407?url_ver=Z39.88-2003'
+        )
+        assert_equal(
+            link, 'http://www.mitpressjournals.org/doi/full/10.1162/jocn.2009.21407'
+        )
+
+    def test_no_rule(self):
+
+        assert_equal(self.predictor.predict('plos', 'pdf', START_URL), None)
+        assert_equal(
+            self.predictor.predict('wiley', 'html', 'http://example.com/'),
+            None
+        )
+
+    def test_hit_rate(self):
+
+        assert_equal(self.predictor.hit_rate('mit'), None)
+        self.predictor.record('mit', True)
+        self.predictor.record('mit', True)
+        self.predictor.record('mit', False)
+        assert_almost_equal(self.predictor.hit_rate('mit'), 2. / 3)
+
+class TestScrapePrediction(unittest.TestCase):
+
+    def setUp(self):
+
+        self.server = replay.CassetteServer(build_cassette())
+        self.server.start()
+
+    def tearDown(self):
+
+        self.server.shutdown()
+        self.server.server_close()
+
+    def scrape(self, template):
+
+        rules = {'plos': {'pdf': [linkpredict.LinkRule(r'^.*$', template)]}}
+        predictor = linkpredict.LinkPredictor(rules=rules)
+        scraper = scrape.ReplayScrape(
+            server_url=self.server.url, predictor=predictor
+        )
+        info = scraper.scrape_link(
+            START_URL, pmid='23638070', fetch_types=['pdf']
+        )
+        return info, predictor
+
+    def test_hit(self):
+
+        info, predictor = self.scrape(PDF_URL)
+        assert_equal(info.status['pdf'], 'Success')
+        assert_equal(info.docs['pdf'], read_fixture('pdf'))
+        assert_equal(predictor.stats['plos']['hits'], 1)
+
+        # Landing page links are not parsed
+        names = [span.name for span in info.timings.spans]
+        assert_in('get_predicted', names)
+        assert_not_in('get_link', names)
+
+    def test_miss_falls_back(self):
+
+        info, predictor = self.scrape('http://example.com/missing.pdf')
+        assert_equal(info.status['pdf'], 'Success')
+        assert_equal(info.docs['pdf'], read_fixture('pdf'))
+        assert_equal(predictor.stats['plos']['misses'], 1)
+        assert_equal(predictor.hit_rate('plos'), 0)
+
+        # Predicted link is tried once before falling back
+        names = [span.name for span in info.timings.spans]
+        assert_equal(names.count('get_predicted'), 1)
+        assert_in('get_link', names)
+
+    def test_off_by_default(self):
+
+        scraper = scrape.ReplayScrape(server_url=self.server.url)
+        assert_equal(scraper.predictor, None)
+
+    def test_getter_bug_propagates(self):
+
+        class BrokenGetter(getters.PDFGetter):
+            def post_process(self, cache, browser):
+                raise ValueError('bug in getter')
+
+        predictor = linkpredict.LinkPredictor(
+            rules={'plos': {'pdf': [linkpredict.LinkRule(r'^.*$', PDF_URL)]}}
+        )
+        scraper = scrape.ReplayScrape(
+            server_url=self.server.url, predictor=predictor
+        )
+        scraper.info = scrape.ScrapeInfo()
+        scraper.info.publisher = 'plos'
+        with assert_raises(ValueError):
+            scraper._get_predicted(BrokenGetter(), 'pdf', START_URL)
+        assert_equal(predictor.stats['plos']['misses'], 0)
+
+        # Not retried
+        names = [span.name for span in scraper.info.timings.spans]
+        assert_equal(names.count('download'), 1)
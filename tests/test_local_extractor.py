@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import unittest
+from nose.tools import *
+
+from sciscrape.pdftools import local
+from sciscrape.parsetools import sciparse
+
+from tests.pdf_fixtures import build_pdf, TABLE_PDF
+
+class TestLocalExtractor(unittest.TestCase):
+
+    def test_extract_table(self):
+
+        qxml = local.LocalExtractor().extract(TABLE_PDF)
+
+        assert_equal(len(qxml('table')), 1)
+        assert_equal(qxml('table').attr('number'), '1')
+        assert_equal(
+            qxml('h1.table').text(),
+            'Table 1. Regions showing greater activation'
+        )
+        rows = [
+            [cell.text or '' for cell in tr.findall('td')]
+            for tr in qxml('tr')
+        ]
+        assert_equal(rows, [
+            ['Region', 'BA', 'x', 'y', 'z'],
+            ['Frontal', '9', '-42', '12', '30'],
+            ['Left hemisphere', '', '', '', ''],
+            ['Parietal', '7', '-30', '-60', '48'],
+        ])
+
+    def test_parse_coordinates(self):
+
+        parser = sciparse.PDFTableParse(extractor=local.LocalExtractor())
+        tables = parser.parse(TABLE_PDF)
+
+        assert_equal(len(tables), 1)
+        assert_equal(tables[0].coords, [
+            sciparse.Coord(-42.0, 12.0, 30.0),
+            sciparse.Coord(-30.0, -60.0, 48.0),
+        ])
+
+    def test_no_tables(self):
+
+        pdf = build_pdf([(72, 700, 'No tables here.')])
+        qxml = local.LocalExtractor().extract(pdf)
+
+        assert_equal(len(qxml('table')), 0)
+
+class TestExtractMany(unittest.TestCase):
+
+    def setUp(self):
+
+        self.tmp_dir = tempfile.mkdtemp()
+        self.paths = []
+        for idx in range(3):
+            path = os.path.join(self.tmp_dir, '%d.pdf' % (idx))
+            with open(path, 'wb') as f:
+                f.write(TABLE_PDF)
+            self.paths.append(path)
+
+    def tearDown(self):
+
+        shutil.rmtree(self.tmp_dir)
+
+    def test_extract_many(self):
+
+        results = dict(
+            local.LocalExtractor().extract_many(self.paths, processes=2)
+        )
+
+        assert_equal(sorted(results), self.paths)
+        for qxml in results.values():
+            assert_equal(len(qxml('table')), 1)
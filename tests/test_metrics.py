@@ -0,0 +1,93 @@
+import urllib2
+import unittest
+from nose.tools import *
+from nose_parameterized import parameterized
+
+from sciscrape.utils import metrics
+from sciscrape.scrapetools import scrape
+
+def build_info(publisher, status, docs=None):
+
+    info = scrape.ScrapeInfo()
+    info.publisher = publisher
+    info.status = status
+    info.docs = docs or {}
+    with info.timings.span('get', doc_type='pdf'):
+        pass
+    return info
+
+class TestClassifyStatus(unittest.TestCase):
+
+    @parameterized.expand([
+        ('success', 'Success', 'success'),
+        ('no_access', "NoAccessError('No access',)", 'no_access'),
+        ('not_found', "NotFoundError('Link not found',)", 'not_found'),
+        ('bad_document', "BadDocumentError('Bad document',)", 'bad_document'),
+        ('timeout', 'Timeout', 'timeout'),
+        ('url_error', "URLError(timeout('timed out',),)", 'timeout'),
+        ('other', "KeyError('pmid',)", 'error'),
+    ])
+    def test_classify(self, _, status, outcome):
+        assert_equal(metrics.classify_status(status), outcome)
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def setUp(self):
+
+        self.registry = metrics.MetricsRegistry()
+        self.registry.finish(build_info(
+            'npg',
+            {'pdf': 'Success', 'html': "NoAccessError('No access',)"},
+            {'pdf': '%PDF-1.4 body'},
+        ))
+        self.registry.finish(build_info(
+            'npg',
+            {'pdf': "BadDocumentError('Bad document',)"},
+        ))
+
+    def test_counters(self):
+
+        assert_equal(self.registry.articles, {'npg': 2})
+        assert_equal(
+            self.registry.outcomes('npg', 'pdf'),
+            {'success': 1, 'bad_document': 1}
+        )
+        assert_equal(self.registry.bytes, {('npg', 'pdf'): 13})
+        assert_equal(self.registry.success_rate('npg', 'pdf'), 0.5)
+        assert_is_none(self.registry.success_rate('npg', 'pmc'))
+
+    def test_histogram(self):
+
+        histogram = self.registry.latencies[('npg', 'pdf', 'get')]
+        assert_equal(histogram.count, 2)
+        assert_equal(histogram.cumulative()[-1], (float('inf'), 2))
+
+    def test_prometheus(self):
+
+        text = self.registry.to_prometheus()
+
+        assert_in('# TYPE sciscrape_documents_total counter', text)
+        assert_in(
+            'sciscrape_documents_total{publisher="npg",doc_type="pdf",'
+            'outcome="success"} 1',
+            text
+        )
+        assert_in(
+            'sciscrape_downloaded_bytes_total{publisher="npg",doc_type="pdf"} 13',
+            text
+        )
+        assert_in(
+            'sciscrape_stage_seconds_bucket{publisher="npg",doc_type="pdf",'
+            'stage="get",le="+Inf"} 2',
+            text
+        )
+
+    def test_serve(self):
+
+        server = self.registry.serve(0, host='127.0.0.1')
+        try:
+            url = 'http://127.0.0.1:%d/metrics' % server.server_address[1]
+            body = urllib2.urlopen(url).read()
+        finally:
+            server.shutdown()
+        assert_equal(body, self.registry.to_prometheus())
@@ -0,0 +1,79 @@
+import unittest
+from nose.tools import *
+from pyquery import PyQuery
+
+from sciscrape.scrapetools import scrape
+from sciscrape.scrapetools import getters
+
+PAGES = {
+    'http://www.nature.com/article': '<html><body>'
+        '<a class="articletext" href="http://www.nature.com/doifinder/1">Full text</a>'
+        '</body></html>',
+    'http://www.nature.com/doifinder/1': '<html><body>'
+        '<a href="http://www.nature.com/article.pdf">PDF</a>'
+        '</body></html>',
+    'http://www.nature.com/article.pdf': '%PDF-1.4 body',
+}
+
+class CountingBrowser(object):
+    """Browser stand-in serving fixed pages and counting requests."""
+
+    def __init__(self, url):
+        self.url = url
+        self.opened = []
+
+    def open(self, url):
+        self.opened.append(url)
+        self.url = url
+
+    def geturl(self):
+        return self.url
+
+    def get_docs(self):
+        text = PAGES[self.url]
+        try:
+            return text, PyQuery(text)
+        except Exception:
+            return text, None
+
+class TestNavigationCache(unittest.TestCase):
+
+    def setUp(self):
+
+        start = 'http://www.nature.com/article'
+        self.info = scrape.ScrapeInfo()
+        self.info.init_html = PAGES[start]
+        self.info.init_qhtml = PyQuery(PAGES[start])
+        self.browser = CountingBrowser(start)
+
+    def test_get_cached(self):
+
+        nav = getters.NavigationCache()
+        calls = []
+        fetch = lambda: calls.append(1) or 'page'
+
+        assert_equal(nav.get('step', fetch), 'page')
+        assert_equal(nav.get('step', fetch), 'page')
+        assert_equal(len(calls), 1)
+        assert_equal((nav.hits, nav.misses), (1, 1))
+
+    def test_failed_step_not_cached(self):
+
+        nav = getters.NavigationCache()
+
+        def fail():
+            raise ValueError()
+
+        with assert_raises(ValueError):
+            nav.get('step', fail)
+        assert_false('step' in nav)
+
+    def test_npg_old_shares_doifinder(self):
+
+        html_link = getters.NPGOldHTMLGetter().get_link(self.info, self.browser)
+        pdf_link = getters.NPGOldPDFGetter().get_link(self.info, self.browser)
+
+        assert_equal(html_link, 'http://www.nature.com/doifinder/1')
+        assert_equal(pdf_link, 'http://www.nature.com/article.pdf')
+        assert_equal(self.browser.opened, ['http://www.nature.com/doifinder/1'])
+        assert_equal(self.info.nav.hits, 1)
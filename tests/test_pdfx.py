@@ -0,0 +1,200 @@
+import os
+import gzip
+import time
+import StringIO
+import shutil
+import tempfile
+import threading
+import unittest
+import SocketServer
+import BaseHTTPServer
+from nose.tools import *
+
+from sciscrape.pdftools import pdfx
+
+XML = '<pdfx><article><table number="%s"><tr><td>x</td></tr></table></article></pdfx>'
+
+DOC = '''<?xml version='1.0' encoding='UTF-8'?>
+<pdfx><article>
+<section><h1>Methods</h1><p>Participants \xe2\x80\x94 text</p></section>
+<h1 class="table">Table 1. <i>Regions</i></h1>
+<table number="1"><tr><td>x</td><td>y</td></tr></table>
+<p>Between</p>
+<table number="2"><tr><td>z</td></tr></table>
+<h1 class="table">Table 3</h1>
+<!-- comment -->
+<table number="3"><tr><td>w</td></tr></table>
+<references><ref>A</ref><ref>B</ref></references>
+</article></pdfx>'''
+
+class PDFxHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    '''Stand-in for the PDFx service. PDF bodies are "<delay> <number>";
+    the response is a one-table document numbered <number>, sent after
+    sleeping <delay> seconds.
+
+    '''
+    def do_POST(self):
+
+        server = self.server
+        with server.lock:
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+
+        body = self.rfile.read(int(self.headers['content-length']))
+        delay, number = body.split()
+        time.sleep(float(delay))
+
+        with server.lock:
+            server.active -= 1
+
+        response = XML % (number)
+        self.send_response(200)
+        self.send_header('content-type', 'text/xml')
+        if number == 'doc':
+            buf = StringIO.StringIO()
+            with gzip.GzipFile(fileobj=buf, mode='wb') as f:
+                f.write(DOC)
+            response = buf.getvalue()
+            self.send_header('content-encoding', 'gzip')
+        self.send_header('content-length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+class PDFxServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self):
+        BaseHTTPServer.HTTPServer.__init__(self, ('127.0.0.1', 0), PDFxHandler)
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:%d/' % (self.server_address[1])
+
+class TestPDFExtractor(unittest.TestCase):
+
+    def setUp(self):
+
+        self.server = PDFxServer()
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.tmp_dir)
+
+    def write_pdfs(self, delays):
+
+        paths = []
+        for idx, delay in enumerate(delays):
+            path = os.path.join(self.tmp_dir, '%d.pdf' % (idx))
+            with open(path, 'wb') as f:
+                f.write('%s %d' % (delay, idx))
+            paths.append(path)
+        return paths
+
+    def test_extract(self):
+
+        extractor = pdfx.PDFExtractor(url=self.server.url)
+        qxml = extractor.extract('0 7')
+
+        assert_equal(qxml('table').attr('number'), '7')
+
+    def test_extract_stream(self):
+
+        extractor = pdfx.PDFExtractor(url=self.server.url, stream=True)
+        qxml = extractor.extract('0 doc')
+
+        assert_equal(
+            [element.tag for element in qxml[0]],
+            ['h1', 'table', 'table', 'table']
+        )
+        assert_equal(qxml('h1.table').text(), 'Table 1. Regions')
+
+    def test_extract_many_completion_order(self):
+
+        paths = self.write_pdfs([0.4, 0, 0.2])
+        extractor = pdfx.PDFExtractor(url=self.server.url)
+        results = list(extractor.extract_many(paths, processes=3))
+
+        assert_equal([path for path, _ in results], [paths[1], paths[2], paths[0]])
+        assert_equal(
+            [qxml('table').attr('number') for _, qxml in results],
+            ['1', '2', '0']
+        )
+
+    def test_extract_many_concurrency_limit(self):
+
+        paths = self.write_pdfs([0.1] * 8)
+        extractor = pdfx.PDFExtractor(url=self.server.url, pool_size=1)
+        extractor.session
+        results = list(extractor.extract_many(iter(paths), processes=2))
+
+        assert_equal(sorted(path for path, _ in results), sorted(paths))
+        assert_equal(self.server.max_active, 2)
+
+        # Session is rebuilt with a large enough connection pool
+        adapter = extractor.session.get_adapter(self.server.url)
+        assert_equal(adapter._pool_maxsize, 2)
+
+    def test_extract_many_timeout(self):
+
+        paths = self.write_pdfs([1, 0])
+        extractor = pdfx.PDFExtractor(url=self.server.url, timeout=0.2)
+        results = dict(extractor.extract_many(paths, processes=2))
+
+        assert_equal(results[paths[0]], None)
+        assert_equal(results[paths[1]]('table').attr('number'), '1')
+
+class TestIterparseTables(unittest.TestCase):
+
+    def test_keeps_tables_and_captions(self):
+
+        qxml = pdfx.iterparse_tables(StringIO.StringIO(DOC))
+
+        assert_equal(
+            [(element.tag, element.get('number')) for element in qxml[0]],
+            [('h1', None), ('table', '1'), ('table', '2'), ('table', '3')]
+        )
+        assert_equal(qxml('td').text(), 'x y z w')
+
+    def test_matches_full_parse(self):
+
+        full = pdfx.PDFExtractor().parse_xml(DOC.decode('utf-8'))
+        tables = pdfx.iterparse_tables(DOC)
+
+        for selector in ['table', 'td']:
+            assert_equal(full(selector).text(), tables(selector).text())
+
+        def captions(qxml):
+            return [
+                pdfx.is_table_caption(table.getprevious())
+                for table in qxml('table')
+            ]
+        assert_equal(captions(full), captions(tables))
+
+    def test_error(self):
+
+        assert_equal(pdfx.iterparse_tables('<error>Failed</error>'), None)
+        assert_equal(pdfx.iterparse_tables(''), None)
+
+class TestBaseExtractor(unittest.TestCase):
+
+    def test_abstract(self):
+
+        class IncompleteExtractor(pdfx.BaseExtractor):
+            pass
+
+        with assert_raises(TypeError):
+            IncompleteExtractor()
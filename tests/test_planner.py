@@ -0,0 +1,148 @@
+import unittest
+from nose.tools import *
+
+from sciscrape.utils import metrics
+from sciscrape.utils import timing
+from sciscrape.scrapetools import scrape
+from sciscrape.scrapetools import planner
+from sciscrape.utils import replay
+
+from tests.replay_fixtures import build_cassette, START_URL
+from tests.table_fixtures import HTML
+
+def build_info(publisher, doc_type, status, seconds):
+
+    info = scrape.ScrapeInfo()
+    info.publisher = publisher
+    info.status = {doc_type: status}
+    info.timings.spans.append(_span(doc_type, seconds))
+    return info
+
+def _span(doc_type, seconds):
+
+    span = timing.Span('get', {'doc_type': doc_type})
+    span.start, span.end = 0.0, seconds
+    return span
+
+class TestFetchPlanner(unittest.TestCase):
+
+    def setUp(self):
+
+        self.registry = metrics.MetricsRegistry()
+        self.planner = planner.FetchPlanner(registry=self.registry)
+        self.doc_types = ['html', 'pdf', 'pmc']
+
+    def test_priors(self):
+
+        assert_equal(
+            self.planner.plan('npg', 'any', self.doc_types),
+            ['pmc', 'html', 'pdf']
+        )
+        assert_equal(
+            self.planner.plan('npg', 'pdf', self.doc_types),
+            ['pdf', 'pmc', 'html']
+        )
+        assert_equal(
+            self.planner.plan('npg', 'all', self.doc_types), self.doc_types
+        )
+
+    def test_history(self):
+
+        # PMC rarely succeeds for this publisher; fast publisher HTML does
+        for _ in range(5):
+            self.registry.finish(build_info('npg', 'pmc', 'KeyError()', 1.0))
+            self.registry.finish(build_info('npg', 'html', 'Success', 0.5))
+
+        assert_almost_equal(self.planner.success_rate('npg', 'pmc'), 1 / 7.0)
+        assert_equal(
+            self.planner.plan('npg', 'tables', self.doc_types),
+            ['html', 'pmc', 'pdf']
+        )
+        assert_equal(
+            self.planner.plan('elsevier', 'tables', self.doc_types),
+            ['pmc', 'html', 'pdf']
+        )
+
+    def test_satisfied(self):
+
+        info = scrape.ScrapeInfo()
+        info.docs = {'html': '<html><body><p>No tables</p></body></html>'}
+        assert_false(self.planner.satisfied('tables', info))
+        assert_true(self.planner.satisfied('any', info))
+        assert_false(self.planner.satisfied('all', info))
+
+        info.docs['pmc'] = HTML
+        assert_true(self.planner.satisfied('tables', info))
+
+    def test_satisfied_cache(self):
+
+        calls = []
+        def accept(doc_type, doc):
+            calls.append(doc_type)
+            return False
+        planner.GOALS['test'] = planner.Goal({}, True, accept)
+        try:
+            info = scrape.ScrapeInfo()
+            info.docs = {'html': HTML}
+            assert_false(self.planner.satisfied('test', info))
+            info.docs['pmc'] = HTML
+            assert_false(self.planner.satisfied('test', info))
+        finally:
+            del planner.GOALS['test']
+
+        # Each document is checked once
+        assert_equal(sorted(calls), ['html', 'pmc'])
+
+    def test_has_tables(self):
+
+        assert_true(planner.has_tables('html', HTML))
+        assert_true(planner.has_tables('pdf', '%PDF-'))
+        assert_false(planner.has_tables('html', '<!-- -->'))
+
+    def test_explicit_registry(self):
+
+        scraper = scrape.Scrape(registry=self.registry)
+        assert_true(scraper.planner.registry is self.registry)
+
+        # Sinks are not used as registries
+        scraper = scrape.Scrape(sink=self.registry)
+        assert_true(scraper.planner.registry is None)
+
+    def test_unknown_goal(self):
+
+        with assert_raises(ValueError):
+            self.planner.plan('npg', 'everything', self.doc_types)
+
+class TestScrapeGoal(unittest.TestCase):
+
+    def setUp(self):
+
+        self.server = replay.CassetteServer(build_cassette())
+        self.server.start()
+
+    def tearDown(self):
+
+        self.server.shutdown()
+        self.server.server_close()
+
+    def scrape(self, goal):
+
+        scraper = scrape.ReplayScrape(server_url=self.server.url)
+        return scraper.scrape_link(START_URL, pmid='23638070', goal=goal)
+
+    def test_stop_early(self):
+
+        # Saved PMC and HTML pages have no table markup, so the tables
+        # goal falls back to the PDF
+        info = self.scrape('tables')
+        assert_equal(info.plan, ['pmc', 'html', 'pdf'])
+        assert_equal(sorted(info.docs.keys()), ['html', 'pdf', 'pmc'])
+
+        info = self.scrape('any')
+        assert_equal(info.docs.keys(), ['pmc'])
+
+        info = self.scrape('pdf')
+        assert_equal(info.docs.keys(), ['pdf'])
+
+        info = self.scrape('all')
+        assert_equal(sorted(info.docs.keys()), ['html', 'pdf', 'pmc'])
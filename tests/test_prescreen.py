@@ -0,0 +1,77 @@
+import unittest
+from nose.tools import *
+
+from sciscrape.pdftools import local
+from sciscrape.pdftools import prescreen
+from sciscrape.parsetools import sciparse
+
+from tests.pdf_fixtures import build_pdf, TABLE_PDF
+
+TEXT_PDF = build_pdf([
+    (72, 740, 'Participants completed a questionnaire.'),
+    (72, 700, 'Table 1. Demographics'),
+    (72, 680, 'Age 24 Score 3'),
+])
+
+# Uppercase headings and running heads
+HEADING_PDF = build_pdf([
+    (72, 760, 'OMNI JOURNAL OF NEUROSCIENCE'),
+    (72, 740, 'BACKGROUND'),
+    (72, 720, 'Volumes of the basal ganglia were measured.'),
+    (72, 700, 'DATABASE AND BASAL GANGLIA SEGMENTATION'),
+    (72, 680, 'Table 1. Demographics'),
+])
+
+class CountingExtractor(local.LocalExtractor):
+
+    calls = 0
+
+    def extract_xml(self, pdf):
+        self.calls += 1
+        return super(CountingExtractor, self).extract_xml(pdf)
+
+class TestPrescreen(unittest.TestCase):
+
+    def test_candidate_pages(self):
+
+        texts = ['Introduction', 'RegionBAxyzFrontal9-421230', 'MNI space']
+        assert_equal(prescreen.candidate_pages(texts), [1, 2])
+        assert_equal(prescreen.candidate_pages(['', ' ']), None)
+
+    def test_heading_page(self):
+
+        texts = prescreen.page_texts(HEADING_PDF)
+        assert_equal(prescreen.candidate_pages(texts), [])
+
+    def test_candidate_text(self):
+
+        for text in ['Region X Y Z', 'RegionXYZ', 'x, y, z', 'mni space',
+                     'Peak (MNI)', 'MNI152', 'Region BA', 'BA46', 'BA 46',
+                     'Talairach']:
+            assert_true(prescreen.is_candidate_text(text), text)
+        for text in ['An omnibus test', 'Based on basal ganglia volumes',
+                     'OMNI', 'BACKGROUND', 'DATABASE', 'BASAL GANGLIA']:
+            assert_false(prescreen.is_candidate_text(text), text)
+        assert_equal(prescreen.candidate_pages(None), None)
+
+    def test_page_texts(self):
+
+        texts = prescreen.page_texts(TABLE_PDF)
+        assert_equal(len(texts), 1)
+        assert_true('Frontal' in texts[0])
+        assert_equal(prescreen.page_texts('not a pdf'), None)
+
+    def test_extractor_skips_non_candidates(self):
+
+        inner = CountingExtractor()
+        extractor = prescreen.PrescreenExtractor(inner)
+        parser = sciparse.PDFTableParse(extractor=extractor)
+
+        assert_equal(parser.parse(TEXT_PDF), [])
+        tables = parser.parse(TABLE_PDF)
+        assert_equal(len(tables[0].coords), 2)
+
+        assert_equal(inner.calls, 1)
+        assert_equal(extractor.stats['pdfs'], 2)
+        assert_equal(extractor.stats['pdfs_skipped'], 1)
+        assert_equal(extractor.stats['pages_candidate'], 1)
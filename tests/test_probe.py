@@ -0,0 +1,137 @@
+import unittest
+from nose.tools import *
+
+from sciscrape.utils import replay
+from sciscrape.scrapetools import scrape
+from sciscrape.scrapetools import getters
+from sciscrape.exceptions import (
+    NoAccessError, BadDocumentError, ProbeNoAccessError
+)
+
+from .replay_fixtures import build_cassette, read_fixture, START_URL, PDF_URL
+
+PAYWALL_URL = 'http://www.plosone.org/article/purchase.pdf'
+
+class HeadForbiddenBrowser(replay.ReplayBrowser):
+    '''Browser for a server that rejects HEAD but serves GET.'''
+
+    def probe(self, url, method='HEAD', nbytes=1024):
+        result = super(HeadForbiddenBrowser, self).probe(url, method, nbytes)
+        if method == 'HEAD':
+            return result._replace(code=403)
+        return result
+
+class PaywallGetter(getters.PDFGetter):
+
+    def get_link(self, cache, browser):
+        return PAYWALL_URL
+
+class TestProbe(unittest.TestCase):
+
+    def setUp(self):
+
+        cassette = build_cassette()
+        cassette.add(PAYWALL_URL, PAYWALL_URL, 403,
+                     [('Content-Type', 'text/html')],
+                     '<html>Purchase this article</html>')
+        self.server = replay.CassetteServer(cassette)
+        self.server.start()
+        self.browser = replay.ReplayBrowser(server_url=self.server.url)
+
+    def tearDown(self):
+
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_head(self):
+
+        result = self.browser.probe(PDF_URL)
+        assert_equal(result.code, 200)
+        assert_equal(result.url, PDF_URL)
+        assert_equal(result.content_type, 'application/pdf')
+        assert_equal(result.length, len(read_fixture('pdf')))
+        assert_equal(result.head, '')
+
+        # Probes don't change the current page
+        assert_equal(self.browser.geturl(), None)
+
+    def test_range(self):
+
+        result = self.browser.probe(PDF_URL, method='GET', nbytes=16)
+        assert_equal(result.code, 206)
+        assert_equal(result.head, read_fixture('pdf')[:16])
+
+        # Length is the size of the whole document
+        assert_equal(result.length, len(read_fixture('pdf')))
+
+    def test_error_status(self):
+
+        assert_equal(self.browser.probe(PAYWALL_URL).code, 403)
+        assert_equal(self.browser.probe('http://example.com/missing').code, 404)
+
+    def test_check_probe(self):
+
+        result = self.browser.probe(PDF_URL)
+        getters.PDFGetter().check_probe(result)
+        with assert_raises(BadDocumentError):
+            getters.HTMLGetter().check_probe(result)
+
+        # Sniff content of Range probes
+        result = self.browser.probe(PDF_URL, method='GET')
+        with assert_raises(BadDocumentError):
+            getters.HTMLGetter().check_probe(
+                result._replace(content_type='application/octet-stream')
+            )
+
+    def test_max_length(self):
+
+        getter = getters.PDFGetter()
+        getter.probe_max_length = 100
+        with assert_raises(BadDocumentError):
+            getter.check_probe(self.browser.probe(PDF_URL))
+
+    def test_fail_fast(self):
+
+        info = scrape.ScrapeInfo()
+        getter = getters.PDFGetter()
+        getter.probe = True
+        with assert_raises(NoAccessError):
+            getter.get(info, self.browser, link=PAYWALL_URL)
+
+        # Paywall page was not downloaded
+        names = [span.name for span in info.timings.spans]
+        assert_in('probe', names)
+        assert_not_in('download', names)
+
+    def test_reget_fails_fast(self):
+
+        info = scrape.ScrapeInfo()
+        getter = PaywallGetter()
+        getter.probe = True
+        with assert_raises(ProbeNoAccessError):
+            getter.reget(info, self.browser)
+
+        # Rejected links aren't retried
+        names = [span.name for span in info.timings.spans]
+        assert_equal(names.count('probe'), 1)
+
+    def test_head_forbidden(self):
+
+        browser = HeadForbiddenBrowser(server_url=self.server.url)
+        getter = getters.PDFGetter()
+        result = getter.probe_link(browser, PDF_URL)
+        assert_equal(result.code, 206)
+
+        info = scrape.ScrapeInfo()
+        getter.probe = True
+        getter.get(info, browser, link=PDF_URL)
+        assert_equal(info.html, read_fixture('pdf'))
+
+    def test_scrape(self):
+
+        scraper = scrape.ReplayScrape(server_url=self.server.url, probe=True)
+        info = scraper.scrape_link(START_URL, pmid='23638070')
+        for doc_type in ['html', 'pdf', 'pmc']:
+            assert_equal(info.status[doc_type], 'Success')
+            assert_equal(info.docs[doc_type], read_fixture(doc_type))
+        assert_in('probe', [span.name for span in info.timings.spans])
@@ -0,0 +1,89 @@
+import shutil
+import tempfile
+import unittest
+from nose.tools import *
+
+from sciscrape.utils import replay
+from sciscrape.scrapetools import scrape
+from sciscrape.benchmarks import scrapebench
+
+from .fixtures import ScrapeFixture
+from .replay_fixtures import (
+    build_cassette, read_fixture, START_URL, PDF_URL, PMC_URL
+)
+
+class TestReplay(unittest.TestCase):
+
+    def setUp(self):
+
+        self.server = replay.CassetteServer(build_cassette())
+        self.server.start()
+
+    def tearDown(self):
+
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_replay_scrape(self):
+
+        scraper = scrape.ReplayScrape(server_url=self.server.url)
+        info = scraper.scrape_link(START_URL, pmid='23638070')
+
+        assert_equal(info.publisher, 'plos')
+        for document_type in ['html', 'pdf', 'pmc']:
+            assert_equal(info.status[document_type], 'Success')
+            assert_equal(info.docs[document_type], read_fixture(document_type))
+
+    def test_replay_final_url(self):
+
+        browser = replay.ReplayBrowser(server_url=self.server.url)
+        browser.open(PMC_URL)
+
+        assert_equal(
+            browser.geturl(),
+            'http://www.ncbi.nlm.nih.gov/pmc/articles/PMC3634848/'
+        )
+
+    def test_missing_url(self):
+
+        browser = replay.ReplayBrowser(server_url=self.server.url)
+        with assert_raises(Exception):
+            browser.open('http://example.com/missing')
+
+    def test_record_round_trip(self):
+
+        cassette = replay.Cassette()
+        browser = replay.RecordingBrowser(cassette=cassette)
+        browser.open('%s/replay?url=%s' % (self.server.url, PDF_URL))
+
+        assert_equal(len(cassette), 1)
+        url = cassette.entries.keys()[0]
+        _, code, headers, body = cassette.get(url)
+        assert_equal(code, 200)
+        assert_equal(body, read_fixture('pdf'))
+
+class TestScrapeBench(unittest.TestCase):
+
+    def setUp(self):
+
+        self.cassette_dir = tempfile.mkdtemp()
+        self.fixture = ScrapeFixture('plos', '23638070', START_URL)
+        build_cassette().save(
+            scrapebench.cassette_path(self.cassette_dir, self.fixture)
+        )
+
+    def tearDown(self):
+
+        shutil.rmtree(self.cassette_dir)
+
+    def test_run(self):
+
+        summary = scrapebench.run(
+            self.cassette_dir, concurrency=2, repeat=2, fixtures=[self.fixture]
+        )
+
+        assert_equal(summary['articles'], 2)
+        assert_equal(summary['outcomes'], {'success': 6})
+        assert_in('pubdet', summary['stages'])
+        assert_in('open', summary['stages'])
+        assert_in('Articles/s', scrapebench.format_report(summary))
@@ -0,0 +1,255 @@
+import unittest
+from nose.tools import *
+import lxml.html
+from lxml import etree
+
+from sciscrape.parsetools import sciparse
+from sciscrape.scrapetools import scrape
+
+from tests.replay_fixtures import read_fixture
+from tests.table_fixtures import StaticExtractor, HTML
+
+class TestPDFTableParse(unittest.TestCase):
+
+    def setUp(self):
+
+        self.parser = sciparse.PDFTableParse(extractor=StaticExtractor())
+        qxml = self.parser.extractor.extract(None)
+        self.tables = [table for root in qxml for table in root.iter('table')]
+
+    def test_consolidate_tables(self):
+
+        groups = self.parser._consolidate_tables(self.tables)
+
+        assert_equal(
+            [[table.get('number') for table in group] for group in groups],
+            [['1', '1'], ['2']]
+        )
+        assert_equal(groups[0], [self.tables[1], self.tables[2]])
+
+    def test_parse_table(self):
+
+        groups = self.parser._consolidate_tables(self.tables)
+        data_table = self.parser._parse_table(groups[0])
+
+        assert_equal(data_table['headers'], ['Region', 'x', 'y', 'z'])
+        assert_equal(data_table['data'], [
+            ['Occipital cortex', '-10', '-90', '2'],
+            ['Parietal', '-30', '-60', '50'],
+        ])
+
+    def test_headers_from_caption(self):
+
+        groups = self.parser._consolidate_tables(self.tables)
+
+        assert_equal(
+            self.parser._get_headers(groups[1]),
+            ['Table', '2', 'x', 'y', 'z']
+        )
+
+    def test_get_text(self):
+
+        element = etree.fromstring(
+            '<td> a <!-- b --> c<i> d </i>e <b>f</b></td>'
+        )
+
+        assert_equal(self.parser._get_text(element), 'a c d e f')
+
+    def test_parse(self):
+
+        tables = self.parser.parse(None)
+
+        assert_equal([table.coords for table in tables], [
+            [sciparse.Coord(-10, -90, 2), sciparse.Coord(-30, -60, 50)],
+            [sciparse.Coord(-40, 20, 30)],
+        ])
+        assert_equal([table.number for table in tables], [1, 2])
+
+class TestPostProcessing(unittest.TestCase):
+
+    def setUp(self):
+
+        self.parser = sciparse.PDFTableParse(extractor=StaticExtractor())
+
+    def process(self, headers, data):
+
+        data_table = {'headers': headers, 'data': data}
+        self.parser._clean_headers(data_table)
+        self.parser._to_frame(data_table)
+        self.parser._split_cols(data_table)
+        self.parser._sort_cols(data_table)
+        self.parser._to_float(data_table)
+        self.parser._from_frame(data_table)
+        return data_table
+
+    def test_split_sort_float(self):
+
+        data_table = self.process(
+            ['Region', 'MNI coordinates', 'x', 'y', 'z', 't'],
+            [
+                ['Frontal', '-40, 20, 30', '20, 8', '', '-2', '5.1*'],
+                ['Parietal', '-30 -60', '1,000', '2', '3', 'n.s.'],
+                ['Short row'],
+            ]
+        )
+
+        assert_equal(
+            data_table['headers'],
+            ['region', 'x', 'y', 'z', 'x', 'y', 'z', 't']
+        )
+        assert_equal(data_table['data'], [
+            ['Frontal', -40.0, 20.0, 30.0, 20.0, 8.0, -2.0, 5.1],
+            ['Parietal', -30.0, -60.0, '', 1000.0, 2.0, 3.0, 'n.s.'],
+            ['Short row', '', '', '', '', '', '', ''],
+        ])
+
+        table = sciparse.Table(data_table)
+        assert_equal(table.coords, [
+            sciparse.Coord(-40, 20, 30),
+            sciparse.Coord(20, 8, -2),
+            sciparse.Coord(1000, 2, 3),
+        ])
+
+    def test_extra_split_values_dropped(self):
+
+        data_table = self.process(
+            ['x, y', 'z', 't'],
+            [['1 2 3', '4', '5']]
+        )
+
+        assert_equal(data_table['data'], [[1.0, 2.0, 4.0, 5.0]])
+
+    def test_all_coords_pos(self):
+
+        data_table = self.process(['x', 'y', 'z'], [['1', '2', '3']])
+        table = sciparse.Table(data_table)
+
+        assert_true(self.parser._all_coords_pos(table))
+        table.coords.append(sciparse.Coord(-1.0, 2.0, 3.0))
+        assert_false(self.parser._all_coords_pos(table))
+
+class TestTable(unittest.TestCase):
+
+    def setUp(self):
+
+        self.table = sciparse.Table(None)
+        for coord in [(1, 2, 3), ('-4', '5', '6.5'), ('x', 1, 2), (1, 2, 3)]:
+            self.table.add_coord(*coord)
+
+    def test_array(self):
+
+        assert_equal(self.table.array.shape, (3, 3))
+        assert_equal(self.table.array.tolist(), [
+            [1.0, 2.0, 3.0], [-4.0, 5.0, 6.5], [1.0, 2.0, 3.0],
+        ])
+
+    def test_headers_rows(self):
+
+        assert_equal((self.table.headers, self.table.rows), ([], []))
+
+        table = sciparse.Table({
+            'headers': ['region', 'x', 'y', 'z'],
+            'data': [['Frontal', '-40', '20', '30']],
+        })
+        assert_equal(table.headers, ['region', 'x', 'y', 'z'])
+        assert_equal(table.rows, [['Frontal', '-40', '20', '30']])
+
+    def test_coords_view(self):
+
+        coords = self.table.coords
+
+        assert_equal(len(coords), 3)
+        assert_equal(coords[1], sciparse.Coord(-4.0, 5.0, 6.5))
+        assert_equal(coords[-1], sciparse.Coord(1, 2, 3))
+        assert_true(sciparse.Coord(-4, 5, 6.5) in coords)
+        assert_false(sciparse.Coord(4, 5, 6.5) in coords)
+
+        coords[0].x = 10
+        assert_equal(self.table.array[0].tolist(), [10.0, 2.0, 3.0])
+
+        self.table.coords = []
+        assert_equal(len(self.table.coords), 0)
+
+    def test_equality(self):
+
+        other = sciparse.Table(None)
+        other.coords = [(-4, 5, 6.5), (1, 2, 3)]
+        assert_equal(self.table, other)
+
+        other.add_coord(0, 0, 0)
+        assert_not_equal(self.table, other)
+
+    def test_coord_hash(self):
+
+        coords = set([
+            sciparse.Coord(1, 2, 3),
+            sciparse.Coord(1.0, 2.0, 3.0),
+            self.table.coords[0],
+        ])
+        assert_equal(len(coords), 1)
+
+class TestHTMLTableParse(unittest.TestCase):
+
+    def setUp(self):
+
+        self.parser = sciparse.HTMLTableParse()
+
+    def test_parse_table(self):
+
+        tables = lxml.html.fromstring(HTML).findall('.//table')
+        groups = self.parser._consolidate_tables(tables)
+        assert_equal(len(groups), 2)
+
+        data_table = self.parser._parse_table(groups[0])
+        assert_equal(
+            data_table['headers'], ['Region', 'BA', 'x', 'y', 'z']
+        )
+        assert_equal(data_table['data'], [
+            ['Frontal', '9', '-40', '20 a', '30'],
+            ['Frontal', '46', '44', '36', '-8'],
+            ['Deactivations', '', '', '', ''],
+            ['Parietal', '7', '12', '-60', '50'],
+        ])
+
+    def test_parse(self):
+
+        tables = self.parser.parse(HTML)
+
+        assert_equal(len(tables), 1)
+        assert_equal(tables[0].coords, [
+            sciparse.Coord(-40, 20, 30),
+            sciparse.Coord(44, 36, -8),
+            sciparse.Coord(12, -60, 50),
+        ])
+        assert_equal(tables[0].number, 1)
+
+    def test_fixture_pages(self):
+
+        # Saved PLOS and PMC pages link to tables as thumbnails rather than
+        # including <table> markup, so no tables are found and parse_info
+        # falls back to the PDF
+        info = scrape.ScrapeInfo()
+        for doc_type in ['html', 'pmc']:
+            info.docs[doc_type] = read_fixture(doc_type)
+            assert_equal(self.parser.parse(info.docs[doc_type]), [])
+        info.docs['pdf'] = 'parsed by StaticExtractor'
+
+        pdf_parser = sciparse.PDFTableParse(extractor=StaticExtractor())
+        doc_type, tables = sciparse.parse_info(info, pdf_parser=pdf_parser)
+        assert_equal(doc_type, 'pdf')
+        assert_equal(len(tables), 2)
+
+    def test_parse_info_prefers_html(self):
+
+        info = scrape.ScrapeInfo()
+        info.docs = {'html': HTML, 'pdf': 'not parsed'}
+        pdf_parser = sciparse.PDFTableParse(extractor=StaticExtractor())
+
+        doc_type, tables = sciparse.parse_info(info, pdf_parser=pdf_parser)
+        assert_equal(doc_type, 'html')
+        assert_equal(len(tables[0].coords), 3)
+
+        # Fall back to PDF if HTML has no coordinate tables
+        info.docs['html'] = '<html><body><p>Abstract</p></body></html>'
+        doc_type, tables = sciparse.parse_info(info, pdf_parser=pdf_parser)
+        assert_equal(doc_type, 'pdf')
@@ -0,0 +1,93 @@
+import unittest
+import numpy as np
+from nose.tools import *
+
+from sciscrape.parsetools import spatial
+from sciscrape.parsetools import sciparse
+from sciscrape.tests import pdftest
+
+def make_table(coords):
+    table = sciparse.Table(None)
+    table.coords = coords
+    return table
+
+class TestGridIndex(unittest.TestCase):
+
+    def test_query_matches_brute_force(self):
+
+        rand = np.random.RandomState(0)
+        points = rand.uniform(-50, 50, size=(500, 3))
+        index = spatial.GridIndex(points, 4.0)
+
+        for point in rand.uniform(-50, 50, size=(20, 3)):
+            for radius in [2.0, 4.0, 9.0]:
+                distances = np.sqrt(((points - point) ** 2).sum(axis=1))
+                expected = np.flatnonzero(distances <= radius).tolist()
+                assert_equal(index.query(point, radius), expected)
+
+    def test_empty(self):
+
+        index = spatial.GridIndex([], 1.0)
+        assert_equal(index.query((0, 0, 0), 1.0), [])
+
+    def test_unique_rows(self):
+
+        rows = np.array([[1, 2, 3], [0, 0, 0], [1, 2, 3], [1, 2, 2]], float)
+        assert_equal(
+            spatial.unique_rows(rows).tolist(),
+            [[0, 0, 0], [1, 2, 2], [1, 2, 3]]
+        )
+
+class TestMatchPoints(unittest.TestCase):
+
+    def test_one_to_one(self):
+
+        # One extracted point close to two reference points
+        ref = [(10, 20, 30), (11, 20, 30)]
+        cmp = [(10.2, 20, 30)]
+        ref_matched, cmp_matched = spatial.match_points(ref, cmp, tol=1.5)
+
+        assert_equal(ref_matched.tolist(), [True, False])
+        assert_equal(cmp_matched.tolist(), [True])
+
+    def test_closest_pairs_first(self):
+
+        ref = [(0, 0, 0), (2, 0, 0)]
+        cmp = [(1.1, 0, 0), (2.5, 0, 0)]
+        ref_matched, cmp_matched = spatial.match_points(ref, cmp, tol=1.2)
+
+        assert_equal(ref_matched.tolist(), [True, True])
+        assert_equal(cmp_matched.tolist(), [True, True])
+
+class TestCompareTableGroups(unittest.TestCase):
+
+    def setUp(self):
+
+        self.ref = [
+            make_table([(10, 20, 30), (-40, 8, 2)]),
+            make_table([(10, 20, 30), (0, -60, 12)]),
+        ]
+
+    def test_exact(self):
+
+        cmp = [make_table([(10, 20, 30), (10, 20, 30), (-40, 8, 3)])]
+        result = pdftest.compare_table_groups(self.ref, cmp)
+
+        # Duplicate coordinates count once
+        assert_almost_equal(result['tp'], 1 / 3.0)
+        assert_almost_equal(result['fp'], 1 / 3.0)
+        assert_almost_equal(result['fn'], 2 / 3.0)
+
+    def test_tolerance(self):
+
+        cmp = [make_table([(10, 20, 30), (-40, 8, 3)])]
+        result = pdftest.compare_table_groups(self.ref, cmp, tol=1.5)
+
+        assert_almost_equal(result['tp'], 2 / 3.0)
+        assert_almost_equal(result['fp'], 0.0)
+        assert_almost_equal(result['fn'], 1 / 3.0)
+
+    def test_no_reference_coords(self):
+
+        result = pdftest.compare_table_groups([], self.ref)
+        assert_true(np.isnan(result['tp']))
@@ -0,0 +1,76 @@
+import unittest
+from nose.tools import *
+from lxml import etree
+
+from sciscrape.pdftools import local
+from sciscrape.pdftools import split
+from sciscrape.pdftools import prescreen
+from sciscrape.parsetools import sciparse
+
+from tests.pdf_fixtures import build_pages_pdf, row
+
+def text_page(text):
+    return [(72, 740 - 15 * idx, '%s line %d.' % (text, idx)) for idx in range(10)]
+
+SPLIT_PDF = build_pages_pdf([
+    text_page('Introduction'),
+    text_page('Methods'),
+    [(72, 700, 'Table 1. Regions showing greater activation')] +
+    row(680, 'Region', 'BA', 'x', 'y', 'z') +
+    row(665, 'Frontal', '9', '-42', '12', '30'),
+    [(72, 700, 'Table 1. (continued)')] +
+    row(665, 'Parietal', '7', '-30', '-60', '48') +
+    row(650, 'Occipital', '18', '-12', '-90', '4'),
+    text_page('References'),
+    text_page('References'),
+])
+
+class TestPageSplit(unittest.TestCase):
+
+    def test_select_pages(self):
+
+        assert_equal(split.select_pages([2, 3, 9], 10), [2, 3, 4, 9])
+        assert_equal(split.select_pages([0], 3, before=1, after=0), [0])
+
+    def test_map_pages(self):
+
+        xml = '<pdfx><table page="1"/><table page="2"/><p page="x"/></pdfx>'
+        root = etree.fromstring(split.map_pages(xml, [4, 7]))
+        assert_equal(
+            [element.get('page') for element in root.iter()],
+            [None, '5', '8', 'x']
+        )
+
+    def test_extract_split(self):
+
+        extractor = split.PageSplitExtractor(local.LocalExtractor())
+        xml = extractor.extract_xml(SPLIT_PDF)
+
+        root = etree.fromstring(xml)
+        assert_equal(
+            [table.get('page') for table in root.iter('table')], ['3', '4']
+        )
+        assert_equal(extractor.stats['pdfs_split'], 1)
+        assert_equal(extractor.stats['pages_extracted'], 2)
+        assert_true(extractor.stats['bytes_saved'] > 0)
+
+        # Tables continued across split pages are still consolidated
+        parser = sciparse.PDFTableParse(extractor=extractor)
+        tables = parser.parse(SPLIT_PDF)
+        assert_equal(len(tables), 1)
+        assert_equal(len(tables[0].coords), 3)
+
+    def test_matches_whole_document(self):
+
+        whole = sciparse.PDFTableParse(extractor=local.LocalExtractor())
+        parts = sciparse.PDFTableParse(
+            extractor=split.PageSplitExtractor(local.LocalExtractor())
+        )
+        assert_equal(whole.parse(SPLIT_PDF), parts.parse(SPLIT_PDF))
+
+    def test_skip_and_passthrough(self):
+
+        extractor = split.PageSplitExtractor(local.LocalExtractor())
+        no_tables = build_pages_pdf([text_page('Introduction')])
+        assert_equal(extractor.extract_xml(no_tables), prescreen.EMPTY_XML)
+        assert_equal(extractor.stats['pdfs_skipped'], 1)
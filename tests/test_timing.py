@@ -0,0 +1,98 @@
+import unittest
+from nose.tools import *
+
+from sciscrape.utils import timing
+from sciscrape.scrapetools import scrape
+from sciscrape.scrapetools import getters
+from sciscrape.exceptions import NoAccessError
+
+class ListSink(timing.MetricsSink):
+
+    def __init__(self):
+        self.spans = []
+
+    def record(self, span):
+        self.spans.append(span)
+
+class StaticBrowser(object):
+    """Browser stand-in that serves a fixed document for every URL."""
+
+    def __init__(self, text):
+        self.text = text
+        self.url = None
+
+    def open(self, url):
+        self.url = url
+
+    def geturl(self):
+        return self.url
+
+    def get_docs(self):
+        return self.text, None
+
+class StaticGetter(getters.HTMLGetter):
+
+    def get_link(self, cache, browser):
+        return 'http://example.com/full'
+
+class TestTimings(unittest.TestCase):
+
+    def setUp(self):
+
+        self.sink = ListSink()
+        self.timings = timing.Timings(self.sink)
+
+    def test_span_records_duration(self):
+
+        with self.timings.span('pubdet'):
+            pass
+
+        assert_equal(len(self.timings.spans), 1)
+        assert_equal(self.timings.spans[0].name, 'pubdet')
+        assert_greater_equal(self.timings.spans[0].duration, 0)
+        assert_equal(self.sink.spans, self.timings.spans)
+
+    def test_span_inherits_tags(self):
+
+        with self.timings.span('get', doc_type='pdf'):
+            with self.timings.span('open', url='http://example.com'):
+                pass
+
+        inner = self.timings.spans[0]
+        assert_equal(inner.name, 'open')
+        assert_equal(inner.tags, {'doc_type': 'pdf', 'url': 'http://example.com'})
+
+    def test_span_records_error(self):
+
+        with assert_raises(NoAccessError):
+            with self.timings.span('get'):
+                raise NoAccessError('No access')
+
+        assert_equal(self.timings.spans[0].error, 'NoAccessError')
+
+    def test_summary(self):
+
+        for _ in range(3):
+            with self.timings.span('open'):
+                pass
+
+        summary = self.timings.summary()
+        assert_equal(summary.keys(), ['open'])
+        assert_almost_equal(summary['open'], self.timings.total('open'))
+
+class TestGetterTimings(unittest.TestCase):
+
+    def test_getter_stages(self):
+
+        info = scrape.ScrapeInfo()
+        browser = StaticBrowser('<html><body>Full text</body></html>')
+
+        StaticGetter().get(info, browser)
+
+        names = [span.name for span in info.timings.spans]
+        assert_equal(
+            names,
+            ['get_link', 'download', 'post_process', 'check_access', 'validate']
+        )
+        for span in info.timings.spans:
+            assert_equal(span.tags['getter'], 'StaticGetter')
@@ -0,0 +1,91 @@
+import unittest
+import numpy as np
+import pandas as pd
+from nose.tools import *
+
+from sciscrape.parsetools import sciparse
+from sciscrape.parsetools import transforms
+
+from tests.table_fixtures import StaticExtractor, HTML
+
+def make_table(coords, space):
+    table = sciparse.Table(None)
+    table.coords = coords
+    table.space = space
+    return table
+
+class TestTransforms(unittest.TestCase):
+
+    def setUp(self):
+
+        rand = np.random.RandomState(0)
+        self.points = rand.uniform(-70, 70, size=(1000, 3))
+
+    def test_lancaster_matches_per_point(self):
+
+        mni = transforms.tal2mni(self.points)
+        for point, expected in zip(self.points[:10], mni[:10]):
+            tal = transforms.ICBM_SPM2TAL.dot(np.append(expected, 1))[:3]
+            assert_true(np.allclose(tal, point))
+
+    def test_brett_piecewise(self):
+
+        tal = transforms.mni2tal([[10, -20, 30], [10, -20, -30]], 'brett')
+        assert_true(np.allclose(tal, [
+            [9.9, -17.996, 28.537],
+            [9.9, -20.636, -24.2],
+        ]))
+
+    def test_detect_space(self):
+
+        assert_equal(transforms.detect_space(['MNI coordinates']), 'mni')
+        assert_equal(transforms.detect_space(['Region', 'Talairach']), 'tal')
+        assert_equal(transforms.detect_space(['x', 'y', 'z']), None)
+        assert_equal(
+            transforms.detect_space(['MNI coordinates converted to Talairach']),
+            None
+        )
+
+    def test_transform_tables(self):
+
+        tables = [
+            make_table(self.points[:10], 'tal'),
+            make_table(self.points[10:15], 'mni'),
+            make_table(self.points[15:20], 'tal'),
+            make_table(self.points[20:25], None),
+        ]
+        transforms.transform_tables(tables, target='mni')
+
+        assert_true(np.allclose(
+            tables[0].array, transforms.tal2mni(self.points[:10])
+        ))
+        assert_true(np.allclose(
+            tables[2].array, transforms.tal2mni(self.points[15:20])
+        ))
+        assert_true(np.allclose(tables[1].array, self.points[10:15]))
+        assert_true(np.allclose(tables[3].array, self.points[20:25]))
+        assert_equal(
+            [table.space for table in tables], ['mni', 'mni', 'mni', None]
+        )
+
+    def test_transform_frame(self):
+
+        coords = pd.DataFrame(self.points[:3], columns=['x', 'y', 'z'])
+        coords['space'] = ['tal', 'mni', None]
+        converted = transforms.transform_frame(coords, target='tal', default='mni')
+
+        assert_true(np.allclose(
+            converted[['x', 'y', 'z']].values,
+            [self.points[0]] + list(transforms.mni2tal(self.points[1:3]))
+        ))
+        assert_equal(list(converted['space']), ['tal'] * 3)
+
+    def test_parse_detects_space(self):
+
+        parser = sciparse.PDFTableParse(extractor=StaticExtractor())
+        tables = parser.parse(None)
+        assert_equal([table.space for table in tables], [None, None])
+
+        # "MNI coordinates" spans the x / y / z headers
+        tables = sciparse.HTMLTableParse().parse(HTML)
+        assert_equal([table.space for table in tables], ['mni'])